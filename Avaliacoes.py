@@ -5,19 +5,31 @@
 import streamlit as st
 import pandas as pd
 import requests
-import plotly.express as px
-import plotly.graph_objects as go
+import io
+from PIL import Image
 import indicadores
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import logging
-from pathlib import Path
+import atexit
+from concurrent.futures import FIRST_COMPLETED, wait
+from datetime import datetime
+from functools import partial
 
 # Importações dos módulos modulares
 from config_api import config_api
+from cliente_api import APIClient, cache_respostas
 from payloads import PayloadGeral, PayloadHabilidades, criar_payload_geral, criar_payload_habilidades
 from nivel_config import gerenciador_nivel, obter_nivel_atual, obter_config_nivel_atual
 from ranking_seletores import gerenciador_ranking
+from processamento_dados import ProcessadorDados, ConjuntoDados, cache_conjuntos
+from exportacao import renderizar_exportacao, tabelas_conjunto
+from graficos import GeradorGraficos
+from credenciais import PerfilUsuario, RepositorioCredenciais
+from armazem_conjuntos import armazem_conjuntos
+from cliente_servico import ClienteServicoConsultas
+from agendador_consultas import agendador_consultas, prefetcher_consultas, combinacoes_vizinhas, id_sessao_atual
+from resiliencia_api import CHAVE_CONTINGENCIA, circuit_breaker
 
 # --------------------------------------------------------------------------
 # 1. CONFIGURAÇÕES DA APLICAÇÃO
@@ -29,6 +41,11 @@ class ConfigApp:
     PAGE_TITLE: str = "CECOM/CREDE 01 - Painel de Resultados"
     PAGE_ICON: str = "painel_cecom.png"
     LAYOUT: str = "wide"
+    LOGO_SIDEBAR: str = "painel_cecom.png"
+    LARGURA_ICONE: int = 64
+    LARGURA_SIDEBAR: int = 300
+    # Imagens guardadas com o dobro da largura exibida (telas de alta densidade)
+    ESCALA_IMAGENS: int = 2
 
 # Instância global da configuração
 config = ConfigApp()
@@ -41,7 +58,7 @@ def configurar_pagina():
     """Configura a página do Streamlit"""
     st.set_page_config(
         page_title=config.PAGE_TITLE,
-        page_icon=config.PAGE_ICON,
+        page_icon=carregar_imagem(config.PAGE_ICON, config.LARGURA_ICONE) or config.PAGE_ICON,
         layout=config.LAYOUT,
         initial_sidebar_state="expanded"
     )
@@ -51,6 +68,7 @@ def inicializar_sessao():
     session_defaults = {
         'authenticated': False,
         'codigo': None,
+        'perfil': None,
         'dados_cache': {}
     }
     
@@ -58,6 +76,27 @@ def inicializar_sessao():
         if key not in st.session_state:
             st.session_state[key] = value
 
+@st.cache_resource(show_spinner=False)
+def carregar_imagem(caminho: str, largura: int) -> Optional[bytes]:
+    """
+    Lê, reduz e codifica uma imagem uma vez por processo
+
+    Os logos originais têm milhares de pixels de largura; a versão reduzida
+    (largura exibida x ESCALA_IMAGENS) é compartilhada por todas as sessões.
+
+    Returns:
+        PNG reduzido, ou None se o arquivo não existir ou não puder ser lido
+    """
+    try:
+        with Image.open(caminho) as imagem:
+            imagem.thumbnail((largura * config.ESCALA_IMAGENS, imagem.height), Image.Resampling.LANCZOS)
+            buffer = io.BytesIO()
+            imagem.save(buffer, format="PNG", optimize=True)
+    except OSError as e:
+        logging.warning(f"Imagem {caminho} indisponível: {e!r}")
+        return None
+    return buffer.getvalue()
+
 def exibir_logos():
     """Exibe os logos institucionais"""
     logos = [
@@ -70,15 +109,23 @@ def exibir_logos():
     
     for i, (logo, width) in enumerate(logos):
         with cols[i]:
-            if Path(logo).exists():
-                st.image(logo, width=width)
+            imagem = carregar_imagem(logo, width)
+            if imagem is not None:
+                st.image(imagem, width=width)
             else:
                 st.warning(f"Logo {logo} não encontrado")
     
     # Logo adicional na última coluna
     with cols[2]:
-        if Path("cecom.png").exists():
-            st.image("cecom.png", width=100)
+        imagem = carregar_imagem("cecom.png", 100)
+        if imagem is not None:
+            st.image(imagem, width=100)
+
+def exibir_logo_sidebar():
+    """Exibe o logo do painel no topo da barra lateral"""
+    imagem = carregar_imagem(config.LOGO_SIDEBAR, config.LARGURA_SIDEBAR)
+    if imagem is not None:
+        st.sidebar.image(imagem)
 
 def carregar_credenciais() -> Tuple[Dict, Dict, str, str]:
     """Carrega credenciais de forma segura"""
@@ -94,108 +141,38 @@ def carregar_credenciais() -> Tuple[Dict, Dict, str, str]:
         st.error(f" Erro na configuração: {e}. Verifique o arquivo secrets.toml")
         st.stop()
 
+@st.cache_resource(show_spinner=False)
+def carregar_repositorio_credenciais() -> RepositorioCredenciais:
+    """Monta o índice de credenciais uma vez por processo (senhas apenas em hash)"""
+    usuarios, escolas, _, _ = carregar_credenciais()
+    return RepositorioCredenciais.de_secrets(usuarios, escolas)
+
 # --------------------------------------------------------------------------
 # 3. CLASSES DE DADOS (MOVED TO payloads.py)
 # --------------------------------------------------------------------------
 
 # --------------------------------------------------------------------------
-# 4. CLASSE PARA API
+# 4. CLASSE PARA API (MOVED TO cliente_api.py)
 # --------------------------------------------------------------------------
 
-class APIClient:
-    """Cliente para comunicação com a API"""
+class APIClientPainel(APIClient):
+    """APIClient (cliente_api.py) que também exibe as falhas na interface"""
     
-    def __init__(self, base_url: str = config_api.API_URL, timeout: int = config_api.REQUEST_TIMEOUT):
-        self.base_url = base_url
-        self.timeout = timeout
-        self.headers = {"Content-Type": "application/json"}
+    def requisitar_dados(self, payload: Dict) -> Optional[Dict]:
+        with st.spinner("Carregando dados..."):
+            return super().requisitar_dados(payload)
     
-    @st.cache_data(ttl=300)  # Cache por 5 minutos
-    def requisitar_dados(_self, payload: Dict) -> Optional[Dict]:
-        """
-        Faz requisição para a API com cache e tratamento de erros robusto
-        
-        Args:
-            payload: Dados da requisição
-            
-        Returns:
-            Resposta da API ou None em caso de erro
-        """
-        try:
-            with st.spinner("Carregando dados..."):
-                response = requests.post(
-                    _self.base_url, 
-                    json=payload, 
-                    headers=_self.headers, 
-                    timeout=_self.timeout
-                )
-                response.raise_for_status()
-                return response.json()
-                
-        except requests.exceptions.Timeout:
-            st.error("⏱Tempo limite esgotado. Tente novamente.")
-        except requests.exceptions.ConnectionError:
-            st.error("Erro de conexão. Verifique sua internet.")
-        except requests.exceptions.HTTPError as e:
-            st.error(f"Erro HTTP {response.status_code}: {e}")
-        except requests.exceptions.RequestException as e:
-            st.error(f"Erro na requisição: {e}")
-        except Exception as e:
-            st.error(f"Erro inesperado: {e}")
-            
-        return None
+    def _notificar(self, nivel: int, mensagem: str):
+        super()._notificar(nivel, mensagem)
+        if nivel >= logging.ERROR:
+            st.error(mensagem)
+        else:
+            st.warning(mensagem)
 
 # --------------------------------------------------------------------------
-# 5. PROCESSAMENTO DE DADOS
+# 5. PROCESSAMENTO DE DADOS (MOVED TO processamento_dados.py)
 # --------------------------------------------------------------------------
 
-class ProcessadorDados:
-    """Classe para processar dados da API"""
-    
-    @staticmethod
-    def processar_dados_gerais(resposta: Dict, ciclo_label: str) -> Optional[pd.DataFrame]:
-        """Processa dados gerais da API"""
-        if not resposta or "result" not in resposta or not resposta["result"]:
-            return None
-            
-        df = pd.DataFrame(resposta["result"])
-        if df.empty:
-            return None
-            
-        # Adicionar ciclo e converter colunas numéricas
-        df["Ciclo"] = ciclo_label
-        colunas_numericas = ['TX_ACERTOS', 'AVG_PROFICIENCIA_E1', 'TX_PARTICIPACAO', 'QT_ALUNO_PREVISTO', 'QT_ALUNO_EFETIVO', 'NU_N01_TRI_E1', 'NU_N02_TRI_E1', 'NU_N03_TRI_E1']
-        
-        for col in colunas_numericas:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-        
-        # Limpar nome da etapa
-        if 'VL_FILTRO_ETAPA' in df.columns:
-            df['VL_FILTRO_ETAPA'] = df['VL_FILTRO_ETAPA'].str.replace('ENSINO FUNDAMENTAL DE 9 ANOS - ', '')
-        
-        return df
-    
-    @staticmethod
-    def processar_dados_habilidades(resposta: Dict, ciclo_label: str) -> Optional[pd.DataFrame]:
-        """Processa dados de habilidades da API"""
-        if not resposta or "result" not in resposta or not resposta["result"]:
-            return None
-            
-        df = pd.DataFrame(resposta["result"])
-        if df.empty:
-            return None
-            
-        # Adicionar ciclo e converter colunas numéricas
-        df["Ciclo"] = ciclo_label
-        df['TX_ACERTO'] = pd.to_numeric(df['TX_ACERTO'], errors='coerce')
-        
-        # Limpar nome da etapa
-        if 'VL_FILTRO_ETAPA' in df.columns:
-            df['VL_FILTRO_ETAPA'] = df['VL_FILTRO_ETAPA'].str.replace('ENSINO FUNDAMENTAL DE 9 ANOS - ', '')
-        
-        return df
-
 # --------------------------------------------------------------------------
 # 6. AUTENTICAÇÃO
 # --------------------------------------------------------------------------
@@ -203,14 +180,12 @@ class ProcessadorDados:
 class GerenciadorAuth:
     """Gerenciador de autenticação"""
     
-    def __init__(self, usuarios: Dict, escolas: Dict):
-        self.usuarios = usuarios
-        self.escolas = escolas
-        self.todos_usuarios = {**usuarios, **escolas}
+    def __init__(self, credenciais: RepositorioCredenciais):
+        self.credenciais = credenciais
     
     def renderizar_login(self):
         """Renderiza interface de login"""
-        st.sidebar.image("painel_cecom.png")
+        exibir_logo_sidebar()
         st.sidebar.title("🔐 Autenticação")
         
         with st.sidebar.form("login_form"):
@@ -219,21 +194,23 @@ class GerenciadorAuth:
             submitted = st.form_submit_button("🚪 Entrar", use_container_width=True)
             
             if submitted:
-                if self._validar_credenciais(codigo_input, senha_input):
+                perfil = self._validar_credenciais(codigo_input, senha_input)
+                if perfil is not None:
                     st.session_state.authenticated = True
                     st.session_state.codigo = codigo_input
+                    st.session_state.perfil = perfil
                     st.sidebar.success("Login realizado com sucesso!")
                     st.rerun()
                 else:
                     st.sidebar.error("Código ou senha inválidos.")
     
-    def _validar_credenciais(self, codigo: str, senha: str) -> bool:
-        """Valida credenciais do usuário"""
-        return codigo in self.todos_usuarios and self.todos_usuarios[codigo] == senha
+    def _validar_credenciais(self, codigo: str, senha: str) -> Optional[PerfilUsuario]:
+        """Valida credenciais do usuário e retorna o perfil (None se inválidas)"""
+        return self.credenciais.autenticar(codigo, senha)
     
     def renderizar_sidebar_logado(self):
         """Renderiza sidebar para usuário autenticado"""
-        st.sidebar.image("painel_cecom.png")
+        exibir_logo_sidebar()
         with st.sidebar.expander("Usuário Logado", expanded=True):
             codigo = st.session_state.codigo
             tipo_usuario = self._determinar_tipo_usuario(codigo)
@@ -244,199 +221,56 @@ class GerenciadorAuth:
             if st.button("Sair", use_container_width=True):
                 self._fazer_logout()
     
-    def _determinar_tipo_usuario(self, codigo: str) -> dict:
-        """Determina o tipo de usuário baseado no código"""
-
-        if codigo in self.usuarios:
-            return "Municipal"
-        elif codigo in config_api.ESCOLAS_INDIGENAS:
-            return "Escola Indígena"
-
+    def _determinar_tipo_usuario(self, codigo: str) -> Optional[str]:
+        """Determina o tipo de usuário a partir do perfil já indexado"""
+        perfil = st.session_state.get('perfil') or self.credenciais.perfil(codigo)
+        return perfil.tipo if perfil is not None else None
     
     def _fazer_logout(self):
         """Realiza logout do usuário"""
         st.session_state.authenticated = False
         st.session_state.codigo = None
+        st.session_state.perfil = None
         st.session_state.dados_cache = {}
         st.rerun()
 
 # --------------------------------------------------------------------------
-# 7. VISUALIZAÇÕES
+# 7. VISUALIZAÇÕES (MOVED TO graficos.py)
 # --------------------------------------------------------------------------
 
-class GeradorGraficos:
-    """Classe para gerar gráficos e visualizações"""
-    
-    @staticmethod
-    def criar_grafico_habilidades(df_habilidades: pd.DataFrame) -> go.Figure:
-        """Cria gráfico de barras para habilidades"""
-        if df_habilidades.empty:
-            return None
-        # Ordenar os ciclos na ordem desejada (2º Ciclo à direita)
-        # Invertemos a ordem das categorias para que o 2º Ciclo apareça à direita
-        df_habilidades['Ciclo'] = pd.Categorical(df_habilidades['Ciclo'], 
-                                               categories=["2º Ciclo", "1º Ciclo"],
-                                               ordered=True)
-        fig = px.bar(
-            df_habilidades,
-            x='DC_HABILIDADE',
-            y='TX_ACERTO',
-            title='Taxa de Acertos por Habilidades por Ciclo',
-            text=df_habilidades['TX_ACERTO'].round(1),
-            color='Ciclo',
-            color_discrete_map={"2º Ciclo": "#228B22", "1º Ciclo": "#20ac52"},
-            labels={
-                'TX_ACERTO': 'Taxa de Acertos (%)', 
-                'Ciclo': 'Ciclo de Avaliação',
-                'DC_HABILIDADE': 'Habilidade'
-            },
-            hover_data=['CD_HABILIDADE'],
-            range_y=[0, 109],
-            # Definir explicitamente a ordem das categorias na legenda
-            category_orders={"Ciclo": ["1º Ciclo", "2º Ciclo"]}
-        )
-        
-        # Personalizações
-        fig.update_traces(
-            textfont=dict(size=18),
-            textposition='outside',
-            hovertemplate="<b>Habilidade:</b> %{customdata[0]}<br>" +
-                         "<b>Taxa de Acerto:</b> %{y:.1f}%<br>" +
-                         "<b>Descrição:</b> %{x}<br>" +
-                         "<extra></extra>",
-            hoverlabel=dict(font_size=14)
-        )
-        
-        fig.update_layout(
-            showlegend=True,
-            barmode='group',
-            yaxis=dict(dtick=10, title_font=dict(size=14), tickfont=dict(size=12)),
-            xaxis=dict(showticklabels=False, title_font=dict(size=14)),
-            height=400
-        )
-        
-        return fig
-    
-    @staticmethod
-    def criar_gauge_participacao(valor: float, cor: str) -> go.Figure:
-        """Cria gráfico gauge para participação"""
-        fig = go.Figure(go.Indicator(
-            mode="gauge+number",
-            value=valor,
-            number={'suffix': '%'},
-            gauge={
-                'axis': {'range': [0, 100]},
-                'bar': {'color': cor},
-                'steps': [
-                    {'range': [0, 80], 'color': "#f5d7d7"},
-                    {'range': [80, 90], 'color': "#f5eed7"},
-                    {'range': [90, 100], 'color': "#d7f5df"}
-                ],
-                'threshold': {
-                    'line': {'color': "#454545", 'width': 4},
-                    'thickness': 0.85,
-                    'value': valor
-                }
-            }
-        ))
-        
-        fig.update_layout(height=200, margin=dict(l=10, r=10, t=30, b=10))
-        return fig
-    
-    @staticmethod
-    def criar_grafico_evolucao_niveis(df_geral: pd.DataFrame) -> go.Figure:
-        """Cria gráfico de evolução dos níveis em barras horizontais"""
-        if df_geral.empty:
-            return None
-        
-        # Garantir que as colunas sejam numéricas
-        colunas_niveis = ['NU_N01_TRI_E1', 'NU_N02_TRI_E1', 'NU_N03_TRI_E1']
-        for col in colunas_niveis:
-            if col in df_geral.columns:
-                df_geral[col] = pd.to_numeric(df_geral[col], errors='coerce')
-        
-        # Agrupar por ciclo e calcular médias para evitar duplicatas
-        # Verificar quais colunas de níveis existem
-        colunas_niveis_disponiveis = [col for col in ['NU_N01_TRI_E1', 'NU_N02_TRI_E1', 'NU_N03_TRI_E1'] if col in df_geral.columns]
-        
-        if colunas_niveis_disponiveis:
-            agg_dict = {col: 'mean' for col in colunas_niveis_disponiveis}
-            df_agrupado = df_geral.groupby('Ciclo').agg(agg_dict).reset_index()
-        else:
-            # Se nenhuma coluna de níveis existir, criar DataFrame vazio
-            df_agrupado = df_geral.groupby('Ciclo').agg({}).reset_index()
-        
-        # Ordenar pelos ciclos
-        ordem_ciclos = ["2º Ciclo", "1º Ciclo"]
-        df_agrupado['Ciclo'] = pd.Categorical(df_agrupado['Ciclo'], categories=ordem_ciclos, ordered=True)
-        df_agrupado = df_agrupado.sort_values('Ciclo')
-        
-        fig = go.Figure()
-        
-        # Configurações das barras
-        barras_config = [
-            ('NU_N01_TRI_E1', 'Defasagem', '#FF4444'),
-            ('NU_N02_TRI_E1', 'Aprendizado Intermediário', '#FFA500'),
-            ('NU_N03_TRI_E1', 'Aprendizado Adequado', '#32CD32')
-        ]
-        
-        for coluna, nome, cor in barras_config:
-            if coluna in df_agrupado.columns:
-                valores = df_agrupado[coluna].fillna(0)
-                
-                fig.add_trace(go.Bar(
-                    y=df_agrupado['Ciclo'].astype(str),  # eixo Y (categorias)
-                    x=valores,                           # valores no eixo X
-                    name=nome,
-                    orientation='h',                     # barras horizontais
-                    marker=dict(color=cor),
-                    text=[f"{v:.0f}" for v in valores], # labels com %
-                    textposition='inside',
-                    hovertemplate=f"<b>{nome}</b><br>" +
-                                "Ciclo: %{y}<br>" +
-                                "Quantidade de Estudantes: %{x:.1f}<br>" +
-                                "<extra></extra>"
-                ))
-                
-                fig.update_layout(
-                    barmode='stack',  # barras lado a lado
-                    title=dict(
-                        text='Evolução dos Níveis de Aprendizagem',
-                        font=dict(size=18),
-                        x=0.5
-                    ),
-                    xaxis=dict(
-                        title='Quantidade de Estudantes',
-                        tickfont=dict(size=16)
-                    ),
-                    yaxis=dict(
-                        title='Ciclo',
-                        tickfont=dict(size=16)
-                    ),
-                    legend=dict(font=dict(size=18)),
-                    bargap=0.3
-                )
-                # aumentar tamanho dos rótulos
-                fig.update_traces(
-                    textfont=dict(size=20),
-                    textposition='inside'
-                )
-        
-        return fig
-
 # --------------------------------------------------------------------------
 # 8. INTERFACE PRINCIPAL
 # --------------------------------------------------------------------------
 
 class PainelResultados:
-    """Classe principal do painel"""
+    """
+    Classe principal do painel
+    
+    Uma instância por processo (ver obter_painel): guarda apenas dependências
+    de longa duração, como credenciais da API, índice de logins e pool de
+    conexões. Tudo o que é da sessão do usuário fica em st.session_state.
+    """
     
     def __init__(self):
-        self.usuarios, self.escolas, self.installation_id, self.session_token = carregar_credenciais()
-        self.auth_manager = GerenciadorAuth(self.usuarios, self.escolas)
-        self.api_client = APIClient()
+        _, _, self.installation_id, self.session_token = carregar_credenciais()
+        self.auth_manager = GerenciadorAuth(carregar_repositorio_credenciais())
+        self.api_client = APIClientPainel()
         self.processador = ProcessadorDados()
         self.gerador_graficos = GeradorGraficos()
+        
+        # Com o serviço de consultas configurado, os dados vêm dele em vez da API
+        self.cliente_servico = None
+        if config_api.URL_SERVICO_CONSULTAS:
+            self.cliente_servico = ClienteServicoConsultas(config_api.URL_SERVICO_CONSULTAS,
+                                                           st.secrets.get("servico", {}).get("token"))
+    
+    def encerrar(self):
+        """Libera os recursos do processo: conexões e pools de consultas em segundo plano"""
+        self.api_client.fechar()
+        if self.cliente_servico is not None:
+            self.cliente_servico.fechar()
+        agendador_consultas.encerrar()
+        prefetcher_consultas.encerrar()
     
     def executar(self):
         """Executa a aplicação principal"""
@@ -498,94 +332,270 @@ O painel foi pensado para aproximar os dados da prática pedagógica, fortalecen
         )
         
         # Buscar e processar dados
-        dados_gerais, dados_habilidades = self._buscar_dados(
+        conjunto = self._buscar_dados(
             entidade_input, selecao_componente, selecao_etapa, nivel_atual
         )
         
-        if dados_gerais or dados_habilidades:
-            self._exibir_resultados(dados_gerais, dados_habilidades)
+        if not conjunto.vazio:
+            self._exibir_resultados(conjunto)
+            
+            # Próxima seleção provável já sai do cache
+            self._agendar_prefetch(entidade_input, selecao_componente, selecao_etapa, nivel_atual)
         else:
             st.error("Nenhum dado encontrado para os filtros selecionados.")
+        
+        if entidade_input in config_api.CODIGOS_ADMINISTRACAO:
+            self._renderizar_administracao()
     
-    def _buscar_dados(self, entidade: str, componente: str, etapa: int, nivel_agregacao: int) -> Tuple[List[pd.DataFrame], List[pd.DataFrame]]:
+    def _buscar_dados(self, entidade: str, componente: str, etapa: int, nivel_agregacao: int) -> ConjuntoDados:
         """Busca dados da API para todos os ciclos com nível de agregação específico"""
+        chave_consulta = (entidade, componente, etapa, nivel_agregacao)
+        
+        # Reruns com os mesmos filtros (ex.: widgets de ranking) não tocam nos dados brutos
+        id_sessao = id_sessao_atual()
+        conjunto = cache_conjuntos.obter(chave_consulta, id_sessao)
+        if conjunto is not None:
+            return conjunto
+        
+        if self.cliente_servico is not None:
+            return self._buscar_no_servico(chave_consulta, id_sessao)
+        
+        # Já consolidada por outro processo: mapeia do armazém compartilhado, sem a API
+        conjunto = armazem_conjuntos.carregar(chave_consulta)
+        if conjunto is not None:
+            cache_conjuntos.guardar(chave_consulta, conjunto, id_sessao, origem="armazém")
+            return conjunto
+        
         dados_gerais_coletados = []
         dados_habilidades_coletados = []
+        respostas = []
+        
+        payloads = self._montar_payloads(entidade, componente, etapa, nivel_agregacao)
+        
+        # Requisições em segundo plano; uma nova seleção cancela as pendentes desta
+        futuros = agendador_consultas.agendar(
+            id_sessao, chave_consulta,
+            {nome: self.api_client.agendar_requisicao(payload) for nome, payload in payloads.items()}
+        )
+        self._aguardar_consultas(futuros)
         
         for ciclo_key, ciclo_label in dict(config_api.CICLOS).items():
             # Dados gerais
-            payload_geral = criar_payload_geral(
-                entidade, componente, etapa, ciclo_key, 
-                self.installation_id, self.session_token, nivel_agregacao
-            )
-            
-            resposta_geral = self.api_client.requisitar_dados(payload_geral)
+            nome = ("geral", ciclo_key)
+            resposta_geral = self.api_client.resolver_requisicao(payloads[nome], futuros[nome].result)
+            respostas.append(resposta_geral)
             df_geral = self.processador.processar_dados_gerais(resposta_geral, ciclo_label)
             
             if df_geral is not None:
                 dados_gerais_coletados.append(df_geral)
             
             # Dados de habilidades
-            payload_habilidades = criar_payload_habilidades(
-                entidade, componente, etapa, ciclo_key,
-                self.installation_id, self.session_token, nivel_agregacao
-            )
-            
-            resposta_habilidades = self.api_client.requisitar_dados(payload_habilidades)
+            nome = ("habilidades", ciclo_key)
+            resposta_habilidades = self.api_client.resolver_requisicao(payloads[nome], futuros[nome].result)
+            respostas.append(resposta_habilidades)
             df_habilidades = self.processador.processar_dados_habilidades(resposta_habilidades, ciclo_label)
             
             if df_habilidades is not None:
                 dados_habilidades_coletados.append(df_habilidades)
         
-        return dados_gerais_coletados, dados_habilidades_coletados
+        agendador_consultas.concluir(id_sessao, chave_consulta)
+        self._exibir_aviso_contingencia(respostas)
+        
+        contingencia = any(r and CHAVE_CONTINGENCIA in r for r in respostas)
+        conjunto = self.processador.montar_conjunto(dados_gerais_coletados, dados_habilidades_coletados, contingencia)
+        
+        # Só guarda consultas completas e atualizadas
+        if all(respostas) and not contingencia:
+            cache_conjuntos.guardar(chave_consulta, conjunto, id_sessao)
+            armazem_conjuntos.publicar(chave_consulta, conjunto)
+        
+        return conjunto
+    
+    def _buscar_no_servico(self, chave_consulta: Tuple[str, str, int, int], id_sessao: str) -> ConjuntoDados:
+        """Busca a consulta no serviço de consultas (cache e cota da API compartilhados)"""
+        try:
+            with st.spinner("Carregando dados..."):
+                conjunto = self.cliente_servico.conjunto(chave_consulta)
+        except requests.exceptions.RequestException as e:
+            st.error(f"Erro ao consultar o serviço de resultados: {e}")
+            return self.processador.montar_conjunto([], [])
+        
+        if conjunto.contingencia:
+            st.warning("⚠️ **API de resultados instável.** Exibindo os últimos dados disponíveis.")
+        else:
+            cache_conjuntos.guardar(chave_consulta, conjunto, id_sessao, origem="serviço")
+        return conjunto
+    
+    def _montar_payloads(self, entidade: str, componente: str, etapa: int, nivel_agregacao: int) -> Dict[Tuple[str, str], Dict]:
+        """Monta os payloads gerais e de habilidades de todos os ciclos"""
+        payloads = {}
+        for ciclo_key in dict(config_api.CICLOS):
+            payloads[("geral", ciclo_key)] = criar_payload_geral(
+                entidade, componente, etapa, ciclo_key, 
+                self.installation_id, self.session_token, nivel_agregacao
+            )
+            payloads[("habilidades", ciclo_key)] = criar_payload_habilidades(
+                entidade, componente, etapa, ciclo_key,
+                self.installation_id, self.session_token, nivel_agregacao
+            )
+        return payloads
+    
+    def _agendar_prefetch(self, entidade: str, componente: str, etapa: int, nivel_agregacao: int):
+        """Aquece em segundo plano o cache das combinações vizinhas à seleção atual"""
+        id_sessao = id_sessao_atual()
+        candidatos = {}
+        for componente_vizinho, etapa_vizinha in combinacoes_vizinhas(componente, etapa):
+            chave = (entidade, componente_vizinho, etapa_vizinha, nivel_agregacao)
+            if chave not in cache_conjuntos:
+                candidatos[chave] = partial(self._aquecer_cache, chave, id_sessao)
+        
+        prefetcher_consultas.agendar(id_sessao, candidatos)
+    
+    def _aquecer_cache(self, chave_consulta: Tuple[str, str, int, int], id_sessao: str):
+        """Busca e consolida uma consulta apenas para popular os caches (sem interface)"""
+        if self.cliente_servico is not None:
+            conjunto = self.cliente_servico.conjunto(chave_consulta)
+            if not conjunto.contingencia:
+                cache_conjuntos.guardar(chave_consulta, conjunto, id_sessao, origem="prefetch")
+            return
+        
+        conjunto = armazem_conjuntos.carregar(chave_consulta)
+        if conjunto is None:
+            payloads = self._montar_payloads(*chave_consulta)
+            respostas = {nome: self.api_client.agendar_requisicao(payload)() for nome, payload in payloads.items()}
+            conjunto = self.processador.conjunto_de_respostas(respostas)
+            armazem_conjuntos.publicar(chave_consulta, conjunto)
+        
+        cache_conjuntos.guardar(chave_consulta, conjunto, id_sessao, origem="prefetch")
     
-    def _renderizar_nivel_municipio(self, df_geral: pd.DataFrame, df_habilidades: pd.DataFrame):
+    def _aguardar_consultas(self, futuros: Dict):
+        """
+        Aguarda as requisições agendadas exibindo o progresso
+        
+        Cada atualização da barra é um ponto de interrupção do Streamlit: se o
+        usuário trocar um filtro, este rerun é abandonado sem esperar a rede.
+        """
+        pendentes = set(futuros.values())
+        total = len(pendentes)
+        
+        # Respostas já em cache retornam quase imediatamente: evita piscar a barra
+        _, pendentes = wait(pendentes, timeout=config_api.INTERVALO_VERIFICACAO_CONSULTAS)
+        if not pendentes:
+            return
+        
+        barra = st.progress(0.0, text="Carregando dados...")
+        while pendentes:
+            _, pendentes = wait(pendentes, timeout=config_api.INTERVALO_VERIFICACAO_CONSULTAS, return_when=FIRST_COMPLETED)
+            concluidas = total - len(pendentes)
+            barra.progress(concluidas / total, text=f"Carregando dados... ({concluidas}/{total})")
+        barra.empty()
+    
+    def _renderizar_administracao(self):
+        """Memória dos conjuntos em cache: o que está residente, de quem e o que foi descartado"""
+        with st.expander("🛠️ Administração - memória do processo"):
+            mb = 1024 * 1024
+            id_sessao = id_sessao_atual()
+            uso_sessoes = cache_conjuntos.uso_por_sessao()
+            
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Conjuntos em cache", f"{cache_conjuntos.uso_total() / mb:.2f} MB",
+                        help=f"Orçamento do processo: {cache_conjuntos.max_bytes / mb:.0f} MB")
+            col2.metric("Desta sessão", f"{uso_sessoes.get(id_sessao, 0) / mb:.2f} MB",
+                        help=f"Orçamento por sessão: {cache_conjuntos.max_bytes_sessao / mb:.0f} MB")
+            col3.metric("Sessões com dados em cache", len(uso_sessoes))
+            
+            def nome_sessao(sessao: str) -> str:
+                return "esta sessão" if sessao == id_sessao else sessao[:8]
+            
+            residentes = cache_conjuntos.itens_residentes()
+            if residentes:
+                st.markdown("**Residentes** (do uso mais recente ao mais antigo; os últimos são os próximos descartados)")
+                st.dataframe(pd.DataFrame([{
+                    "Consulta": " / ".join(map(str, item["chave"])),
+                    "MB": round(item["bytes"] / mb, 2),
+                    "Sessão": nome_sessao(item["sessao"]),
+                    "Origem": item["origem"],
+                    "Acessos": item["acessos"],
+                    "Ocioso (s)": round(item["ocioso_s"]),
+                    "Expira em (s)": round(item["expira_em_s"]),
+                } for item in residentes]), hide_index=True, use_container_width=True)
+            
+            descartes = cache_conjuntos.descartes_recentes()
+            if descartes:
+                st.markdown("**Descartes recentes**")
+                st.dataframe(pd.DataFrame([{
+                    "Horário": item["horario"].strftime("%H:%M:%S"),
+                    "Consulta": " / ".join(map(str, item["chave"])),
+                    "MB": round(item["bytes"] / mb, 2),
+                    "Sessão": nome_sessao(item["sessao"]),
+                    "Motivo": item["motivo"],
+                } for item in descartes]), hide_index=True, use_container_width=True)
+            
+            if st.button("Limpar caches de dados do processo"):
+                cache_conjuntos.limpar()
+                cache_respostas.limpar()
+                st.rerun()
+    
+    def _exibir_aviso_contingencia(self, respostas: List[Optional[Dict]]):
+        """Exibe um aviso único quando a API está degradada ou os dados vêm da contingência"""
+        coletas = [r[CHAVE_CONTINGENCIA] for r in respostas if r and CHAVE_CONTINGENCIA in r]
+        
+        if coletas:
+            horario = datetime.fromtimestamp(min(coletas)).strftime("%d/%m/%Y %H:%M")
+            st.warning(f"⚠️ **API de resultados instável.** Exibindo os últimos dados disponíveis, obtidos em {horario}.")
+        elif circuit_breaker.estado != circuit_breaker.FECHADO:
+            espera = circuit_breaker.segundos_para_nova_tentativa()
+            st.warning(f"⚠️ **API de resultados indisponível no momento.** Nova tentativa automática em {espera:.0f} segundos.")
+    
+    def _renderizar_nivel_municipio(self, conjunto: ConjuntoDados):
         """Renderiza interface para nível Município"""
         # Exibir métricas básicas
-        if not df_geral.empty:
-            self._exibir_metricas_basicas(df_geral)
+        if not conjunto.geral.empty:
+            self._exibir_metricas_basicas(conjunto.geral)
             st.divider()
         
         # Exibir tabelas
-        # self._exibir_tabelas_dados(df_geral, df_habilidades)
+        # self._exibir_tabelas_dados(conjunto.geral, conjunto.habilidades)
         
         # Exibir gráficos
-        self._exibir_graficos(df_geral, df_habilidades)
+        self._exibir_graficos(conjunto)
         
         # Análise top 5
-        if not df_habilidades.empty:
-            self._exibir_analise_top5(df_habilidades)
+        if not conjunto.habilidades.empty:
+            self._exibir_analise_top5(conjunto)
     
-    def _renderizar_nivel_escola(self, df_geral: pd.DataFrame, df_habilidades: pd.DataFrame):
+    def _renderizar_nivel_escola(self, conjunto: ConjuntoDados):
         """Renderiza interface para nível Escola"""
         # Ranking de escolas
-        escola_selecionada = gerenciador_ranking.renderizar_ranking_escolas(df_geral, df_habilidades)
+        escola_selecionada = gerenciador_ranking.renderizar_ranking_escolas(conjunto.geral, conjunto.habilidades, conjunto.variacoes)
         
         if escola_selecionada:
             st.divider()
             st.subheader(f"📊 Análise Detalhada da Escola Selecionada")
             
-            # Filtrar dados da escola selecionada
-            df_escola = df_geral[df_geral['CD_ENTIDADE'] == escola_selecionada]
-            df_habilidades_escola = df_habilidades[df_habilidades['CD_ENTIDADE'] == escola_selecionada] if not df_habilidades.empty else pd.DataFrame()
+            # Dados da escola selecionada
+            conjunto_escola = conjunto.entidade('CD_ENTIDADE', escola_selecionada)
             
             # Exibir métricas da escola
-            if not df_escola.empty:
-                self._exibir_metricas_basicas(df_escola)
+            if not conjunto_escola.geral.empty:
+                self._exibir_metricas_basicas(conjunto_escola.geral)
                 st.divider()
             
             # Exibir tabelas da escola
-            # self._exibir_tabelas_dados(df_escola, df_habilidades_escola)
+            # self._exibir_tabelas_dados(conjunto_escola.geral, conjunto_escola.habilidades)
             
             # Exibir gráficos da escola
-            self._exibir_graficos(df_escola, df_habilidades_escola)
+            self._exibir_graficos(conjunto_escola)
             
             # Análise top 5 da escola
-            if not df_habilidades_escola.empty:
-                self._exibir_analise_top5(df_habilidades_escola)
+            if not conjunto_escola.habilidades.empty:
+                self._exibir_analise_top5(conjunto_escola)
     
-    def _renderizar_nivel_turma(self, df_geral: pd.DataFrame, df_habilidades: pd.DataFrame):
+    def _renderizar_nivel_turma(self, conjunto: ConjuntoDados):
         """Renderiza interface para nível Turma"""
+        df_geral = conjunto.geral
+        df_habilidades = conjunto.habilidades
+        
         # Ranking municipal de turmas
         st.subheader("🏆 Ranking Municipal de Turmas")
         
@@ -597,7 +607,7 @@ O painel foi pensado para aproximar os dados da prática pedagógica, fortalecen
             criterio_ranking_municipal = gerenciador_ranking._renderizar_seletor_criterio_ranking(df_habilidades, "turmas_municipais")
             
             # Calcular métricas de todas as turmas do município
-            metricas_turmas_municipais = gerenciador_ranking._calcular_metricas_turmas_municipais(df_geral, df_habilidades, criterio_ranking_municipal)
+            metricas_turmas_municipais = gerenciador_ranking._calcular_metricas_turmas_municipais(df_geral, df_habilidades, criterio_ranking_municipal, conjunto.variacoes)
             
             if not metricas_turmas_municipais.empty:
                 # Exibir ranking municipal de turmas
@@ -611,9 +621,9 @@ O painel foi pensado para aproximar os dados da prática pedagógica, fortalecen
         st.subheader("🏫 Seleção de Escola")
         
         # Obter lista de escolas disponíveis
-        if 'CD_ENTIDADE' in df_geral.columns and 'NM_INSTITUICAO' in df_geral.columns:
-            escolas_disponiveis = df_geral[['CD_ENTIDADE', 'NM_INSTITUICAO']].drop_duplicates()
-            opcoes_escola = [f"{row['CD_ENTIDADE']} - {row['NM_INSTITUICAO']}" for _, row in escolas_disponiveis.iterrows()]
+        escolas_disponiveis = conjunto.dimensoes.get('entidade')
+        if escolas_disponiveis is not None and 'NM_INSTITUICAO' in escolas_disponiveis.columns:
+            opcoes_escola = [f"{codigo} - {nome}" for codigo, nome in escolas_disponiveis['NM_INSTITUICAO'].items()]
             
             escola_selecionada = st.selectbox(
                 "Selecione uma escola:",
@@ -624,50 +634,46 @@ O painel foi pensado para aproximar os dados da prática pedagógica, fortalecen
             if escola_selecionada:
                 codigo_escola = escola_selecionada.split(" - ")[0]
                 
-                # Filtrar dados da escola selecionada
-                df_escola = df_geral[df_geral['CD_ENTIDADE'] == codigo_escola]
+                # Dados da escola selecionada
+                df_escola = conjunto.entidade('CD_ENTIDADE', codigo_escola).geral
                 
                 if not df_escola.empty:
                     st.divider()
                     
                     # Ranking de turmas da escola
-                    turma_selecionada = gerenciador_ranking.renderizar_ranking_turmas(df_escola, codigo_escola, df_habilidades)
+                    turma_selecionada = gerenciador_ranking.renderizar_ranking_turmas(df_escola, codigo_escola, df_habilidades, conjunto.variacoes)
                     
                     if turma_selecionada:
                         st.divider()
                         st.subheader(f"📊 Análise Detalhada da Turma Selecionada")
                         
-                        # Filtrar dados da turma selecionada
-                        df_turma = df_escola[df_escola['CD_TURMA'] == turma_selecionada]
-                        df_habilidades_turma = df_habilidades[df_habilidades['CD_TURMA'] == turma_selecionada] if not df_habilidades.empty else pd.DataFrame()
+                        # Dados da turma selecionada
+                        conjunto_turma = conjunto.entidade('CD_TURMA', turma_selecionada)
                         
                         # Exibir métricas da turma
-                        if not df_turma.empty:
-                            self._exibir_metricas_basicas(df_turma)
+                        if not conjunto_turma.geral.empty:
+                            self._exibir_metricas_basicas(conjunto_turma.geral)
                             st.divider()
                         
                         # Exibir tabelas da turma
-                        # self._exibir_tabelas_dados(df_turma, df_habilidades_turma)
+                        # self._exibir_tabelas_dados(conjunto_turma.geral, conjunto_turma.habilidades)
                         
                         # Exibir gráficos da turma
-                        self._exibir_graficos(df_turma, df_habilidades_turma)
+                        self._exibir_graficos(conjunto_turma)
                         
                         # Análise top 5 da turma
-                        if not df_habilidades_turma.empty:
-                            self._exibir_analise_top5(df_habilidades_turma)
+                        if not conjunto_turma.habilidades.empty:
+                            self._exibir_analise_top5(conjunto_turma)
                 else:
                     st.warning(f"Nenhum dado encontrado para a escola {codigo_escola}")
         else:
             st.warning("Dados de escolas (NM_INSTITUICAO) não disponíveis para seleção.")
     
-    def _verificar_campos_disponiveis(self, dados_gerais: List[pd.DataFrame]):
+    def _verificar_campos_disponiveis(self, df_consolidado: pd.DataFrame):
         """Verifica quais campos estão disponíveis nos dados e exibe avisos se necessário"""
-        if not dados_gerais:
+        if df_consolidado.empty:
             return
         
-        # Consolidar dados para verificar campos
-        df_consolidado = pd.concat(dados_gerais, ignore_index=True)
-        
         # Campos esperados
         campos_esperados = {
             'TX_PARTICIPACAO': 'Taxa de Participação',
@@ -690,7 +696,7 @@ O painel foi pensado para aproximar os dados da prática pedagógica, fortalecen
             st.warning(f"⚠️ **Aviso:** Alguns campos não estão disponíveis no nível de agregação atual: {', '.join(campos_faltando)}. "
                       f"Isso pode ser normal dependendo do nível de agregação selecionado.")
     
-    def _exibir_resultados(self, dados_gerais: List[pd.DataFrame], dados_habilidades: List[pd.DataFrame]):
+    def _exibir_resultados(self, conjunto: ConjuntoDados):
         """Exibe resultados consolidados"""
         # Exibir informações sobre o nível de agregação
         nivel_atual = obter_nivel_atual()
@@ -700,22 +706,23 @@ O painel foi pensado para aproximar os dados da prática pedagógica, fortalecen
         st.info(f"📊 **Nível de Agregação Atual:** {config_nivel_atual['tipo_agregacao']} - {config_nivel_atual['descricao']}")
         
         # Verificar campos disponíveis e exibir avisos se necessário
-        self._verificar_campos_disponiveis(dados_gerais)
+        self._verificar_campos_disponiveis(conjunto.geral)
         
         # Exibir comparação de níveis
         gerenciador_nivel.exibir_comparacao_niveis()
         
-        # Consolidar dados
-        df_geral_consolidado = pd.concat(dados_gerais, ignore_index=True) if dados_gerais else pd.DataFrame()
-        df_habilidades_consolidado = pd.concat(dados_habilidades, ignore_index=True) if dados_habilidades else pd.DataFrame()
-        
         # Renderizar rankings e seletores baseado no nível
         if nivel_atual == 1:  # Nível Escola
-            self._renderizar_nivel_escola(df_geral_consolidado, df_habilidades_consolidado)
+            self._renderizar_nivel_escola(conjunto)
         elif nivel_atual == 2:  # Nível Turma
-            self._renderizar_nivel_turma(df_geral_consolidado, df_habilidades_consolidado)
+            self._renderizar_nivel_turma(conjunto)
         else:  # Nível Município
-            self._renderizar_nivel_municipio(df_geral_consolidado, df_habilidades_consolidado)
+            self._renderizar_nivel_municipio(conjunto)
+        
+        # Exportar dados completos da consulta (todos os ciclos, entidades e habilidades)
+        st.divider()
+        coluna_entidade = {1: 'CD_ENTIDADE', 2: 'CD_TURMA'}.get(nivel_atual)
+        renderizar_exportacao(tabelas_conjunto(conjunto, coluna_entidade), "resultados_avaliece1", "resultados")
     
     def _exibir_metricas_basicas(self, df: pd.DataFrame):
         """Exibe métricas básicas do município/escola"""
@@ -745,8 +752,12 @@ O painel foi pensado para aproximar os dados da prática pedagógica, fortalecen
                     st.write("**Dados de Habilidades Consolidados**")
                     st.dataframe(df_habilidades, use_container_width=True, hide_index=True)
     
-    def _exibir_graficos(self, df_geral: pd.DataFrame, df_habilidades: pd.DataFrame):
+    def _exibir_graficos(self, conjunto: ConjuntoDados):
         """Exibe gráficos principais"""
+        df_geral = conjunto.geral
+        df_habilidades = conjunto.habilidades
+        df_niveis = conjunto.niveis_por_ciclo
+        
         st.subheader("Resultados")
         st.divider()
         
@@ -754,21 +765,20 @@ O painel foi pensado para aproximar os dados da prática pedagógica, fortalecen
         
         with col1:
             if not df_geral.empty:
-                # Calcular médias por ciclo (verificar se a coluna existe)
-                if 'AVG_PROFICIENCIA_E1' in df_geral.columns:
-                    medias = df_geral.groupby('Ciclo')['AVG_PROFICIENCIA_E1'].mean()
-                else:
-                    medias = pd.Series(dtype=float)
+                # Médias por ciclo e variação (verificar se a coluna existe)
+                df_variacoes = conjunto.variacoes.entidades()
                 
                 st.markdown("##### Proficiência Média")
-                for ciclo in ["1º Ciclo", "2º Ciclo"]:
-                    if ciclo in medias.index:
-                        delta = medias[ciclo] - medias.get("1º Ciclo", 0) if ciclo == "2º Ciclo" else None
-                        st.metric(
-                            ciclo, 
-                            f"{medias[ciclo]:.1f}%", 
-                            delta=f"{delta:.1f}%" if delta is not None else None,
-                        )
+                if 'AVG_PROFICIENCIA_E1_C1' in df_variacoes.columns:
+                    resumo = df_variacoes.iloc[0]
+                    for ciclo, coluna in [("1º Ciclo", 'AVG_PROFICIENCIA_E1_C1'), ("2º Ciclo", 'AVG_PROFICIENCIA_E1_C2')]:
+                        if pd.notna(resumo[coluna]):
+                            delta = resumo['DELTA_AVG_PROFICIENCIA_E1'] if ciclo == "2º Ciclo" else None
+                            st.metric(
+                                ciclo, 
+                                f"{resumo[coluna]:.1f}%", 
+                                delta=f"{delta:.1f}%" if pd.notna(delta) else None,
+                            )
         
         with col2:
             if not df_habilidades.empty:
@@ -779,7 +789,7 @@ O painel foi pensado para aproximar os dados da prática pedagógica, fortalecen
         
         # Gráficos de participação
         if not df_geral.empty:
-            self._exibir_participacao(df_geral)
+            self._exibir_participacao(conjunto)
         
         # Gráfico de evolução
         if not df_geral.empty:
@@ -789,11 +799,12 @@ O painel foi pensado para aproximar os dados da prática pedagógica, fortalecen
             # Debug: mostrar dados disponíveis
             if st.checkbox("🔍 Mostrar dados dos níveis (debug)", key="debug_niveis"):
                 st.write("**Dados disponíveis:**")
-                colunas_debug = ['Ciclo', 'NU_N01_TRI_E1', 'NU_N02_TRI_E1', 'NU_N03_TRI_E1']
-                colunas_existentes = [col for col in colunas_debug if col in df_geral.columns]
-                st.dataframe(df_geral[colunas_existentes])
+                colunas_debug = ['Ciclo', 'NU_N01_TRI_E1', 'NU_N02_TRI_E1', 'NU_N03_TRI_E1',
+                                 'PC_N01_TRI_E1', 'PC_N02_TRI_E1', 'PC_N03_TRI_E1']
+                colunas_existentes = [col for col in colunas_debug if col in df_niveis.columns]
+                st.dataframe(df_niveis[colunas_existentes])
             
-            fig_evolucao = self.gerador_graficos.criar_grafico_evolucao_niveis(df_geral)
+            fig_evolucao = self.gerador_graficos.criar_grafico_evolucao_niveis(df_niveis)
             if fig_evolucao:
                 st.plotly_chart(fig_evolucao, use_container_width=True)
                 
@@ -821,7 +832,7 @@ O painel foi pensado para aproximar os dados da prática pedagógica, fortalecen
             else:
                 st.warning("Não foi possível gerar o gráfico de distribuição. Verifique se os dados dos níveis estão disponíveis.")
     
-    def _exibir_participacao(self, df_geral: pd.DataFrame):
+    def _exibir_participacao(self, conjunto: ConjuntoDados):
         """Exibe gráficos de participação"""
         st.markdown("##### Participação dos Estudantes")
         
@@ -829,7 +840,7 @@ O painel foi pensado para aproximar os dados da prática pedagógica, fortalecen
         cores = {"1º Ciclo": "#20ac52", "2º Ciclo": "#228B22"}
         
         for i, ciclo in enumerate(["1º Ciclo", "2º Ciclo"]):
-            df_ciclo = df_geral[df_geral['Ciclo'] == ciclo]
+            df_ciclo = conjunto.geral_ciclo(ciclo)
             
             if not df_ciclo.empty:
                 # Verificar se a coluna de participação existe
@@ -853,38 +864,75 @@ O painel foi pensado para aproximar os dados da prática pedagógica, fortalecen
                     with subcol2:
                         st.metric("Efetivos", f"{efetivos:.0f}")
     
-    def _exibir_analise_top5(self, df_habilidades: pd.DataFrame):
-        """Exibe análise das 5 melhores e piores habilidades"""
+    def _exibir_analise_top5(self, conjunto: ConjuntoDados):
+        """Exibe análise das N melhores e piores habilidades (5 por padrão)"""
         st.divider()
-        st.subheader("Top 5 Habilidades por Desempenho")
+        ranking = conjunto.ranking_habilidades
+        total_habilidades = max(ranking.quantidade(ciclo) for ciclo in ["1º Ciclo", "2º Ciclo"])
+        maximo = max(total_habilidades, 1)
+        
+        # O valor guardado pode passar do máximo do conjunto atual depois de uma troca de filtros
+        quantidade = st.session_state.get("quantidade_top_habilidades", 5)
+        st.session_state["quantidade_top_habilidades"] = min(quantidade, maximo)
+        
+        n = st.number_input(
+            "Quantidade de habilidades por lista",
+            min_value=1,
+            max_value=maximo,
+            key="quantidade_top_habilidades"
+        )
+        st.subheader(f"Top {n} Habilidades por Desempenho")
         
         for ciclo in ["1º Ciclo", "2º Ciclo"]:
             st.markdown(f"##### {ciclo}")
-            df_ciclo = df_habilidades[df_habilidades['Ciclo'] == ciclo]
             
-            if not df_ciclo.empty:
+            if ranking.quantidade(ciclo):
                 col1, col2 = st.columns(2)
                 
                 with col1:
                     st.markdown("**Maiores Desempenhos**")
-                    top_5 = df_ciclo.nlargest(5, 'TX_ACERTO')[['CD_HABILIDADE', 'DC_HABILIDADE', 'TX_ACERTO']]
-                    top_5['TX_ACERTO'] = top_5['TX_ACERTO'].round(1).astype(str) + '%'
-                    st.dataframe(top_5, hide_index=True, use_container_width=True)
+                    st.dataframe(ranking.maiores(ciclo, n), hide_index=True, use_container_width=True)
                     
                 with col2:
                     st.markdown("**Menores Desempenhos**")
-                    bottom_5 = df_ciclo.nsmallest(5, 'TX_ACERTO')[['CD_HABILIDADE', 'DC_HABILIDADE', 'TX_ACERTO']]
-                    bottom_5['TX_ACERTO'] = bottom_5['TX_ACERTO'].round(1).astype(str) + '%'
-                    st.dataframe(bottom_5, hide_index=True, use_container_width=True)
+                    st.dataframe(ranking.menores(ciclo, n), hide_index=True, use_container_width=True)
+        
+        # Variação de cada habilidade avaliada nos dois ciclos
+        df_variacoes = conjunto.variacoes.habilidades().dropna(subset=['DELTA_TX_ACERTO'])
+        
+        if not df_variacoes.empty:
+            st.markdown("##### Evolução entre os Ciclos (2º - 1º Ciclo)")
+            colunas = [col for col in ['CD_HABILIDADE', 'DC_HABILIDADE', 'TX_ACERTO_C1', 'TX_ACERTO_C2', 'DELTA_TX_ACERTO']
+                       if col in df_variacoes.columns]
+            df_exibicao = df_variacoes[colunas].round(1).rename(columns={
+                'TX_ACERTO_C1': '1º Ciclo', 'TX_ACERTO_C2': '2º Ciclo', 'DELTA_TX_ACERTO': 'Variação'
+            })
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.markdown("**Maiores Avanços**")
+                st.dataframe(df_exibicao.head(n), hide_index=True, use_container_width=True)
+            
+            with col2:
+                st.markdown("**Maiores Quedas**")
+                st.dataframe(df_exibicao.iloc[::-1].head(n), hide_index=True, use_container_width=True)
 
 # --------------------------------------------------------------------------
 # 9. EXECUÇÃO PRINCIPAL
 # --------------------------------------------------------------------------
 
+@st.cache_resource(show_spinner=False)
+def obter_painel() -> PainelResultados:
+    """Painel compartilhado por todas as sessões do processo (criado no primeiro acesso)"""
+    painel = PainelResultados()
+    atexit.register(painel.encerrar)
+    return painel
+
 def main():
     """Função principal da aplicação"""
     try:
-        painel = PainelResultados()
+        painel = obter_painel()
         painel.executar()
     except Exception as e:
         st.error(f"Erro na aplicação: {e}")
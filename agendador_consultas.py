@@ -0,0 +1,224 @@
+# --------------------------------------------------------------------------
+# AGENDADOR DE CONSULTAS - AVALIECE1
+# --------------------------------------------------------------------------
+
+"""
+Executa as consultas à API fora da thread do script do Streamlit.
+
+Com a requisição rodando em segundo plano, a thread do script apenas aguarda
+em intervalos curtos e atualiza uma barra de progresso; cada atualização é um
+ponto em que o Streamlit pode interromper a execução quando o usuário muda um
+filtro. Assim a nova seleção não espera a anterior terminar:
+
+- requisições ainda na fila da seleção anterior são canceladas;
+- requisições já em andamento seguem desacopladas e alimentam o cache.
+
+Depois que a visualização termina, o PrefetcherConsultas aquece o cache com as
+combinações de filtros que o usuário costuma abrir em seguida (o outro
+componente e as etapas vizinhas), em um pool pequeno e de baixa prioridade.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Hashable, List, Optional, Set, Tuple
+
+from config_api import config_api
+from resiliencia_api import circuit_breaker
+
+try:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+except ImportError:  # Execução fora do Streamlit
+    get_script_run_ctx = None
+
+
+def id_sessao_atual() -> str:
+    """Identificador da sessão do Streamlit atual ('local' fora do Streamlit)"""
+    ctx = get_script_run_ctx() if get_script_run_ctx else None
+    return ctx.session_id if ctx is not None else "local"
+
+
+class AgendadorConsultas:
+    """Fila de consultas compartilhada pelo processo, com uma consulta vigente por sessão"""
+
+    def __init__(self, max_workers: int = config_api.MAX_REQUISICOES_SIMULTANEAS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="consulta_api")
+        self._lock = threading.Lock()
+        # Por sessão: chave da consulta vigente, futures e instante do agendamento
+        self._vigentes: Dict[str, Tuple[Hashable, Dict[Hashable, Future], float]] = {}
+
+    def agendar(self, id_sessao: str, chave_consulta: Hashable,
+                tarefas: Dict[Hashable, Callable[[], object]]) -> Dict[Hashable, Future]:
+        """
+        Agenda as tarefas da consulta vigente da sessão
+
+        Se a sessão já tinha uma consulta diferente pendente, as tarefas dela
+        que ainda não começaram são canceladas. Se a consulta é a mesma (rerun
+        sem mudança de filtros), as tarefas em andamento são reaproveitadas.
+        Consultas de sessões encerradas ou abandonadas (já terminadas e mais
+        antigas que o timeout das requisições) são esquecidas aqui.
+
+        Args:
+            id_sessao: Identificador da sessão
+            chave_consulta: Identifica a combinação de filtros
+            tarefas: Funções sem argumentos, indexadas por nome
+
+        Returns:
+            Futures indexados pelo mesmo nome das tarefas
+        """
+        with self._lock:
+            agora = time.monotonic()
+            self._podar(agora, id_sessao)
+            vigente = self._vigentes.get(id_sessao)
+
+            if vigente is not None:
+                chave_anterior, futuros_anteriores, _ = vigente
+                if chave_anterior == chave_consulta and not any(f.cancelled() for f in futuros_anteriores.values()):
+                    return futuros_anteriores
+                for futuro in futuros_anteriores.values():
+                    futuro.cancel()
+
+            futuros = {nome: self._executor.submit(tarefa) for nome, tarefa in tarefas.items()}
+            self._vigentes[id_sessao] = (chave_consulta, futuros, agora)
+            return futuros
+
+    def _podar(self, agora: float, preservar: str):
+        """Remove as consultas terminadas há mais que o timeout das requisições (exceto da sessão atual)"""
+        for id_sessao in [sessao for sessao, (_, futuros, agendado_em) in self._vigentes.items()
+                          if sessao != preservar and agora - agendado_em >= config_api.REQUEST_TIMEOUT
+                          and all(futuro.done() for futuro in futuros.values())]:
+            del self._vigentes[id_sessao]
+
+    def concluir(self, id_sessao: str, chave_consulta: Hashable):
+        """Remove a consulta vigente da sessão depois que os resultados foram usados"""
+        with self._lock:
+            vigente = self._vigentes.get(id_sessao)
+            if vigente is not None and vigente[0] == chave_consulta:
+                del self._vigentes[id_sessao]
+
+    def consulta_vigente(self, id_sessao: str) -> Optional[Hashable]:
+        """Retorna a chave da consulta pendente da sessão, se houver"""
+        with self._lock:
+            vigente = self._vigentes.get(id_sessao)
+            return vigente[0] if vigente is not None else None
+
+    def encerrar(self):
+        """Encerra o pool, cancelando o que ainda está na fila"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class PrefetcherConsultas:
+    """
+    Aquece o cache com combinações vizinhas, limitado por um orçamento por sessão
+
+    O orçamento é deslizante: cada sessão agenda no máximo orcamento_sessao
+    combinações a cada janela_sessao segundos. Uma combinação em andamento
+    não é agendada de novo; depois de concluída, volta a poder ser aquecida
+    (quando o cache dela vencer ou for descartado, quem chama a oferece de
+    novo). Sessões sem agendamentos na janela nem tarefas em andamento são
+    esquecidas.
+    """
+
+    def __init__(self, max_workers: int = config_api.MAX_WORKERS_PREFETCH,
+                 orcamento_sessao: int = config_api.ORCAMENTO_PREFETCH_SESSAO,
+                 janela_sessao: float = config_api.JANELA_PREFETCH_SESSAO):
+        self.orcamento_sessao = orcamento_sessao
+        self.janela_sessao = janela_sessao
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch_api")
+        self._lock = threading.Lock()
+        # Instantes dos agendamentos recentes e combinações em andamento, por sessão
+        self._agendamentos: Dict[str, Deque[float]] = {}
+        self._em_andamento: Dict[str, Set[Hashable]] = {}
+
+    def agendar(self, id_sessao: str, candidatos: Dict[Hashable, Callable[[], object]]) -> int:
+        """
+        Agenda o aquecimento das combinações que não estão em andamento, dentro do orçamento
+
+        Args:
+            id_sessao: Identificador da sessão
+            candidatos: Funções de aquecimento indexadas pela combinação de filtros,
+                em ordem de prioridade
+
+        Returns:
+            Quantidade de combinações efetivamente agendadas
+        """
+        novas = []
+        with self._lock:
+            agora = time.monotonic()
+            self._podar(agora)
+
+            agendamentos = self._agendamentos.setdefault(id_sessao, deque())
+            em_andamento = self._em_andamento.setdefault(id_sessao, set())
+            for chave, tarefa in candidatos.items():
+                if len(agendamentos) >= self.orcamento_sessao:
+                    break
+                if chave not in em_andamento:
+                    agendamentos.append(agora)
+                    em_andamento.add(chave)
+                    novas.append((chave, tarefa))
+
+        for chave, tarefa in novas:
+            self._executor.submit(self._executar, tarefa).add_done_callback(
+                lambda _, chave=chave: self._concluir(id_sessao, chave)
+            )
+
+        return len(novas)
+
+    def _podar(self, agora: float):
+        """Descarta agendamentos fora da janela e sessões sem nada recente ou em andamento"""
+        for id_sessao in list(self._agendamentos):
+            agendamentos = self._agendamentos[id_sessao]
+            while agendamentos and agora - agendamentos[0] >= self.janela_sessao:
+                agendamentos.popleft()
+            if not agendamentos and not self._em_andamento.get(id_sessao):
+                del self._agendamentos[id_sessao]
+                self._em_andamento.pop(id_sessao, None)
+
+    def _concluir(self, id_sessao: str, chave: Hashable):
+        """Libera a combinação depois da tarefa (executada, falha ou cancelada)"""
+        with self._lock:
+            em_andamento = self._em_andamento.get(id_sessao)
+            if em_andamento is not None:
+                em_andamento.discard(chave)
+
+    @staticmethod
+    def _executar(tarefa: Callable[[], object]):
+        # Não insiste com a API degradada: o prefetch é apenas uma otimização
+        if circuit_breaker.estado != circuit_breaker.FECHADO:
+            return
+        try:
+            tarefa()
+        except Exception as e:
+            logging.debug(f"Prefetch ignorado: {e!r}")
+
+    def encerrar(self):
+        """Encerra o pool, descartando o que ainda está na fila"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def combinacoes_vizinhas(componente: str, etapa: int) -> List[Tuple[str, int]]:
+    """
+    Combinações (componente, etapa) mais prováveis como próxima seleção
+
+    Ordem: o outro componente na mesma etapa, depois a etapa seguinte e a
+    anterior no mesmo componente.
+    """
+    componentes = list(dict(config_api.COMPONENTES).keys())
+    etapas = sorted(config_api.ETAPAS)
+
+    vizinhas = [(outro, etapa) for outro in componentes if outro != componente]
+
+    if etapa in etapas:
+        posicao = etapas.index(etapa)
+        for vizinha in (posicao + 1, posicao - 1):
+            if 0 <= vizinha < len(etapas):
+                vizinhas.append((componente, etapas[vizinha]))
+
+    return vizinhas
+
+
+# Instâncias globais
+agendador_consultas = AgendadorConsultas()
+prefetcher_consultas = PrefetcherConsultas()
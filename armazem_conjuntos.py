@@ -0,0 +1,207 @@
+# --------------------------------------------------------------------------
+# ARMAZÉM COMPARTILHADO DE CONJUNTOS - AVALIECE1
+# --------------------------------------------------------------------------
+
+"""
+Armazém em disco, somente leitura para o painel, dos ConjuntoDados já
+consolidados, compartilhado por todos os processos do Streamlit.
+
+Com vários workers (um processo Streamlit por núcleo atrás de um balanceador),
+cada processo montaria a própria cópia de cada DataFrame. Aqui a primeira
+ingestão de uma consulta (pedido do usuário ou prefetch) grava as tabelas
+geral, habilidades e niveis em Arrow IPC sem compressão; os demais processos
+abrem os arquivos com memory map e montam os DataFrames sem copiar os dados
+sempre que o layout do Arrow permite (colunas numéricas sem nulos e textos
+em str com pyarrow). As páginas ficam no cache do sistema operacional, uma
+vez para todos os processos.
+
+Estrutura do diretório (chave = SHA-256 de entidade, componente, etapa e nível):
+    <chave[:2]>/<chave>/{geral,habilidades,niveis}.arrow
+    <chave[:2]>/<chave>/meta.json
+
+Cada arquivo é gravado em um temporário e trocado com os.replace: quem já
+mapeou a versão anterior continua lendo-a até soltar os DataFrames. O
+meta.json é gravado por último e marca a consulta como completa.
+
+Desativado por padrão (config_api.ARMAZEM_COMPARTILHADO) e dependente do
+pacote pyarrow; sem ele o armazém fica inativo.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+import pandas as pd
+
+from config_api import config_api
+from processamento_dados import ConjuntoDados
+
+try:
+    import pyarrow as pa
+except ImportError:  # Armazém indisponível
+    pa = None
+
+# Tabelas de um ConjuntoDados gravadas no armazém
+TABELAS = ("geral", "habilidades", "niveis")
+
+
+class ArmazemConjuntos:
+    """Conjuntos consolidados em Arrow IPC, lidos por memory map por todos os processos"""
+
+    def __init__(self, diretorio: Union[str, Path] = config_api.DIRETORIO_ARMAZEM_CONJUNTOS,
+                 ttl: int = config_api.TTL_ARMAZEM_CONJUNTOS,
+                 ativo: bool = config_api.ARMAZEM_COMPARTILHADO):
+        self.diretorio = Path(diretorio)
+        self.ttl = ttl
+        self.ativo = ativo
+        if ativo and pa is None:
+            logging.warning("Armazém compartilhado de conjuntos requer o pacote pyarrow; desativado")
+            self.ativo = False
+
+    @staticmethod
+    def _hash_chave(chave: Tuple) -> str:
+        return hashlib.sha256(json.dumps([str(parte) for parte in chave]).encode("utf-8")).hexdigest()
+
+    def _pasta(self, chave: Tuple) -> Path:
+        hash_chave = self._hash_chave(chave)
+        return self.diretorio / hash_chave[:2] / hash_chave
+
+    # ----------------------------------------------------------------------
+    # GRAVAÇÃO (INGESTÃO E PREFETCH)
+    # ----------------------------------------------------------------------
+
+    def publicar(self, chave: Tuple, conjunto: ConjuntoDados) -> bool:
+        """
+        Grava o conjunto de uma consulta para os demais processos (se o armazém estiver ativo)
+
+        Conjuntos de contingência não são publicados. Falhas de disco são
+        apenas registradas.
+
+        Returns:
+            True se gravado
+        """
+        if not self.ativo or conjunto.contingencia:
+            return False
+
+        pasta = self._pasta(chave)
+        try:
+            pasta.mkdir(parents=True, exist_ok=True)
+            tamanhos = {}
+            for nome in TABELAS:
+                tamanhos[nome] = self._gravar_tabela(pasta / f"{nome}.arrow", getattr(conjunto, nome))
+
+            meta = {"chave": [str(parte) for parte in chave], "gravado_em": time.time(), "bytes": tamanhos}
+            self._gravar_atomico(pasta / "meta.json", json.dumps(meta).encode("utf-8"))
+        except (OSError, pa.ArrowException) as e:
+            logging.warning(f"Não foi possível publicar o conjunto no armazém compartilhado: {e!r}")
+            return False
+        return True
+
+    def _gravar_tabela(self, caminho: Path, df: pd.DataFrame) -> int:
+        """Grava o DataFrame em Arrow IPC (formato de arquivo, sem compressão); retorna o tamanho"""
+        tabela = pa.Table.from_pandas(df)
+        destino = pa.BufferOutputStream()
+        with pa.ipc.new_file(destino, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+        conteudo = destino.getvalue()
+        self._gravar_atomico(caminho, conteudo)
+        return conteudo.size
+
+    @staticmethod
+    def _gravar_atomico(caminho: Path, conteudo):
+        descritor, temporario = tempfile.mkstemp(dir=caminho.parent, suffix=".tmp")
+        try:
+            with os.fdopen(descritor, "wb") as arquivo:
+                arquivo.write(conteudo)
+            os.replace(temporario, caminho)
+        except OSError:
+            Path(temporario).unlink(missing_ok=True)
+            raise
+
+    # ----------------------------------------------------------------------
+    # LEITURA (MEMORY MAP)
+    # ----------------------------------------------------------------------
+
+    def _ler_meta(self, pasta: Path) -> Optional[Dict]:
+        try:
+            return json.loads((pasta / "meta.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _valido(self, meta: Optional[Dict]) -> bool:
+        return meta is not None and time.time() - meta["gravado_em"] < self.ttl
+
+    def carregar(self, chave: Tuple) -> Optional[ConjuntoDados]:
+        """Conjunto da consulta mapeado do disco, ou None se ausente, vencido ou ilegível"""
+        if not self.ativo:
+            return None
+
+        pasta = self._pasta(chave)
+        if not self._valido(self._ler_meta(pasta)):
+            return None
+
+        try:
+            tabelas = {nome: self._mapear_tabela(pasta / f"{nome}.arrow") for nome in TABELAS}
+        except (OSError, pa.ArrowException) as e:
+            # Removido ou trocado por outro processo no meio da leitura: trata como ausente
+            logging.debug(f"Conjunto do armazém compartilhado ilegível: {e!r}")
+            return None
+
+        return ConjuntoDados(tabelas["geral"], tabelas["habilidades"], tabelas["niveis"], compartilhado=True)
+
+    @staticmethod
+    def _mapear_tabela(caminho: Path) -> pd.DataFrame:
+        """
+        DataFrame sobre o arquivo mapeado em memória
+
+        O memory map fica aberto enquanto algum buffer (e portanto algum
+        DataFrame) referenciar o arquivo.
+        """
+        tabela = pa.ipc.open_file(pa.memory_map(str(caminho), "r")).read_all()
+        # split_blocks evita consolidar colunas (o que copiaria os dados)
+        return tabela.to_pandas(split_blocks=True)
+
+    def __contains__(self, chave: Tuple) -> bool:
+        return self.ativo and self._valido(self._ler_meta(self._pasta(chave)))
+
+    # ----------------------------------------------------------------------
+    # MANUTENÇÃO
+    # ----------------------------------------------------------------------
+
+    def consultas(self) -> Iterator[Dict]:
+        """Metadados de cada consulta publicada (chave, gravado_em, bytes por tabela)"""
+        for caminho in sorted(self.diretorio.glob("*/*/meta.json")):
+            meta = self._ler_meta(caminho.parent)
+            if meta is not None:
+                yield meta
+
+    def remover_vencidos(self) -> int:
+        """
+        Remove as consultas vencidas
+
+        Processos que ainda mapeiam os arquivos continuam lendo-os até soltar
+        os DataFrames (o sistema só libera o espaço depois).
+
+        Returns:
+            Quantidade de consultas removidas
+        """
+        removidas = 0
+        for caminho in list(self.diretorio.glob("*/*/meta.json")):
+            if not self._valido(self._ler_meta(caminho.parent)):
+                shutil.rmtree(caminho.parent, ignore_errors=True)
+                removidas += 1
+        return removidas
+
+
+# Instância global do armazém compartilhado
+armazem_conjuntos = ArmazemConjuntos()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    logging.info(f"{armazem_conjuntos.remover_vencidos()} consulta(s) vencida(s) removida(s)")
@@ -0,0 +1,187 @@
+# --------------------------------------------------------------------------
+# ARQUIVO DE RESPOSTAS DA API - AVALIECE1
+# --------------------------------------------------------------------------
+
+"""
+Arquivo em disco das respostas brutas do getDadosResultado, para depuração,
+benchmarks e reconstrução dos dados processados sem acessar a API.
+
+Cada corpo de resposta é gravado comprimido (zstd ou gzip) uma única vez,
+endereçado pelo SHA-256 dos bytes recebidos: respostas idênticas, mesmo de
+consultas diferentes, ocupam um só arquivo. Cada consulta (chave_payload,
+sem credenciais) tem um histórico das versões recebidas em JSON Lines, com
+a consulta descrita por descrever_payload, o horário e o hash do corpo; uma
+resposta igual à última versão não gera nova linha.
+
+Estrutura do diretório:
+    objetos/<hash[:2]>/<hash>.json.zst|.json.gz
+    consultas/<chave[:2]>/<chave>.jsonl
+
+Desativado por padrão (config_api.ARQUIVAR_RESPOSTAS). zstd depende do
+pacote zstandard; sem ele as respostas são gravadas em gzip.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from config_api import config_api
+from payloads import descrever_payload
+from resiliencia_api import chave_payload
+
+try:
+    import zstandard
+except ImportError:  # zstd indisponível
+    zstandard = None
+
+# Compressão -> (extensão, comprimir, descomprimir)
+COMPRESSOES: Dict[str, Tuple[str, Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "gzip": (".json.gz", lambda dados: gzip.compress(dados, compresslevel=6), gzip.decompress),
+}
+if zstandard is not None:
+    COMPRESSOES["zstd"] = (
+        ".json.zst",
+        lambda dados: zstandard.ZstdCompressor(level=10).compress(dados),
+        lambda dados: zstandard.ZstdDecompressor().decompress(dados),
+    )
+
+
+class ArquivoRespostas:
+    """Respostas brutas da API endereçadas por conteúdo, com o histórico de cada consulta"""
+
+    def __init__(self, diretorio: Union[str, Path] = config_api.DIRETORIO_ARQUIVO_RESPOSTAS,
+                 compressao: str = config_api.COMPRESSAO_ARQUIVO_RESPOSTAS,
+                 ativo: bool = config_api.ARQUIVAR_RESPOSTAS):
+        self.diretorio = Path(diretorio)
+        self.ativo = ativo
+        if compressao == "zstd" and zstandard is None:
+            compressao = "gzip"
+        if compressao not in COMPRESSOES:
+            raise ValueError(f"Compressão desconhecida para o arquivo de respostas: {compressao}")
+        self.compressao = compressao
+        self._lock = threading.Lock()
+
+    def _caminho_objeto(self, hash_corpo: str, compressao: str) -> Path:
+        return self.diretorio / "objetos" / hash_corpo[:2] / f"{hash_corpo}{COMPRESSOES[compressao][0]}"
+
+    def _caminho_consulta(self, chave: str) -> Path:
+        return self.diretorio / "consultas" / chave[:2] / f"{chave}.jsonl"
+
+    # ----------------------------------------------------------------------
+    # GRAVAÇÃO
+    # ----------------------------------------------------------------------
+
+    def guardar(self, payload: Dict, corpo: bytes) -> Optional[str]:
+        """
+        Arquiva o corpo bruto de uma resposta (se o arquivo estiver ativo)
+
+        Falhas de disco são apenas registradas: a requisição não é afetada.
+
+        Returns:
+            Hash do corpo, ou None se não arquivado
+        """
+        if not self.ativo:
+            return None
+
+        hash_corpo = hashlib.sha256(corpo).hexdigest()
+        registro = {
+            "coletado_em": datetime.now().isoformat(timespec="seconds"),
+            "hash": hash_corpo,
+            "compressao": self.compressao,
+            "tamanho": len(corpo),
+            "consulta": descrever_payload(payload),
+        }
+
+        try:
+            # Corpo já arquivado (em qualquer compressão): não grava de novo
+            existente = self._localizar(hash_corpo)
+            if existente is None:
+                _, comprimir, _ = COMPRESSOES[self.compressao]
+                self._gravar_atomico(self._caminho_objeto(hash_corpo, self.compressao), comprimir(corpo))
+            else:
+                registro["compressao"] = existente[1]
+
+            caminho = self._caminho_consulta(chave_payload(payload))
+            caminho.parent.mkdir(parents=True, exist_ok=True)
+            linha = json.dumps(registro, ensure_ascii=False) + "\n"
+            with self._lock:
+                historico = self._ler_historico(caminho)
+                # Mesma versão da última captura: nada a registrar
+                if not historico or historico[-1]["hash"] != hash_corpo:
+                    with open(caminho, "a", encoding="utf-8") as arquivo:
+                        arquivo.write(linha)
+        except OSError as e:
+            logging.warning(f"Não foi possível arquivar a resposta da API: {e!r}")
+            return None
+
+        return hash_corpo
+
+    @staticmethod
+    def _gravar_atomico(caminho: Path, conteudo: bytes):
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        descritor, temporario = tempfile.mkstemp(dir=caminho.parent, suffix=".tmp")
+        try:
+            with os.fdopen(descritor, "wb") as arquivo:
+                arquivo.write(conteudo)
+            os.replace(temporario, caminho)
+        except OSError:
+            Path(temporario).unlink(missing_ok=True)
+            raise
+
+    # ----------------------------------------------------------------------
+    # LEITURA (REPLAY)
+    # ----------------------------------------------------------------------
+
+    def _localizar(self, hash_corpo: str) -> Optional[Tuple[Path, str]]:
+        """Arquivo do corpo e a compressão usada, se arquivado"""
+        for compressao in COMPRESSOES:
+            caminho = self._caminho_objeto(hash_corpo, compressao)
+            if caminho.exists():
+                return caminho, compressao
+        return None
+
+    def ler_corpo(self, hash_corpo: str) -> Optional[bytes]:
+        """Corpo bruto (descomprimido) pelo hash, ou None se não arquivado"""
+        localizado = self._localizar(hash_corpo)
+        if localizado is None:
+            return None
+        caminho, compressao = localizado
+        return COMPRESSOES[compressao][2](caminho.read_bytes())
+
+    def historico(self, payload: Dict) -> List[Dict]:
+        """Versões arquivadas de uma consulta, da mais antiga para a mais recente"""
+        return self._ler_historico(self._caminho_consulta(chave_payload(payload)))
+
+    @staticmethod
+    def _ler_historico(caminho: Path) -> List[Dict]:
+        try:
+            with open(caminho, encoding="utf-8") as arquivo:
+                return [json.loads(linha) for linha in arquivo if linha.strip()]
+        except OSError:
+            return []
+
+    def obter(self, payload: Dict) -> Optional[Dict]:
+        """Última resposta arquivada da consulta, já decodificada, ou None"""
+        for registro in reversed(self.historico(payload)):
+            corpo = self.ler_corpo(registro["hash"])
+            if corpo is not None:
+                return json.loads(corpo)
+        return None
+
+    def consultas(self) -> Iterator[Dict]:
+        """Última versão de cada consulta arquivada (com a descrição em 'consulta' e a 'chave')"""
+        for caminho in sorted(self.diretorio.glob("consultas/*/*.jsonl")):
+            historico = self._ler_historico(caminho)
+            if historico:
+                yield {**historico[-1], "chave": caminho.stem}
+
+
+# Instância global do arquivo de respostas
+arquivo_respostas = ArquivoRespostas()
@@ -0,0 +1,135 @@
+# --------------------------------------------------------------------------
+# ATUALIZAÇÃO INCREMENTAL - AVALIECE1
+# --------------------------------------------------------------------------
+
+"""
+Reconsulta as fatias (entidade, componente, etapa, ciclo, nível) já guardadas
+no arquivo_respostas e regrava apenas as que mudaram na origem.
+
+Uso:
+    python atualizar_respostas.py
+    python atualizar_respostas.py --relatorios relatorios
+
+Cada consulta arquivada é refeita uma vez, em um único lote assíncrono; o
+hash do corpo recebido é comparado com o da última versão arquivada e só
+as respostas diferentes ganham nova versão. Com --relatorios, os relatórios
+das entidades afetadas são regenerados a partir do arquivo (replay do
+gerar_relatorios), sem novas consultas; os demais ficam como estão.
+"""
+
+import argparse
+import logging
+import sys
+import tomllib
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+from arquivo_respostas import arquivo_respostas
+from cliente_async import buscar_em_lote
+from gerar_relatorios import carregar_secrets
+from gerar_relatorios import main as gerar_relatorios
+from payloads import criar_payload_geral, criar_payload_habilidades
+
+CRIADORES_PAYLOAD = {"geral": criar_payload_geral, "habilidades": criar_payload_habilidades}
+
+
+def montar_payload(consulta: Dict, installation_id: str, session_token: str) -> Dict:
+    """Payload de uma consulta arquivada (descrição de payloads.descrever_payload)"""
+    criar = CRIADORES_PAYLOAD[consulta["tipo"]]
+    return criar(consulta["entidade"], consulta["componente"], consulta["etapa"], consulta["ciclo"],
+                 installation_id, session_token, consulta["nivel_agregacao"])
+
+
+def atualizar(installation_id: str, session_token: str) -> Tuple[List[Dict], int]:
+    """
+    Reconsulta todas as fatias arquivadas
+
+    Returns:
+        (descrições das consultas que mudaram, quantidade de falhas)
+    """
+    arquivadas = [registro for registro in arquivo_respostas.consultas()
+                  if registro["consulta"].get("tipo") in CRIADORES_PAYLOAD]
+    if not arquivadas:
+        return [], 0
+
+    payloads = [montar_payload(registro["consulta"], installation_id, session_token) for registro in arquivadas]
+
+    # O cliente arquiva cada resposta recebida; versões iguais à última não são regravadas
+    ativo_anterior = arquivo_respostas.ativo
+    arquivo_respostas.ativo = True
+    try:
+        respostas = buscar_em_lote(payloads)
+    finally:
+        arquivo_respostas.ativo = ativo_anterior
+
+    alteradas = []
+    falhas = 0
+    for registro, payload, resposta in zip(arquivadas, payloads, respostas):
+        if resposta is None:
+            falhas += 1
+            continue
+        historico = arquivo_respostas.historico(payload)
+        if historico and historico[-1]["hash"] != registro["hash"]:
+            alteradas.append(registro["consulta"])
+
+    logging.info(f"{len(arquivadas)} consultas verificadas: {len(alteradas)} alteradas, {falhas} falhas")
+    return alteradas, falhas
+
+
+def regenerar_relatorios(alteradas: List[Dict], saida: Path, secrets: Path) -> int:
+    """
+    Regenera, a partir do arquivo, os relatórios das entidades com fatias alteradas
+
+    As etapas e componentes de cada relatório são os já arquivados para o nível.
+    """
+    por_nivel: Dict[int, Set[str]] = {}
+    for consulta in alteradas:
+        por_nivel.setdefault(consulta["nivel_agregacao"], set()).add(consulta["entidade"])
+
+    arquivadas = [registro["consulta"] for registro in arquivo_respostas.consultas()]
+    codigo = 0
+    for nivel, entidades in sorted(por_nivel.items()):
+        do_nivel = [c for c in arquivadas if c["nivel_agregacao"] == nivel and c["entidade"] in entidades]
+        etapas = sorted({str(c["etapa"]) for c in do_nivel})
+        componentes = sorted({c["componente"] for c in do_nivel})
+
+        logging.info(f"Regenerando {len(entidades)} relatório(s) do nível {nivel}")
+        argumentos = ["--secrets", str(secrets), "--saida", str(saida), "--nivel", str(nivel), "--replay",
+                      "--entidades", *sorted(entidades), "--etapas", *etapas, "--componentes", *componentes]
+        codigo = max(codigo, gerar_relatorios(argumentos))
+    return codigo
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Atualiza apenas as respostas arquivadas que mudaram na API")
+    parser.add_argument("--secrets", type=Path, default=Path(".streamlit/secrets.toml"),
+                        help="Arquivo secrets.toml do painel (padrão: .streamlit/secrets.toml)")
+    parser.add_argument("--relatorios", type=Path, default=None,
+                        help="Diretório dos relatórios a regenerar para as entidades alteradas")
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    args = criar_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    try:
+        secrets = carregar_secrets(args.secrets)
+        installation_id = secrets["api"]["installation_id"]
+        session_token = secrets["api"]["session_token"]
+    except (OSError, KeyError, tomllib.TOMLDecodeError) as e:
+        logging.error(f"Erro na configuração: {e!r}. Verifique o arquivo secrets.toml")
+        return 1
+
+    alteradas, falhas = atualizar(installation_id, session_token)
+    for consulta in alteradas:
+        logging.info(f"Alterada: {consulta}")
+
+    codigo = 1 if falhas else 0
+    if alteradas and args.relatorios is not None:
+        codigo = max(codigo, regenerar_relatorios(alteradas, args.relatorios, args.secrets))
+    return codigo
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+# --------------------------------------------------------------------------
+# CACHE DE RENDERIZAÇÃO DE GRÁFICOS - AVALIECE1
+# --------------------------------------------------------------------------
+
+"""
+Cache em disco das figuras do GeradorGraficos já renderizadas em SVG ou PNG.
+
+A chave é o hash SHA-256 da especificação da figura (fig.to_json()) junto
+com o formato e as opções de renderização: a mesma figura, gerada de novo a
+partir dos mesmos dados, reaproveita o arquivo já renderizado. O diretório é
+compartilhado entre processos (gravação atômica via arquivo temporário) e
+tem tamanho máximo; acima dele, os arquivos usados há mais tempo são
+removidos.
+
+Só as imagens estáticas passam pelo cache: exportar com o kaleido custa de
+centenas de milissegundos a segundos por figura, enquanto o fragmento HTML
+sai em tempo comparável ao do próprio fig.to_json() da chave mais a leitura
+do disco. HTML é renderizado direto, sem chave nem arquivo.
+
+SVG e PNG dependem do pacote kaleido; HTML funciona apenas com o plotly.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional, Union
+
+from config_api import config_api
+
+# Extensão gravada para cada formato
+FORMATOS = {"html": ".html", "svg": ".svg", "png": ".png"}
+
+# Formatos guardados em disco (renderização cara, via kaleido)
+FORMATOS_CACHEADOS = frozenset({"svg", "png"})
+
+
+class CacheRenderizacao:
+    """Cache endereçado por conteúdo das figuras renderizadas, com limite de tamanho"""
+
+    def __init__(self, diretorio: Union[str, Path] = config_api.DIRETORIO_CACHE_RENDERIZACAO,
+                 max_bytes: int = config_api.MAX_BYTES_CACHE_RENDERIZACAO):
+        self.diretorio = Path(diretorio)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._tamanho: Optional[int] = None
+        self.acertos = 0
+        self.falhas = 0
+
+    @staticmethod
+    def chave(fig, formato: str, **opcoes) -> str:
+        """Hash da especificação da figura, do formato e das opções de renderização"""
+        especificacao = fig.to_json()
+        extras = json.dumps({"formato": formato, **opcoes}, sort_keys=True, default=str)
+        return hashlib.sha256(f"{especificacao}\n{extras}".encode("utf-8")).hexdigest()
+
+    def _caminho(self, chave: str, formato: str) -> Path:
+        # Subdiretórios pelo prefixo do hash evitam diretórios com milhares de arquivos
+        return self.diretorio / chave[:2] / f"{chave}{FORMATOS[formato]}"
+
+    def renderizar(self, fig, formato: str = "html", **opcoes) -> bytes:
+        """
+        Retorna a figura renderizada, do cache quando possível
+
+        Args:
+            fig: Figura do plotly
+            formato: 'html' (fragmento, sem <html>; não cacheado), 'svg' ou 'png'
+            **opcoes: Repassadas a fig.to_html / fig.to_image (ex.: include_plotlyjs, width)
+
+        Returns:
+            Conteúdo renderizado (HTML e SVG em UTF-8)
+        """
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato de renderização desconhecido: {formato}")
+        if formato not in FORMATOS_CACHEADOS:
+            return fig.to_html(full_html=False, **opcoes).encode("utf-8")
+
+        chave = self.chave(fig, formato, **opcoes)
+        caminho = self._caminho(chave, formato)
+
+        try:
+            conteudo = caminho.read_bytes()
+        except OSError:
+            conteudo = None
+
+        if conteudo is not None:
+            self.acertos += 1
+            # Atualiza o horário de acesso usado na remoção dos menos usados
+            try:
+                os.utime(caminho)
+            except OSError:
+                pass
+            return conteudo
+
+        self.falhas += 1
+        conteudo = fig.to_image(format=formato, **opcoes)
+
+        self._gravar(caminho, conteudo)
+        return conteudo
+
+    def _gravar(self, caminho: Path, conteudo: bytes):
+        """Grava de forma atômica e aplica o limite de tamanho"""
+        try:
+            caminho.parent.mkdir(parents=True, exist_ok=True)
+            descritor, temporario = tempfile.mkstemp(dir=caminho.parent, suffix=".tmp")
+            with os.fdopen(descritor, "wb") as arquivo:
+                arquivo.write(conteudo)
+            os.replace(temporario, caminho)
+        except OSError as e:
+            # Sem cache a renderização continua funcionando
+            logging.warning(f"Não foi possível gravar no cache de renderização: {e!r}")
+            return
+
+        with self._lock:
+            if self._tamanho is None:
+                self._tamanho = self.tamanho_total()
+            else:
+                self._tamanho += len(conteudo)
+            if self._tamanho > self.max_bytes:
+                self._tamanho = self._remover_antigos()
+
+    def _arquivos(self):
+        return [caminho for caminho in self.diretorio.glob("*/*") if caminho.suffix in FORMATOS.values()]
+
+    def tamanho_total(self) -> int:
+        """Tamanho ocupado em disco (bytes)"""
+        total = 0
+        for caminho in self._arquivos():
+            try:
+                total += caminho.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    def _remover_antigos(self) -> int:
+        """
+        Remove os arquivos usados há mais tempo até ficar abaixo de 90% do limite
+
+        Relê o diretório, porque outros processos também gravam nele.
+
+        Returns:
+            Tamanho restante (bytes)
+        """
+        arquivos = []
+        for caminho in self._arquivos():
+            try:
+                info = caminho.stat()
+            except OSError:
+                continue
+            arquivos.append((info.st_mtime, info.st_size, caminho))
+
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        alvo = int(self.max_bytes * 0.9)
+
+        for _, tamanho, caminho in sorted(arquivos):
+            if total <= alvo:
+                break
+            try:
+                caminho.unlink()
+            except OSError:
+                continue
+            total -= tamanho
+
+        return total
+
+    def limpar(self):
+        """Remove todas as figuras do cache"""
+        with self._lock:
+            for caminho in self._arquivos():
+                try:
+                    caminho.unlink()
+                except OSError:
+                    pass
+            self._tamanho = 0
+
+
+# Instância global do cache de renderização
+cache_renderizacao = CacheRenderizacao()
@@ -0,0 +1,198 @@
+# --------------------------------------------------------------------------
+# CLIENTE DA API - AVALIECE1
+# --------------------------------------------------------------------------
+
+"""
+Cliente síncrono da API de resultados, usado pelo painel (Avaliacoes.py) e
+pelo servico_consultas.
+
+Reúne o cache de respostas, o circuit breaker, o limitador de concorrência,
+o arquivo de respostas e a contingência de resiliencia_api.py. Não depende
+do Streamlit: as falhas vão para o logging (_notificar), e o painel
+estende a classe para também exibi-las na tela.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from arquivo_respostas import arquivo_respostas
+from config_api import config_api
+from payloads import corpo_payload
+from resiliencia_api import (
+    CircuitoAbertoError, LimiteConcorrenciaError,
+    armazem_respostas, chave_payload, circuit_breaker, limitador_api
+)
+
+
+class CacheRespostas:
+    """Respostas da API por consulta, com validade e limite de itens, compartilhadas pelo processo"""
+
+    def __init__(self, ttl: int = config_api.TTL_RESPOSTAS_CACHE_API,
+                 max_itens: int = config_api.MAX_RESPOSTAS_CACHE_API):
+        self.ttl = ttl
+        self.max_itens = max_itens
+        self._lock = threading.Lock()
+        self._respostas: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+
+    def obter(self, chave: str) -> Optional[Dict]:
+        """Resposta da consulta, se existir e não tiver expirado"""
+        with self._lock:
+            item = self._respostas.get(chave)
+            if item is None:
+                return None
+            if time.monotonic() >= item[0]:
+                del self._respostas[chave]
+                return None
+            self._respostas.move_to_end(chave)
+            return item[1]
+
+    def guardar(self, chave: str, resposta: Dict):
+        """Armazena a resposta, descartando as usadas há mais tempo acima do limite"""
+        with self._lock:
+            self._respostas[chave] = (time.monotonic() + self.ttl, resposta)
+            self._respostas.move_to_end(chave)
+            while len(self._respostas) > self.max_itens:
+                self._respostas.popitem(last=False)
+
+    def limpar(self):
+        """Remove todas as respostas"""
+        with self._lock:
+            self._respostas.clear()
+
+
+# Instância global do cache de respostas
+cache_respostas = CacheRespostas()
+
+
+class APIClient:
+    """Cliente para comunicação com a API"""
+
+    def __init__(self, base_url: str = config_api.API_URL, timeout: int = config_api.REQUEST_TIMEOUT):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.headers = {"Content-Type": "application/json"}
+
+        # Conexões reaproveitadas entre requisições (uma vaga por requisição simultânea permitida)
+        self.sessao = requests.Session()
+        self.sessao.headers.update(self.headers)
+        adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=config_api.MAX_REQUISICOES_SIMULTANEAS)
+        self.sessao.mount("https://", adaptador)
+        self.sessao.mount("http://", adaptador)
+
+    def fechar(self):
+        """Fecha as conexões abertas com a API"""
+        self.sessao.close()
+
+    def requisitar_dados(self, payload: Dict) -> Optional[Dict]:
+        """
+        Faz requisição para a API com cache e tratamento de erros robusto
+
+        Em caso de falha (ou com o circuito aberto), devolve a última resposta
+        válida da mesma consulta, marcada com CHAVE_CONTINGENCIA.
+
+        Args:
+            payload: Dados da requisição
+
+        Returns:
+            Resposta da API, resposta de contingência ou None em caso de erro
+        """
+        return self.resolver_requisicao(payload, lambda: self._requisitar_com_cache(payload))
+
+    def agendar_requisicao(self, payload: Dict) -> Callable[[], Dict]:
+        """Retorna a tarefa (sem interface) a ser executada em segundo plano pelo agendador"""
+        return lambda: self._requisitar_com_cache(payload)
+
+    def resolver_requisicao(self, payload: Dict, obter_resposta: Callable[[], Dict]) -> Optional[Dict]:
+        """
+        Obtém o resultado de uma requisição e trata os erros
+
+        Args:
+            payload: Payload da requisição
+            obter_resposta: Função que retorna a resposta ou levanta a exceção da requisição
+                (por exemplo, future.result de uma tarefa agendada)
+
+        Returns:
+            Resposta da API, resposta de contingência ou None em caso de erro
+        """
+        chave = chave_payload(payload)
+
+        try:
+            resposta = obter_resposta()
+            armazem_respostas.guardar(chave, resposta)
+            return resposta
+
+        except CircuitoAbertoError:
+            # Aviso único exibido pelo painel (ver _exibir_aviso_contingencia)
+            logging.info("Requisição não enviada: circuito aberto")
+        except LimiteConcorrenciaError:
+            self._notificar(logging.WARNING, "Servidor de resultados sobrecarregado. Tente novamente em instantes.")
+        except requests.exceptions.Timeout:
+            self._notificar(logging.ERROR, "⏱Tempo limite esgotado. Tente novamente.")
+        except requests.exceptions.ConnectionError:
+            self._notificar(logging.ERROR, "Erro de conexão. Verifique sua internet.")
+        except requests.exceptions.HTTPError as e:
+            self._notificar(logging.ERROR, f"Erro HTTP {e.response.status_code}: {e}")
+        except requests.exceptions.RequestException as e:
+            self._notificar(logging.ERROR, f"Erro na requisição: {e}")
+        except Exception as e:
+            self._notificar(logging.ERROR, f"Erro inesperado: {e}")
+
+        return armazem_respostas.obter_contingencia(chave)
+
+    def _notificar(self, nivel: int, mensagem: str):
+        """Registra a falha de uma requisição (o painel também a exibe)"""
+        logging.log(nivel, mensagem)
+
+    def _requisitar_com_cache(self, payload: Dict) -> Dict:
+        """Requisição cacheada; exceções sobem para resolver_requisicao (e falhas não entram no cache)"""
+        chave = chave_payload(payload)
+        resposta = cache_respostas.obter(chave)
+        if resposta is None:
+            resposta = self._enviar(payload)
+            cache_respostas.guardar(chave, resposta)
+        return resposta
+
+    def _enviar(self, payload: Dict) -> Dict:
+        """Envia o payload respeitando o circuit breaker e o limitador de concorrência"""
+        if not circuit_breaker.permitir_requisicao():
+            raise CircuitoAbertoError("API temporariamente bloqueada pelo circuit breaker")
+
+        try:
+            with limitador_api.vaga():
+                response = self.sessao.post(
+                    self.base_url,
+                    data=corpo_payload(payload),
+                    timeout=self.timeout
+                )
+            response.raise_for_status()
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+            circuit_breaker.registrar_falha()
+            raise
+        except requests.exceptions.HTTPError as e:
+            # Apenas erros do servidor indicam degradação do upstream
+            if e.response is not None and e.response.status_code >= 500:
+                circuit_breaker.registrar_falha()
+            else:
+                circuit_breaker.registrar_sucesso()
+            raise
+        except (LimiteConcorrenciaError, requests.exceptions.RequestException):
+            # Não diz nada sobre a saúde do upstream; libera eventual requisição de teste
+            circuit_breaker.cancelar_teste()
+            raise
+
+        try:
+            dados = response.json()
+        except ValueError:
+            # Resposta 200 com corpo que não é JSON: upstream degradado, e o corpo não é arquivado
+            circuit_breaker.registrar_falha()
+            raise
+
+        circuit_breaker.registrar_sucesso()
+        arquivo_respostas.guardar(payload, response.content)
+        return dados
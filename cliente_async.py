@@ -0,0 +1,199 @@
+# --------------------------------------------------------------------------
+# CLIENTE ASSÍNCRONO DA API - AVALIECE1
+# --------------------------------------------------------------------------
+
+"""
+Variante assíncrona (asyncio + aiohttp) do APIClient, pensada para rotinas
+em lote que precisam disparar muitas consultas ao mesmo tempo.
+
+Usa os mesmos payloads de payloads.py e compartilha com o cliente síncrono o
+circuit breaker e o armazém de contingência de resiliencia_api.py.
+
+Exemplo:
+    payloads = [criar_payload_geral(...), criar_payload_habilidades(...)]
+    respostas = buscar_em_lote(payloads)
+"""
+
+import asyncio
+import json
+import logging
+from typing import Dict, Iterable, List, Optional, Set
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from arquivo_respostas import arquivo_respostas
+from config_api import config_api
+from payloads import corpo_payload
+from resiliencia_api import (
+    CircuitoAbertoError, armazem_respostas, chave_payload, circuit_breaker
+)
+
+
+class ClienteAPIAsync:
+    """Cliente assíncrono com pool de conexões e limite de concorrência por host"""
+
+    def __init__(self, base_url: str = config_api.API_URL,
+                 timeout: int = config_api.REQUEST_TIMEOUT,
+                 max_conexoes: int = 100,
+                 max_por_host: int = config_api.MAX_REQUISICOES_SIMULTANEAS):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_conexoes = max_conexoes
+        self.max_por_host = max_por_host
+        self.headers = {"Content-Type": "application/json"}
+        self._sessao: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaforos: Dict[str, asyncio.Semaphore] = {}
+        self._tarefas: Set[asyncio.Task] = set()
+
+    async def __aenter__(self) -> "ClienteAPIAsync":
+        await self.abrir()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.fechar()
+
+    async def abrir(self):
+        """Cria a sessão HTTP (pool de conexões reaproveitado entre requisições)"""
+        if self._sessao is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        conector = aiohttp.TCPConnector(limit=self.max_conexoes, limit_per_host=self.max_por_host)
+        self._sessao = aiohttp.ClientSession(
+            connector=conector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+
+    async def fechar(self):
+        """Cancela requisições pendentes e encerra a sessão HTTP"""
+        self._cancelar_tarefas()
+        if self._sessao is not None:
+            await self._sessao.close()
+            self._sessao = None
+
+    def _semaforo(self, url: str) -> asyncio.Semaphore:
+        """Semáforo de concorrência do host da URL"""
+        host = urlsplit(url).netloc
+        if host not in self._semaforos:
+            self._semaforos[host] = asyncio.Semaphore(self.max_por_host)
+        return self._semaforos[host]
+
+    async def requisitar(self, payload: Dict) -> Dict:
+        """
+        Envia um payload e retorna a resposta da API
+
+        Raises:
+            CircuitoAbertoError: circuito aberto por falhas anteriores
+            aiohttp.ClientError / asyncio.TimeoutError: falhas de rede ou HTTP
+            ValueError: resposta que não é JSON
+        """
+        if self._sessao is None:
+            await self.abrir()
+
+        async with self._semaforo(self.base_url):
+            # Verificado após obter a vaga: o circuito pode ter aberto durante a espera
+            if not circuit_breaker.permitir_requisicao():
+                raise CircuitoAbertoError("API temporariamente bloqueada pelo circuit breaker")
+
+            try:
+                async with self._sessao.post(self.base_url, data=corpo_payload(payload)) as resposta:
+                    resposta.raise_for_status()
+                    corpo = await resposta.read()
+                dados = json.loads(corpo)
+            except (asyncio.TimeoutError, aiohttp.ClientConnectionError):
+                circuit_breaker.registrar_falha()
+                raise
+            except aiohttp.ClientResponseError as e:
+                # Apenas erros do servidor indicam degradação do upstream
+                if e.status >= 500:
+                    circuit_breaker.registrar_falha()
+                else:
+                    circuit_breaker.registrar_sucesso()
+                raise
+            except (asyncio.CancelledError, aiohttp.ClientError):
+                circuit_breaker.cancelar_teste()
+                raise
+            except ValueError:
+                # Resposta 200 com corpo que não é JSON: upstream degradado
+                circuit_breaker.registrar_falha()
+                raise
+
+        circuit_breaker.registrar_sucesso()
+        armazem_respostas.guardar(chave_payload(payload), dados)
+        if arquivo_respostas.ativo:
+            await asyncio.to_thread(arquivo_respostas.guardar, payload, corpo)
+        return dados
+
+    async def requisitar_varios(self, payloads: Iterable[Dict]) -> List[Optional[Dict]]:
+        """
+        Envia vários payloads em paralelo
+
+        Returns:
+            Respostas na mesma ordem dos payloads (None para falhas ou cancelamentos)
+        """
+        tarefas = [asyncio.create_task(self.requisitar(payload)) for payload in payloads]
+        self._tarefas.update(tarefas)
+
+        try:
+            resultados = await asyncio.gather(*tarefas, return_exceptions=True)
+        finally:
+            self._tarefas.difference_update(tarefas)
+
+        respostas = []
+        for resultado in resultados:
+            if isinstance(resultado, BaseException):
+                if not isinstance(resultado, asyncio.CancelledError):
+                    logging.warning(f"Falha em requisição assíncrona: {resultado!r}")
+                respostas.append(None)
+            else:
+                respostas.append(resultado)
+
+        return respostas
+
+    def cancelar(self):
+        """
+        Cancela as requisições em andamento
+
+        Pode ser chamado de outra thread (por exemplo, quando um rerun do
+        Streamlit substitui a consulta atual).
+        """
+        if self._loop is None or self._loop.is_closed():
+            return
+        try:
+            em_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            em_loop = False
+
+        if em_loop:
+            self._cancelar_tarefas()
+        else:
+            self._loop.call_soon_threadsafe(self._cancelar_tarefas)
+
+    def _cancelar_tarefas(self):
+        for tarefa in list(self._tarefas):
+            tarefa.cancel()
+
+# --------------------------------------------------------------------------
+# INTERFACE SÍNCRONA
+# --------------------------------------------------------------------------
+
+def buscar_em_lote(payloads: Iterable[Dict], **kwargs) -> List[Optional[Dict]]:
+    """
+    Executa várias consultas em paralelo a partir de código síncrono
+
+    Args:
+        payloads: Payloads criados com as funções de payloads.py
+        **kwargs: Parâmetros repassados ao ClienteAPIAsync
+
+    Returns:
+        Respostas na mesma ordem dos payloads (None para falhas)
+    """
+    payloads = list(payloads)
+
+    async def _executar():
+        async with ClienteAPIAsync(**kwargs) as cliente:
+            return await cliente.requisitar_varios(payloads)
+
+    return asyncio.run(_executar())
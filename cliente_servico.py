@@ -0,0 +1,101 @@
+# --------------------------------------------------------------------------
+# CLIENTE DO SERVIÇO DE CONSULTAS - AVALIECE1
+# --------------------------------------------------------------------------
+
+"""
+Cliente do servico_consultas, usado pelo painel quando
+config_api.URL_SERVICO_CONSULTAS está definida: vários processos do painel
+passam a dividir o cache e a cota da API do serviço.
+
+As tabelas vêm em Arrow (tipos e categorias preservados) quando o pyarrow
+está instalado, senão em JSON. Cada tabela recebida fica guardada com a
+ETag; pedidos seguintes enviam If-None-Match e, com 304, reaproveitam o
+DataFrame já decodificado.
+"""
+
+import threading
+from collections import OrderedDict
+from importlib.util import find_spec
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+import requests
+
+from config_api import config_api
+from processamento_dados import ConjuntoDados, ProcessadorDados
+
+
+class ClienteServicoConsultas:
+    """Busca os conjuntos consolidados no servico_consultas, revalidando por ETag"""
+
+    def __init__(self, url_base: str, token: Optional[str] = None,
+                 timeout: int = config_api.REQUEST_TIMEOUT, max_itens: int = 128):
+        self.url = url_base.rstrip("/") + "/consulta"
+        self.timeout = timeout
+        self.max_itens = max_itens
+        self.formato = "arrow" if find_spec("pyarrow") is not None else "json"
+        self.sessao = requests.Session()
+        if token:
+            self.sessao.headers["Authorization"] = f"Bearer {token}"
+        self._lock = threading.Lock()
+        self._tabelas: "OrderedDict[Tuple, Tuple[str, pd.DataFrame, bool]]" = OrderedDict()
+
+    def fechar(self):
+        self.sessao.close()
+
+    def tabela(self, chave_consulta: Tuple[str, str, int, int], tabela: str) -> Tuple[pd.DataFrame, bool]:
+        """
+        Tabela de uma consulta
+
+        Returns:
+            (DataFrame, se veio da contingência do serviço)
+
+        Raises:
+            requests.exceptions.RequestException: Falha no serviço
+        """
+        entidade, componente, etapa, nivel = chave_consulta
+        parametros = {"entidade": entidade, "componente": componente, "etapa": etapa, "nivel": nivel,
+                      "tabela": tabela, "formato": self.formato}
+        chave = (chave_consulta, tabela)
+
+        with self._lock:
+            guardada = self._tabelas.get(chave)
+        cabecalhos = {"If-None-Match": guardada[0]} if guardada is not None else {}
+
+        resposta = self.sessao.get(self.url, params=parametros, headers=cabecalhos, timeout=self.timeout)
+        if resposta.status_code == 304 and guardada is not None:
+            with self._lock:
+                if chave in self._tabelas:
+                    self._tabelas.move_to_end(chave)
+            return guardada[1], guardada[2]
+        resposta.raise_for_status()
+
+        df = self._decodificar(resposta, tabela)
+        contingencia = resposta.headers.get("X-Contingencia") == "1"
+        etag = resposta.headers.get("ETag")
+        if etag and not contingencia:
+            with self._lock:
+                self._tabelas[chave] = (etag, df, contingencia)
+                self._tabelas.move_to_end(chave)
+                while len(self._tabelas) > self.max_itens:
+                    self._tabelas.popitem(last=False)
+        return df, contingencia
+
+    def _decodificar(self, resposta: requests.Response, tabela: str) -> pd.DataFrame:
+        if self.formato == "arrow":
+            import pyarrow as pa
+            return pa.ipc.open_stream(resposta.content).read_all().to_pandas()
+
+        df = pd.DataFrame(resposta.json()["dados"])
+        if tabela in ("geral", "habilidades") and not df.empty:
+            ProcessadorDados._normalizar_descritivos(df)
+        return df
+
+    def conjunto(self, chave_consulta: Tuple[str, str, int, int]) -> ConjuntoDados:
+        """Conjunto consolidado da consulta (tabelas geral, habilidades e niveis)"""
+        tabelas: Dict[str, pd.DataFrame] = {}
+        contingencia = False
+        for nome in ("geral", "habilidades", "niveis"):
+            tabelas[nome], contingencia_tabela = self.tabela(chave_consulta, nome)
+            contingencia = contingencia or contingencia_tabela
+        return ConjuntoDados(tabelas["geral"], tabelas["habilidades"], tabelas["niveis"], contingencia)
@@ -14,7 +14,73 @@ class ConfigAPI:
     
     # Timeout para requisições
     REQUEST_TIMEOUT: int = 30
-    
+
+    # Validade (s) dos conjuntos de dados consolidados em memória
+    TTL_CACHE_CONJUNTOS: int = 300
+
+    # Orçamento de memória dos conjuntos consolidados: total do processo e por
+    # sessão (itens usados há mais tempo são descartados acima dos limites)
+    MAX_BYTES_CACHE_CONJUNTOS: int = 512 * 1024 * 1024
+    MAX_BYTES_CONJUNTOS_SESSAO: int = 128 * 1024 * 1024
+
+    # Respostas brutas da API mantidas em cache (por processo): validade (s) e quantidade
+    TTL_RESPOSTAS_CACHE_API: int = 300
+    MAX_RESPOSTAS_CACHE_API: int = 256
+
+    # Códigos de login com acesso à visão de administração (memória do processo)
+    CODIGOS_ADMINISTRACAO: FrozenSet[str] = frozenset()
+
+    # Limite de requisições simultâneas à API (compartilhado pelo processo)
+    MAX_REQUISICOES_SIMULTANEAS: int = 8
+
+    # Tempo máximo (s) aguardando vaga no limitador antes de desistir
+    TEMPO_ESPERA_LIMITADOR: float = 10.0
+
+    # Circuit breaker: falhas consecutivas (timeout/5xx) que abrem o circuito
+    CIRCUIT_BREAKER_FALHAS: int = 3
+
+    # Circuit breaker: tempo inicial (s) com o circuito aberto e teto do backoff
+    CIRCUIT_BREAKER_RECUPERACAO: float = 30.0
+    CIRCUIT_BREAKER_RECUPERACAO_MAX: float = 300.0
+
+    # Intervalo (s) entre verificações enquanto o painel aguarda as requisições
+    INTERVALO_VERIFICACAO_CONSULTAS: float = 0.25
+
+    # Prefetch de combinações vizinhas: threads de fundo e combinações agendadas
+    # por sessão dentro de uma janela deslizante (s)
+    MAX_WORKERS_PREFETCH: int = 2
+    ORCAMENTO_PREFETCH_SESSAO: int = 12
+    JANELA_PREFETCH_SESSAO: float = 300.0
+
+    # Linhas convertidas e gravadas por vez na exportação de arquivos
+    TAMANHO_BLOCO_EXPORTACAO: int = 50_000
+
+    # Cache em disco de gráficos renderizados (relatórios): diretório e tamanho máximo
+    DIRETORIO_CACHE_RENDERIZACAO: str = ".cache/renderizacao"
+    MAX_BYTES_CACHE_RENDERIZACAO: int = 200 * 1024 * 1024
+
+    # Arquivo das respostas brutas da API (depuração e replay): ativo, diretório
+    # e compressão ('zstd' requer o pacote zstandard; sem ele usa 'gzip')
+    ARQUIVAR_RESPOSTAS: bool = False
+    DIRETORIO_ARQUIVO_RESPOSTAS: str = ".cache/respostas"
+    COMPRESSAO_ARQUIVO_RESPOSTAS: str = "zstd"
+
+    # Armazém compartilhado de conjuntos consolidados (modo com vários processos):
+    # ativo, diretório (comum a todos os processos, requer pyarrow) e validade (s)
+    ARMAZEM_COMPARTILHADO: bool = False
+    DIRETORIO_ARMAZEM_CONJUNTOS: str = ".cache/conjuntos"
+    TTL_ARMAZEM_CONJUNTOS: int = 1800
+
+    # Serviço local de consultas (servico_consultas.py): porta, tamanho mínimo
+    # para gzip e URL usada pelo painel (vazia = painel consulta a API direto)
+    PORTA_SERVICO_CONSULTAS: int = 8502
+    MIN_BYTES_GZIP_SERVICO: int = 1024
+    URL_SERVICO_CONSULTAS: str = ""
+
+    # Iterações PBKDF2 dos hashes de senha gerados para o secrets.toml, usadas
+    # também nos hashes feitos em memória para senhas ainda em texto puro
+    ITERACOES_HASH_SENHA: int = 600_000
+
     # Etapas disponíveis
     ETAPAS: Set[int] = frozenset({2, 4, 5, 8, 9})
     
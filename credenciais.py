@@ -0,0 +1,152 @@
+# --------------------------------------------------------------------------
+# REPOSITÓRIO DE CREDENCIAIS - AVALIECE1
+# --------------------------------------------------------------------------
+
+"""
+Credenciais de municípios e escolas indexadas por código, com senhas em hash.
+
+O repositório é montado uma vez por processo a partir de xmunicipios e
+xescolas do secrets.toml. As senhas podem estar no secrets.toml já em hash
+(recomendado) ou em texto puro; neste caso são convertidas em hash na carga,
+com as mesmas iterações dos hashes do secrets.toml, e o texto puro não fica
+guardado no repositório. Os hashes da carga são calculados em paralelo, mas
+ainda custam alguns décimos de segundo por senha em texto puro. A verificação usa
+comparação em tempo constante e também calcula um hash para códigos
+inexistentes com os parâmetros (iterações) de um registro real, escolhido
+de forma fixa por código, para o tempo de resposta não revelar quais
+códigos existem mesmo com senhas em hash e em texto puro misturadas.
+
+Para gerar o hash de uma senha para o secrets.toml:
+    python credenciais.py
+"""
+
+import hashlib
+import hmac
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Mapping, Optional
+
+from config_api import config_api
+
+# Formato: pbkdf2_sha256$<iterações>$<salt hex>$<hash hex>
+PREFIXO_HASH = "pbkdf2_sha256"
+
+
+@dataclass(frozen=True)
+class PerfilUsuario:
+    """Perfil de acesso de um código de login"""
+    codigo: str
+    tipo: str
+    entidades_permitidas: FrozenSet[str]
+
+
+@dataclass(frozen=True)
+class _RegistroSenha:
+    salt: bytes
+    iteracoes: int
+    hash: bytes
+
+    def confere(self, senha: str) -> bool:
+        calculado = hashlib.pbkdf2_hmac("sha256", senha.encode("utf-8"), self.salt, self.iteracoes)
+        return hmac.compare_digest(calculado, self.hash)
+
+
+def gerar_hash_senha(senha: str, iteracoes: int = config_api.ITERACOES_HASH_SENHA) -> str:
+    """Gera o hash de uma senha no formato aceito pelo secrets.toml"""
+    salt = secrets.token_bytes(16)
+    valor = hashlib.pbkdf2_hmac("sha256", senha.encode("utf-8"), salt, iteracoes)
+    return f"{PREFIXO_HASH}${iteracoes}${salt.hex()}${valor.hex()}"
+
+
+def _registro(valor: str) -> _RegistroSenha:
+    """Interpreta o valor do secrets.toml (hash ou texto puro)"""
+    if valor.startswith(f"{PREFIXO_HASH}$"):
+        _, iteracoes, salt, hash_hex = valor.split("$")
+        return _RegistroSenha(bytes.fromhex(salt), int(iteracoes), bytes.fromhex(hash_hex))
+
+    # Texto puro: hash em memória com as mesmas iterações, para o tempo de verificação não
+    # distinguir senhas em hash de senhas em texto puro
+    salt = secrets.token_bytes(16)
+    iteracoes = config_api.ITERACOES_HASH_SENHA
+    return _RegistroSenha(salt, iteracoes, hashlib.pbkdf2_hmac("sha256", valor.encode("utf-8"), salt, iteracoes))
+
+
+class RepositorioCredenciais:
+    """Índice de credenciais e perfis por código, montado uma vez por processo"""
+
+    def __init__(self, senhas: Dict[str, _RegistroSenha], perfis: Dict[str, PerfilUsuario]):
+        self._senhas = senhas
+        self._perfis = perfis
+        # Usados para gastar com códigos inexistentes o mesmo tempo de um código real: cada
+        # código inexistente é sempre verificado com as iterações do mesmo registro real
+        self._iteracoes_registros = [registro.iteracoes for registro in senhas.values()] or [
+            config_api.ITERACOES_HASH_SENHA]
+        self._chave_ficticia = secrets.token_bytes(32)
+        self._hash_ficticio = secrets.token_bytes(32)
+
+    @classmethod
+    def de_secrets(cls, usuarios: Mapping[str, str], escolas: Mapping[str, str]) -> "RepositorioCredenciais":
+        """
+        Monta o repositório a partir das seções do secrets.toml
+
+        Args:
+            usuarios: xmunicipios (código do município -> senha)
+            escolas: xescolas (código da escola -> senha)
+        """
+        valores = {}
+        perfis = {}
+
+        # Em códigos repetidos prevalece a senha de xescolas, como no merge anterior
+        for origem in (usuarios, escolas):
+            for codigo, valor in origem.items():
+                codigo = str(codigo)
+                valores[codigo] = str(valor)
+                perfis[codigo] = PerfilUsuario(codigo, cls._tipo_usuario(codigo, usuarios), frozenset({codigo}))
+
+        # O PBKDF2 do hashlib libera o GIL: as senhas em texto puro são convertidas em paralelo
+        with ThreadPoolExecutor() as executor:
+            senhas = dict(zip(valores, executor.map(_registro, valores.values())))
+
+        return cls(senhas, perfis)
+
+    @staticmethod
+    def _tipo_usuario(codigo: str, usuarios: Mapping[str, str]) -> str:
+        if codigo in usuarios:
+            return "Municipal"
+        if codigo in config_api.ESCOLAS_INDIGENAS:
+            return "Escola Indígena"
+        return "Escola"
+
+    def autenticar(self, codigo: str, senha: str) -> Optional[PerfilUsuario]:
+        """Retorna o perfil se o código e a senha conferem, senão None"""
+        registro = self._senhas.get(codigo)
+        if registro is None:
+            self._registro_ficticio(codigo).confere(senha)
+            return None
+        return self._perfis[codigo] if registro.confere(senha) else None
+
+    def _registro_ficticio(self, codigo: str) -> _RegistroSenha:
+        """Registro que nunca confere, com as iterações de um registro real escolhido pelo código"""
+        selecao = hmac.new(self._chave_ficticia, codigo.encode("utf-8"), hashlib.sha256).digest()
+        iteracoes = self._iteracoes_registros[int.from_bytes(selecao[:8], "big") % len(self._iteracoes_registros)]
+        return _RegistroSenha(selecao[8:24], iteracoes, self._hash_ficticio)
+    
+    def perfil(self, codigo: str) -> Optional[PerfilUsuario]:
+        """Perfil de um código já autenticado"""
+        return self._perfis.get(codigo)
+
+    def __contains__(self, codigo: str) -> bool:
+        return codigo in self._perfis
+
+    def __len__(self) -> int:
+        return len(self._perfis)
+
+
+if __name__ == "__main__":
+    import getpass
+
+    senha = getpass.getpass("Senha: ")
+    if senha != getpass.getpass("Confirme a senha: "):
+        raise SystemExit("As senhas não conferem")
+    print(gerar_hash_senha(senha))
@@ -0,0 +1,62 @@
+# --------------------------------------------------------------------------
+# ESTADO POR SESSÃO - AVALIECE1
+# --------------------------------------------------------------------------
+
+"""
+Estado por usuário para os gerenciadores globais dos módulos.
+
+Os gerenciadores (gerenciador_nivel, gerenciador_ranking) são instâncias
+únicas por processo, compartilhadas por todas as sessões. O que é escolha do
+usuário fica em st.session_state através de AtributoSessao; o restante da
+instância (configurações, caches imutáveis) continua compartilhado.
+
+Fora do Streamlit (scripts, gerador de relatórios) o estado fica em um
+dicionário do processo.
+"""
+
+from typing import Any, MutableMapping
+
+import streamlit as st
+
+try:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+except ImportError:  # Execução fora do Streamlit
+    get_script_run_ctx = None
+
+# Estado usado quando não há sessão do Streamlit
+_estado_local: dict = {}
+
+
+def estado_sessao() -> MutableMapping[str, Any]:
+    """st.session_state da sessão atual, ou o estado local fora do Streamlit"""
+    if get_script_run_ctx is not None and get_script_run_ctx() is not None:
+        return st.session_state
+    return _estado_local
+
+
+class AtributoSessao:
+    """
+    Atributo de classe cujo valor é guardado por sessão
+
+    Exemplo:
+        class GerenciadorNivel:
+            nivel_atual = AtributoSessao(NIVEL_PADRAO)
+
+    A chave no session_state leva o nome da classe e do atributo, então
+    instâncias da mesma classe compartilham o valor dentro de uma sessão.
+    """
+
+    def __init__(self, padrao: Any = None):
+        self.padrao = padrao
+        self.chave = None
+
+    def __set_name__(self, dono: type, nome: str):
+        self.chave = f"_{dono.__name__}_{nome}"
+
+    def __get__(self, instancia, dono=None):
+        if instancia is None:
+            return self
+        return estado_sessao().get(self.chave, self.padrao)
+
+    def __set__(self, instancia, valor):
+        estado_sessao()[self.chave] = valor
@@ -0,0 +1,211 @@
+# --------------------------------------------------------------------------
+# EXPORTAÇÃO DE DADOS - AVALIECE1
+# --------------------------------------------------------------------------
+
+"""
+Exporta os resultados e rankings completos (sem paginação) para CSV, Excel
+ou Parquet.
+
+Os DataFrames vêm do ConjuntoDados já em cache, sem nova consulta à API, e
+são gravados em blocos de linhas: cada bloco é convertido e escrito antes do
+próximo, então a memória extra fica limitada ao tamanho do bloco em vez de
+uma cópia textual da tabela inteira. O arquivo é gerado em um temporário em
+disco, entregue ao botão de download como arquivo aberto: a única cópia em
+memória do arquivo inteiro é a que o Streamlit guarda para servir o download.
+
+Com mais de uma tabela, CSV e Parquet geram um .zip com um arquivo por
+tabela; no Excel cada tabela vira uma planilha. pyarrow e openpyxl só são
+importados quando um arquivo é gerado no formato correspondente.
+"""
+
+import io
+import tempfile
+import zipfile
+from importlib.util import find_spec
+from typing import BinaryIO, Dict, Iterator, Optional
+
+import pandas as pd
+import streamlit as st
+
+from config_api import config_api
+from processamento_dados import ConjuntoDados
+
+# Formatos suportados: rótulo exibido e se a dependência está instalada
+FORMATOS = {
+    "csv": ("CSV", True),
+    "xlsx": ("Excel (XLSX)", find_spec("openpyxl") is not None),
+    "parquet": ("Parquet", find_spec("pyarrow") is not None),
+}
+
+# Limite de linhas por planilha do Excel (descontado o cabeçalho)
+MAX_LINHAS_XLSX = 1_048_575
+
+
+def formatos_disponiveis() -> Dict[str, str]:
+    """Formatos com as dependências instaladas, com o rótulo de exibição"""
+    return {formato: rotulo for formato, (rotulo, disponivel) in FORMATOS.items() if disponivel}
+
+
+def _blocos(df: pd.DataFrame, tamanho_bloco: int) -> Iterator[pd.DataFrame]:
+    """Fatias consecutivas do DataFrame (sem cópia)"""
+    for inicio in range(0, len(df), tamanho_bloco):
+        yield df.iloc[inicio:inicio + tamanho_bloco]
+
+# --------------------------------------------------------------------------
+# ESCRITORES POR FORMATO
+# --------------------------------------------------------------------------
+
+def escrever_csv(df: pd.DataFrame, destino: BinaryIO, tamanho_bloco: int = config_api.TAMANHO_BLOCO_EXPORTACAO):
+    """Grava o DataFrame em CSV (UTF-8 com BOM, para abrir direto no Excel)"""
+    texto = io.TextIOWrapper(destino, encoding="utf-8-sig", newline="", write_through=True)
+    try:
+        for i, bloco in enumerate(_blocos(df, tamanho_bloco)):
+            bloco.to_csv(texto, index=False, header=(i == 0))
+        if df.empty:
+            df.to_csv(texto, index=False)
+        texto.flush()
+    finally:
+        # Não fecha o destino, que pertence a quem chamou
+        texto.detach()
+
+
+def escrever_parquet(df: pd.DataFrame, destino: BinaryIO, tamanho_bloco: int = config_api.TAMANHO_BLOCO_EXPORTACAO):
+    """Grava o DataFrame em Parquet, um row group por bloco"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Exportação em Parquet requer o pacote pyarrow") from None
+
+    esquema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(destino, esquema) as escritor:
+        for bloco in _blocos(df, tamanho_bloco):
+            escritor.write_table(pa.Table.from_pandas(bloco, schema=esquema, preserve_index=False))
+
+
+def escrever_xlsx(tabelas: Dict[str, pd.DataFrame], destino: BinaryIO,
+                  tamanho_bloco: int = config_api.TAMANHO_BLOCO_EXPORTACAO):
+    """Grava as tabelas em uma pasta de trabalho, uma planilha por tabela (modo write-only)"""
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise RuntimeError("Exportação em Excel requer o pacote openpyxl") from None
+
+    pasta = Workbook(write_only=True)
+    for nome, df in tabelas.items():
+        # Tabelas maiores que o limite do Excel continuam em planilhas numeradas
+        partes = [df.iloc[inicio:inicio + MAX_LINHAS_XLSX] for inicio in range(0, len(df), MAX_LINHAS_XLSX)] or [df]
+        for numero, parte in enumerate(partes, start=1):
+            planilha = pasta.create_sheet(title=(nome if len(partes) == 1 else f"{nome}_{numero}")[:31])
+            planilha.append([str(col) for col in parte.columns])
+            for bloco in _blocos(parte, tamanho_bloco):
+                # Valores ausentes viram células vazias
+                for linha in bloco.astype(object).where(bloco.notna(), None).itertuples(index=False, name=None):
+                    planilha.append(linha)
+    pasta.save(destino)
+
+# --------------------------------------------------------------------------
+# EXPORTAÇÃO DE VÁRIAS TABELAS
+# --------------------------------------------------------------------------
+
+def exportar(tabelas: Dict[str, pd.DataFrame], formato: str, destino: BinaryIO,
+             tamanho_bloco: int = config_api.TAMANHO_BLOCO_EXPORTACAO) -> str:
+    """
+    Exporta as tabelas no formato escolhido
+
+    Args:
+        tabelas: DataFrames indexados pelo nome da tabela
+        formato: 'csv', 'xlsx' ou 'parquet'
+        destino: Arquivo binário aberto para escrita
+        tamanho_bloco: Linhas convertidas e gravadas por vez
+
+    Returns:
+        Extensão do arquivo gerado ('zip' quando CSV/Parquet têm várias tabelas)
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de exportação desconhecido: {formato}")
+
+    if formato == "xlsx":
+        escrever_xlsx(tabelas, destino, tamanho_bloco)
+        return "xlsx"
+
+    escrever = escrever_csv if formato == "csv" else escrever_parquet
+
+    if len(tabelas) == 1:
+        escrever(next(iter(tabelas.values())), destino, tamanho_bloco)
+        return formato
+
+    with zipfile.ZipFile(destino, "w", compression=zipfile.ZIP_DEFLATED) as arquivo_zip:
+        for nome, df in tabelas.items():
+            with arquivo_zip.open(f"{nome}.{formato}", "w", force_zip64=True) as membro:
+                escrever(df, membro, tamanho_bloco)
+    return "zip"
+
+
+def tabelas_conjunto(conjunto: ConjuntoDados, coluna_entidade: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Tabelas completas de um conjunto de dados, prontas para exportação
+
+    Args:
+        conjunto: Conjunto em cache da consulta atual
+        coluna_entidade: CD_ENTIDADE ou CD_TURMA para incluir as variações por entidade
+    """
+    tabelas = {
+        "dados_gerais": conjunto.geral,
+        "habilidades": conjunto.habilidades,
+        "niveis": conjunto.niveis,
+        "variacoes_habilidades": conjunto.variacoes.habilidades(coluna_entidade),
+    }
+    if coluna_entidade:
+        tabelas["variacoes_entidades"] = conjunto.variacoes.entidades(coluna_entidade)
+
+    return {nome: df for nome, df in tabelas.items() if not df.empty}
+
+# --------------------------------------------------------------------------
+# INTERFACE
+# --------------------------------------------------------------------------
+
+def renderizar_exportacao(tabelas: Dict[str, pd.DataFrame], nome_arquivo: str, chave: str):
+    """
+    Renderiza a escolha de formato e o botão de download
+
+    O arquivo só é gerado quando o usuário pede, e não a cada rerun.
+
+    Args:
+        tabelas: DataFrames a exportar, indexados pelo nome da tabela
+        nome_arquivo: Nome do arquivo sem extensão
+        chave: Sufixo para tornar as chaves dos widgets únicas
+    """
+    tabelas = {nome: df for nome, df in tabelas.items() if df is not None and not df.empty}
+    if not tabelas:
+        return
+
+    with st.expander("📥 Exportar dados completos", expanded=False):
+        formatos = formatos_disponiveis()
+        col1, col2 = st.columns([0.6, 0.4])
+
+        with col1:
+            formato = st.selectbox(
+                "Formato",
+                options=list(formatos.keys()),
+                format_func=lambda x: formatos[x],
+                key=f"formato_exportacao_{chave}"
+            )
+            total_linhas = sum(len(df) for df in tabelas.values())
+            st.caption(f"{len(tabelas)} tabela(s), {total_linhas} linha(s)")
+
+        with col2:
+            if st.button("Gerar arquivo", key=f"gerar_exportacao_{chave}"):
+                with tempfile.TemporaryFile() as arquivo:
+                    with st.spinner("Gerando arquivo..."):
+                        extensao = exportar(tabelas, formato, arquivo)
+                        arquivo.flush()
+
+                    # Leitor do próprio temporário: o Streamlit lê o arquivo uma vez, sem cópia intermediária
+                    with open(arquivo.fileno(), "rb", closefd=False) as leitor:
+                        st.download_button(
+                            "Baixar arquivo",
+                            data=leitor,
+                            file_name=f"{nome_arquivo}.{extensao}",
+                            key=f"baixar_exportacao_{chave}"
+                        )
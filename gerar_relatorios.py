@@ -0,0 +1,428 @@
+# --------------------------------------------------------------------------
+# GERADOR DE RELATÓRIOS EM LOTE - AVALIECE1
+# --------------------------------------------------------------------------
+
+"""
+Gera relatórios estáticos em HTML para todas as entidades, sem abrir o painel.
+
+Uso:
+    python gerar_relatorios.py --saida relatorios
+    python gerar_relatorios.py --entidades 2301 2302 --etapas 2 5 --componentes Matemática --nivel 1
+
+As credenciais da API e a lista de municípios vêm do mesmo secrets.toml do
+painel. Cada consulta (entidade, componente, etapa, ciclo) vem primeiro dos
+resultados já guardados (armazém de respostas e última versão no
+arquivo_respostas); apenas as ausentes vão à API, uma única vez e em
+paralelo, pelo cliente assíncrono. A montagem dos gráficos e tabelas de cada
+entidade é distribuída em um pool de processos. Para PDF, basta imprimir o
+HTML gerado pelo navegador.
+
+Com --arquivar-respostas as respostas novas vão para o arquivo_respostas;
+com --replay os relatórios usam apenas as respostas guardadas, sem acessar
+a API, e com --atualizar todas as consultas vão à API.
+"""
+
+import argparse
+import base64
+import html
+import json
+import logging
+import sys
+import tomllib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from arquivo_respostas import arquivo_respostas
+from cache_renderizacao import cache_renderizacao
+from cliente_async import buscar_em_lote
+from config_api import config_api, config_nivel
+from graficos import GeradorGraficos
+from payloads import criar_payload_geral, criar_payload_habilidades
+from processamento_dados import ConjuntoDados, ProcessadorDados
+from ranking_seletores import GerenciadorRankingSeletores
+from resiliencia_api import armazem_respostas, chave_payload
+
+# Respostas de uma consulta, indexadas por (tipo, ciclo)
+RespostasConsulta = Dict[Tuple[str, str], Optional[Dict]]
+
+ESTILO = """
+body { font-family: sans-serif; margin: 2rem auto; max-width: 1100px; color: #222; }
+h1 { color: #1f5f3a; } h2 { border-bottom: 2px solid #20ac52; padding-bottom: .3rem; margin-top: 2.5rem; }
+.tabela { border-collapse: collapse; margin: .5rem 0 1.5rem; font-size: .9rem; }
+.tabela th, .tabela td { border: 1px solid #ccc; padding: .3rem .6rem; text-align: left; }
+.tabela th { background: #eef7f1; }
+.colunas { display: flex; gap: 2rem; flex-wrap: wrap; } .colunas > div { flex: 1; min-width: 320px; }
+.aviso { color: #8a5a00; }
+"""
+
+
+def carregar_secrets(caminho: Path) -> Dict:
+    """Lê o secrets.toml do painel"""
+    with open(caminho, "rb") as arquivo:
+        return tomllib.load(arquivo)
+
+# --------------------------------------------------------------------------
+# CONSULTAS
+# --------------------------------------------------------------------------
+
+def montar_payloads(entidade: str, componente: str, etapa: int, nivel: int,
+                    installation_id: str, session_token: str) -> Dict[Tuple[str, str], Dict]:
+    """Payloads gerais e de habilidades de todos os ciclos (mesmos do painel)"""
+    payloads = {}
+    for ciclo_key in dict(config_api.CICLOS):
+        payloads[("geral", ciclo_key)] = criar_payload_geral(
+            entidade, componente, etapa, ciclo_key, installation_id, session_token, nivel
+        )
+        payloads[("habilidades", ciclo_key)] = criar_payload_habilidades(
+            entidade, componente, etapa, ciclo_key, installation_id, session_token, nivel
+        )
+    return payloads
+
+
+def _resposta_guardada(payload: Dict) -> Optional[Dict]:
+    """Resposta já obtida da consulta: armazém de respostas do processo ou última versão arquivada"""
+    guardada = armazem_respostas.obter(chave_payload(payload))
+    if guardada is not None:
+        return guardada[1]
+    return arquivo_respostas.obter(payload)
+
+
+def buscar_respostas(consultas: Dict[Tuple[str, str, int], Dict[Tuple[str, str], Dict]],
+                     replay: bool = False, atualizar: bool = False) -> Dict[Tuple[str, str, int], RespostasConsulta]:
+    """
+    Respostas de todas as consultas, reaproveitando as já guardadas
+
+    As requisições sem resposta guardada vão à API em um único lote assíncrono.
+
+    Args:
+        consultas: Payloads de cada (entidade, componente, etapa)
+        replay: Usa apenas as respostas guardadas, sem consultar a API
+        atualizar: Ignora as respostas guardadas e consulta todas na API
+
+    Returns:
+        Respostas com as mesmas chaves (None nas requisições que falharam
+        ou, no replay, que não estão guardadas)
+    """
+    chaves = [(consulta, nome) for consulta, payloads in consultas.items() for nome in payloads]
+    respostas: Dict[Tuple, Optional[Dict]] = {}
+    if not atualizar:
+        for consulta, nome in chaves:
+            resposta = _resposta_guardada(consultas[consulta][nome])
+            if resposta is not None:
+                respostas[(consulta, nome)] = resposta
+
+    faltantes = [chave for chave in chaves if chave not in respostas]
+    logging.info(f"{len(respostas)} de {len(chaves)} requisições reaproveitadas das respostas guardadas")
+    if faltantes and not replay:
+        logging.info(f"Consultando a API: {len(faltantes)} requisições")
+        novas = buscar_em_lote(consultas[consulta][nome] for consulta, nome in faltantes)
+        respostas.update(zip(faltantes, novas))
+
+    resultado: Dict[Tuple[str, str, int], RespostasConsulta] = {consulta: {} for consulta in consultas}
+    for consulta, nome in chaves:
+        resultado[consulta][nome] = respostas.get((consulta, nome))
+    return resultado
+
+# --------------------------------------------------------------------------
+# MONTAGEM DO RELATÓRIO (executada nos processos do pool)
+# --------------------------------------------------------------------------
+
+def _tabela(df: pd.DataFrame) -> str:
+    return df.to_html(index=False, classes="tabela", na_rep="-", border=0,
+                      float_format=lambda valor: f"{valor:.1f}")
+
+
+class _Figuras:
+    """
+    Converte figuras em HTML usando o cache de renderização
+
+    No formato html (interativo) o plotly.js (via CDN) é incluído apenas na
+    primeira figura; svg e png viram imagens estáticas embutidas.
+    """
+
+    def __init__(self, formato: str = "html", usar_cache: bool = True):
+        self.formato = formato
+        self.usar_cache = usar_cache
+        self._incluir_js = "cdn"
+
+    def _renderizar(self, fig, **opcoes) -> bytes:
+        if self.usar_cache:
+            return cache_renderizacao.renderizar(fig, self.formato, **opcoes)
+        if self.formato == "html":
+            return fig.to_html(full_html=False, **opcoes).encode("utf-8")
+        return fig.to_image(format=self.formato, **opcoes)
+
+    def html(self, fig) -> str:
+        if fig is None:
+            return ""
+        if self.formato == "svg":
+            return self._renderizar(fig).decode("utf-8")
+        if self.formato == "png":
+            imagem = base64.b64encode(self._renderizar(fig)).decode("ascii")
+            return f"<img src='data:image/png;base64,{imagem}' style='max-width: 100%'>"
+
+        trecho = self._renderizar(fig, include_plotlyjs=self._incluir_js).decode("utf-8")
+        self._incluir_js = False
+        return trecho
+
+
+def _habilidades_entidade(conjunto: ConjuntoDados, nivel: int) -> pd.DataFrame:
+    """
+    Taxa de acerto de cada habilidade e ciclo da entidade do relatório
+
+    Nos níveis 1 e 2 cada linha é uma escola ou turma da entidade: a taxa
+    é a média entre elas, uma barra por habilidade e ciclo.
+    """
+    df = conjunto.habilidades
+    chaves = ["CD_HABILIDADE", "DC_HABILIDADE", "Ciclo"]
+    if nivel == 0 or not all(col in df.columns for col in chaves):
+        return df
+    return (df.groupby(chaves, sort=False, observed=True, dropna=False)["TX_ACERTO"]
+            .mean().reset_index())
+
+
+def _secao_consulta(componente: str, etapa: int, conjunto: ConjuntoDados, nivel: int,
+                    figuras: _Figuras, ranking: GerenciadorRankingSeletores) -> str:
+    """Seção do relatório de uma combinação componente/etapa"""
+    partes = [f"<h2>{html.escape(componente)} - {etapa}º Ano</h2>"]
+
+    if conjunto.vazio:
+        partes.append("<p class='aviso'>Nenhum dado encontrado para esta combinação.</p>")
+        return "\n".join(partes)
+    if conjunto.contingencia:
+        partes.append("<p class='aviso'>Parte dos dados veio do armazém de contingência.</p>")
+
+    # Proficiência e participação por ciclo
+    resumo = conjunto.variacoes.entidades()
+    linhas = []
+    for ciclo, sufixo in [("1º Ciclo", "C1"), ("2º Ciclo", "C2")]:
+        df_ciclo = conjunto.geral_ciclo(ciclo)
+        if df_ciclo.empty:
+            continue
+        linhas.append({
+            "Ciclo": ciclo,
+            "Proficiência Média": resumo.get(f"AVG_PROFICIENCIA_E1_{sufixo}", pd.Series([None])).iloc[0],
+            "Participação (%)": df_ciclo["TX_PARTICIPACAO"].mean() if "TX_PARTICIPACAO" in df_ciclo.columns else None,
+            "Previstos": df_ciclo["QT_ALUNO_PREVISTO"].sum() if "QT_ALUNO_PREVISTO" in df_ciclo.columns else None,
+            "Efetivos": df_ciclo["QT_ALUNO_EFETIVO"].sum() if "QT_ALUNO_EFETIVO" in df_ciclo.columns else None,
+        })
+    if linhas:
+        partes.append("<h3>Resultados por Ciclo</h3>" + _tabela(pd.DataFrame(linhas)))
+        if "DELTA_AVG_PROFICIENCIA_E1" in resumo.columns and pd.notna(resumo["DELTA_AVG_PROFICIENCIA_E1"].iloc[0]):
+            partes.append(f"<p>Variação da proficiência (2º - 1º Ciclo): "
+                          f"<b>{resumo['DELTA_AVG_PROFICIENCIA_E1'].iloc[0]:+.1f}</b></p>")
+
+    # Gráficos
+    if not conjunto.habilidades.empty:
+        partes.append("<h3>Taxa de Acertos por Habilidades</h3>")
+        partes.append(figuras.html(GeradorGraficos.criar_grafico_habilidades(_habilidades_entidade(conjunto, nivel))))
+    if not conjunto.niveis_por_ciclo.empty:
+        partes.append("<h3>Distribuição dos Estudantes por Nível de Aprendizagem</h3>")
+        partes.append(figuras.html(GeradorGraficos.criar_grafico_evolucao_niveis(conjunto.niveis_por_ciclo)))
+
+    # Maiores e menores desempenhos por ciclo
+    habilidades = conjunto.ranking_habilidades
+    for ciclo in ["1º Ciclo", "2º Ciclo"]:
+        if habilidades.quantidade(ciclo):
+            partes.append(
+                f"<h3>Top 5 Habilidades - {ciclo}</h3><div class='colunas'>"
+                f"<div><h4>Maiores Desempenhos</h4>{_tabela(habilidades.maiores(ciclo, 5))}</div>"
+                f"<div><h4>Menores Desempenhos</h4>{_tabela(habilidades.menores(ciclo, 5))}</div></div>"
+            )
+
+    # Ranking das escolas ou turmas da entidade
+    if nivel in (1, 2):
+        coluna, descricao = ("CD_ENTIDADE", "Escolas") if nivel == 1 else ("CD_TURMA", "Turmas")
+        if coluna in conjunto.geral.columns:
+            metricas = (ranking._calcular_metricas_escolas if nivel == 1 else ranking._calcular_metricas_turmas_municipais)(
+                conjunto.geral, conjunto.habilidades, "proficiencia", conjunto.variacoes
+            )
+            variacoes = conjunto.variacoes.entidades(coluna)
+            if "DELTA_AVG_PROFICIENCIA_E1" in variacoes.columns:
+                metricas = metricas.merge(variacoes[[coluna, "DELTA_AVG_PROFICIENCIA_E1"]], on=coluna, how="left")
+            colunas = {
+                "NM_INSTITUICAO": "Escola", "NM_TURMA": "Turma", "MEDIA_PROFICIENCIA": "Proficiência Média",
+                "DELTA_AVG_PROFICIENCIA_E1": "Variação", "MEDIA_PARTICIPACAO": "Participação Média",
+                "TOTAL_ALUNOS": "Total de Alunos",
+            }
+            tabela = metricas[[col for col in colunas if col in metricas.columns]].rename(columns=colunas)
+            tabela.insert(0, "Posição", range(1, len(tabela) + 1))
+            partes.append(f"<h3>Ranking de {descricao}</h3>" + _tabela(tabela))
+
+    return "\n".join(partes)
+
+
+def gerar_relatorio(entidade: str, consultas: Dict[Tuple[str, int], RespostasConsulta],
+                    nivel: int, saida: str, formato_graficos: str = "html",
+                    usar_cache: bool = True) -> Tuple[str, str]:
+    """
+    Monta e grava o relatório HTML de uma entidade
+
+    Args:
+        entidade: Código da entidade
+        consultas: Respostas de cada (componente, etapa)
+        nivel: Nível de agregação usado nas consultas
+        saida: Diretório de saída
+        formato_graficos: 'html' (interativos), 'svg' ou 'png'
+        usar_cache: Reaproveitar gráficos já renderizados em disco
+
+    Returns:
+        (nome da entidade, caminho do arquivo gerado)
+    """
+    figuras = _Figuras(formato_graficos, usar_cache)
+    ranking = GerenciadorRankingSeletores()
+    nome_entidade = entidade
+    secoes = []
+
+    for (componente, etapa), respostas in sorted(consultas.items(), key=lambda item: (item[0][1], item[0][0])):
+        conjunto = ProcessadorDados.conjunto_de_respostas(respostas)
+        # Abaixo do nível município cada linha é uma escola/turma: o nome não é o da entidade
+        if nivel == 0 and not conjunto.geral.empty and "NM_ENTIDADE" in conjunto.geral.columns:
+            nome_entidade = str(conjunto.geral["NM_ENTIDADE"].iloc[0])
+        secoes.append(_secao_consulta(componente, etapa, conjunto, nivel, figuras, ranking))
+
+    agregacao = config_nivel.get_config_nivel(nivel)["tipo_agregacao"]
+    documento = f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head><meta charset="utf-8"><title>Resultados - {html.escape(nome_entidade)}</title><style>{ESTILO}</style></head>
+<body>
+<h1>Painel de Resultados - CECOM/CREDE 01</h1>
+<p><b>Entidade:</b> {html.escape(nome_entidade)} ({html.escape(entidade)})<br>
+<b>Nível de agregação:</b> {html.escape(agregacao)}<br>
+<b>Gerado em:</b> {datetime.now().strftime("%d/%m/%Y %H:%M")}</p>
+{"".join(secoes)}
+</body>
+</html>
+"""
+    caminho = Path(saida) / f"relatorio_{entidade}.html"
+    caminho.write_text(documento, encoding="utf-8")
+    return nome_entidade, str(caminho)
+
+
+def gravar_indice(saida: Path, relatorios: List[Tuple[str, str, str]]):
+    """
+    Grava o index.html com links para todos os relatórios do diretório
+
+    Os relatórios de execuções anteriores (registrados em indice.json) são
+    mantidos, então gerar apenas algumas entidades não as remove do índice.
+    """
+    registro = saida / "indice.json"
+    try:
+        entradas = json.loads(registro.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        entradas = {}
+    for entidade, nome, caminho in relatorios:
+        entradas[entidade] = {"nome": nome, "arquivo": Path(caminho).name}
+    entradas = {entidade: item for entidade, item in entradas.items() if (saida / item["arquivo"]).exists()}
+    registro.write_text(json.dumps(entradas, ensure_ascii=False, indent=1), encoding="utf-8")
+
+    itens = "\n".join(
+        f"<li><a href='{html.escape(item['arquivo'])}'>{html.escape(item['nome'])}</a> ({html.escape(entidade)})</li>"
+        for entidade, item in sorted(entradas.items(), key=lambda par: par[1]["nome"])
+    )
+    (saida / "index.html").write_text(
+        f"<!DOCTYPE html><html lang='pt-BR'><head><meta charset='utf-8'><title>Relatórios</title>"
+        f"<style>{ESTILO}</style></head><body><h1>Relatórios por Entidade</h1><ul>{itens}</ul></body></html>",
+        encoding="utf-8"
+    )
+
+# --------------------------------------------------------------------------
+# EXECUÇÃO
+# --------------------------------------------------------------------------
+
+def criar_parser() -> argparse.ArgumentParser:
+    componentes = list(dict(config_api.COMPONENTES).keys())
+    parser = argparse.ArgumentParser(description="Gera relatórios HTML de resultados para várias entidades")
+    parser.add_argument("--secrets", type=Path, default=Path(".streamlit/secrets.toml"),
+                        help="Arquivo secrets.toml do painel (padrão: .streamlit/secrets.toml)")
+    parser.add_argument("--entidades", nargs="+",
+                        help="Códigos das entidades (padrão: todos os municípios do secrets.toml)")
+    parser.add_argument("--etapas", nargs="+", type=int, default=sorted(config_api.ETAPAS),
+                        choices=sorted(config_api.ETAPAS), help="Etapas (padrão: todas)")
+    parser.add_argument("--componentes", nargs="+", default=componentes, choices=componentes,
+                        help="Componentes curriculares (padrão: todos)")
+    parser.add_argument("--nivel", type=int, default=0, choices=[0, 1, 2],
+                        help="Nível de agregação: 0 município, 1 escola, 2 turma (padrão: 0)")
+    parser.add_argument("--saida", type=Path, default=Path("relatorios"), help="Diretório de saída")
+    parser.add_argument("--processos", type=int, default=None,
+                        help="Processos para montar os relatórios (padrão: número de CPUs)")
+    parser.add_argument("--formato-graficos", default="html", choices=["html", "svg", "png"],
+                        help="html (interativos) ou imagens estáticas svg/png, que exigem o kaleido")
+    parser.add_argument("--sem-cache-graficos", action="store_true",
+                        help="Renderiza todos os gráficos sem usar o cache em disco (apenas svg e png)")
+    parser.add_argument("--arquivar-respostas", action="store_true",
+                        help=f"Arquiva as respostas brutas da API em {config_api.DIRETORIO_ARQUIVO_RESPOSTAS}")
+    origem = parser.add_mutually_exclusive_group()
+    origem.add_argument("--replay", action="store_true",
+                        help="Usa apenas as respostas guardadas, sem consultar a API")
+    origem.add_argument("--atualizar", action="store_true",
+                        help="Consulta todas as requisições na API, ignorando as respostas guardadas")
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    args = criar_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    try:
+        secrets = carregar_secrets(args.secrets)
+        installation_id = secrets["api"]["installation_id"]
+        session_token = secrets["api"]["session_token"]
+    except (OSError, KeyError, tomllib.TOMLDecodeError) as e:
+        logging.error(f"Erro na configuração: {e!r}. Verifique o arquivo secrets.toml")
+        return 1
+
+    entidades = args.entidades or sorted(secrets.get("xmunicipios", {}))
+    if not entidades:
+        logging.error("Nenhuma entidade informada ou encontrada em xmunicipios")
+        return 1
+
+    consultas = {
+        (entidade, componente, etapa): montar_payloads(entidade, componente, etapa, args.nivel,
+                                                       installation_id, session_token)
+        for entidade in entidades for componente in args.componentes for etapa in args.etapas
+    }
+    if not args.replay:
+        arquivo_respostas.ativo = arquivo_respostas.ativo or args.arquivar_respostas
+    logging.info(f"{len(consultas)} combinações, {len(consultas) * 4} requisições")
+    respostas = buscar_respostas(consultas, replay=args.replay, atualizar=args.atualizar)
+
+    falhas = sum(resposta is None for por_consulta in respostas.values() for resposta in por_consulta.values())
+    if falhas:
+        logging.warning(f"{falhas} requisições falharam; as seções afetadas ficam incompletas")
+
+    # Agrupa as respostas por entidade: um relatório por entidade
+    por_entidade: Dict[str, Dict[Tuple[str, int], RespostasConsulta]] = {}
+    for (entidade, componente, etapa), respostas_consulta in respostas.items():
+        por_entidade.setdefault(entidade, {})[(componente, etapa)] = respostas_consulta
+
+    args.saida.mkdir(parents=True, exist_ok=True)
+    relatorios = []
+
+    with ProcessPoolExecutor(max_workers=args.processos) as executor:
+        futuros = {
+            executor.submit(gerar_relatorio, entidade, consultas_entidade, args.nivel, str(args.saida),
+                            args.formato_graficos, not args.sem_cache_graficos): entidade
+            for entidade, consultas_entidade in por_entidade.items()
+        }
+        for futuro in as_completed(futuros):
+            entidade = futuros[futuro]
+            try:
+                nome, caminho = futuro.result()
+            except Exception as e:
+                logging.error(f"Falha ao gerar o relatório de {entidade}: {e!r}")
+                continue
+            relatorios.append((entidade, nome, caminho))
+            logging.info(f"[{len(relatorios)}/{len(futuros)}] {nome}: {caminho}")
+
+    gravar_indice(args.saida, relatorios)
+    logging.info(f"Relatórios gravados em {args.saida.resolve()}")
+    return 0 if len(relatorios) == len(por_entidade) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
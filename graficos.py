@@ -0,0 +1,177 @@
+# --------------------------------------------------------------------------
+# VISUALIZAÇÕES - AVALIECE1
+# --------------------------------------------------------------------------
+
+"""
+Gráficos do painel.
+
+O plotly é importado dentro de cada método, na primeira vez que um gráfico é
+criado: a tela de login e as sessões que ainda não exibiram resultados não
+carregam a pilha de visualização.
+"""
+
+from typing import TYPE_CHECKING
+
+import pandas as pd
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+class GeradorGraficos:
+    """Classe para gerar gráficos e visualizações"""
+    
+    @staticmethod
+    def criar_grafico_habilidades(df_habilidades: pd.DataFrame) -> "go.Figure":
+        """Cria gráfico de barras para habilidades"""
+        if df_habilidades.empty:
+            return None
+        import plotly.express as px
+
+        # Ordenar os ciclos na ordem desejada (2º Ciclo à direita)
+        # Invertemos a ordem das categorias para que o 2º Ciclo apareça à direita
+        # (assign gera uma cópia: o DataFrame recebido é compartilhado pelo cache)
+        df_habilidades = df_habilidades.assign(Ciclo=pd.Categorical(df_habilidades['Ciclo'], 
+                                                                    categories=["2º Ciclo", "1º Ciclo"],
+                                                                    ordered=True))
+        fig = px.bar(
+            df_habilidades,
+            x='DC_HABILIDADE',
+            y='TX_ACERTO',
+            title='Taxa de Acertos por Habilidades por Ciclo',
+            text=df_habilidades['TX_ACERTO'].round(1),
+            color='Ciclo',
+            color_discrete_map={"2º Ciclo": "#228B22", "1º Ciclo": "#20ac52"},
+            labels={
+                'TX_ACERTO': 'Taxa de Acertos (%)', 
+                'Ciclo': 'Ciclo de Avaliação',
+                'DC_HABILIDADE': 'Habilidade'
+            },
+            hover_data=['CD_HABILIDADE'],
+            range_y=[0, 109],
+            # Definir explicitamente a ordem das categorias na legenda
+            category_orders={"Ciclo": ["1º Ciclo", "2º Ciclo"]}
+        )
+        
+        # Personalizações
+        fig.update_traces(
+            textfont=dict(size=18),
+            textposition='outside',
+            hovertemplate="<b>Habilidade:</b> %{customdata[0]}<br>" +
+                         "<b>Taxa de Acerto:</b> %{y:.1f}%<br>" +
+                         "<b>Descrição:</b> %{x}<br>" +
+                         "<extra></extra>",
+            hoverlabel=dict(font_size=14)
+        )
+        
+        fig.update_layout(
+            showlegend=True,
+            barmode='group',
+            yaxis=dict(dtick=10, title_font=dict(size=14), tickfont=dict(size=12)),
+            xaxis=dict(showticklabels=False, title_font=dict(size=14)),
+            height=400
+        )
+        
+        return fig
+    
+    @staticmethod
+    def criar_gauge_participacao(valor: float, cor: str) -> "go.Figure":
+        """Cria gráfico gauge para participação"""
+        import plotly.graph_objects as go
+
+        fig = go.Figure(go.Indicator(
+            mode="gauge+number",
+            value=valor,
+            number={'suffix': '%'},
+            gauge={
+                'axis': {'range': [0, 100]},
+                'bar': {'color': cor},
+                'steps': [
+                    {'range': [0, 80], 'color': "#f5d7d7"},
+                    {'range': [80, 90], 'color': "#f5eed7"},
+                    {'range': [90, 100], 'color': "#d7f5df"}
+                ],
+                'threshold': {
+                    'line': {'color': "#454545", 'width': 4},
+                    'thickness': 0.85,
+                    'value': valor
+                }
+            }
+        ))
+        
+        fig.update_layout(height=200, margin=dict(l=10, r=10, t=30, b=10))
+        return fig
+    
+    @staticmethod
+    def criar_grafico_evolucao_niveis(df_niveis: pd.DataFrame) -> "go.Figure":
+        """
+        Cria gráfico de evolução dos níveis em barras horizontais
+        
+        Args:
+            df_niveis: Distribuição com uma linha por ciclo (ProcessadorDados.selecionar_distribuicao)
+        """
+        if df_niveis.empty:
+            return None
+        import plotly.graph_objects as go
+        
+        # Ordenar pelos ciclos
+        ordem_ciclos = ["2º Ciclo", "1º Ciclo"]
+        df_ordenado = df_niveis.assign(
+            Ciclo=pd.Categorical(df_niveis['Ciclo'], categories=ordem_ciclos, ordered=True)
+        ).sort_values('Ciclo')
+        ciclos = df_ordenado['Ciclo'].astype(str)
+        
+        fig = go.Figure()
+        
+        # Configurações das barras
+        barras_config = [
+            ('NU_N01_TRI_E1', 'Defasagem', '#FF4444'),
+            ('NU_N02_TRI_E1', 'Aprendizado Intermediário', '#FFA500'),
+            ('NU_N03_TRI_E1', 'Aprendizado Adequado', '#32CD32')
+        ]
+        
+        for coluna, nome, cor in barras_config:
+            if coluna in df_ordenado.columns:
+                valores = df_ordenado[coluna].fillna(0)
+                percentuais = df_ordenado[coluna.replace('NU_', 'PC_')].fillna(0)
+                
+                fig.add_trace(go.Bar(
+                    y=ciclos,                            # eixo Y (categorias)
+                    x=valores,                           # valores no eixo X
+                    name=nome,
+                    orientation='h',                     # barras horizontais
+                    marker=dict(color=cor),
+                    text=[f"{v:.0f}" for v in valores], # labels com quantidade
+                    customdata=percentuais,
+                    hovertemplate=f"<b>{nome}</b><br>" +
+                                "Ciclo: %{y}<br>" +
+                                "Quantidade de Estudantes: %{x:.1f}<br>" +
+                                "Percentual: %{customdata:.1f}%<br>" +
+                                "<extra></extra>"
+                ))
+        
+        if fig.data:
+            fig.update_layout(
+                barmode='stack',  # barras empilhadas
+                title=dict(
+                    text='Evolução dos Níveis de Aprendizagem',
+                    font=dict(size=18),
+                    x=0.5
+                ),
+                xaxis=dict(
+                    title='Quantidade de Estudantes',
+                    tickfont=dict(size=16)
+                ),
+                yaxis=dict(
+                    title='Ciclo',
+                    tickfont=dict(size=16)
+                ),
+                legend=dict(font=dict(size=18)),
+                bargap=0.3
+            )
+            # aumentar tamanho dos rótulos
+            fig.update_traces(
+                textfont=dict(size=20),
+                textposition='inside'
+            )
+        
+        return fig
@@ -1,7 +1,135 @@
-INDIC_GERAL = {
+import hashlib
+from typing import Dict, Iterator, NamedTuple, Optional, Tuple
+
+INDIC_GERAL = frozenset({
     "201420400152000000000000000001","201420400152000000000000000002","201420400153000000000000000001","201420400153000000000000000002","201420400155000000000000000001","201420400155000000000000000002","201420400172000000000000000001","201420400172000000000000000002","201420400173000000000000000001","201420400173000000000000000002","201420400175000000000000000001","201420400175000000000000000002","201420400182000000000000000001","201420400182000000000000000002","201420400183000000000000000001","201420400183000000000000000002","201420400185000000000000000001","201420400185000000000000000002","201420400212000000000000000001","201420400212000000000000000002","201420400213000000000000000001","201420400213000000000000000002","201420400215000000000000000001","201420400215000000000000000002","201420400272000000000000000001","201420400272000000000000000002","201420400275000000000000000001","201420400275000000000000000002","201420400412000000000000000001","201420400412000000000000000002","201420400413000000000000000001","201420400413000000000000000002","201420400415000000000000000001","201420400415000000000000000002","208020400272000000000000000001","208020400272000000000000000002","213520400152000000000000000001","213520400152000000000000000002","213520400153000000000000000001","213520400153000000000000000002","213520400155000000000000000001","213520400155000000000000000002","213520400172000000000000000001","213520400172000000000000000002","213520400173000000000000000001","213520400173000000000000000002","213520400175000000000000000001","213520400175000000000000000002","213520400182000000000000000001","213520400182000000000000000002","213520400183000000000000000001","213520400183000000000000000002","213520400185000000000000000001","213520400185000000000000000002","213520400212000000000000000001","213520400212000000000000000002","213520400213000000000000000001","213520400213000000000000000002","213520400215000000000000000001","213520400215000000000000000002","213520400412000000000000000001","213520400412000000000000000002","213520400413000000000000000001","213520400413000000000000000002","213520400415000000000000000001","213520400415000000000000000002"
-    }
+    })
 
-INDIC_HABILIDADES = {
+INDIC_HABILIDADES = frozenset({
     "201420200152000000000000000001","201420200152000000000000000002","201420200152000000000000000003","201420200152000000000000000004","201420200152000000000000000005","201420200152000000000000000006","201420200152000000000000000007","201420200152000000000000000008","201420200152000000000000000010","201420200152000000000000000011","201420200152000000000000000014","201420200152000000000000000016","201420200152000000000000000018","201420200152000000000000000023","201420200152000000000000000030","201420200152000000000000000031","201420200152000000000000000034","201420200152000000000000000035","201420200152000000000000000036","201420200152000000000000000037","201420200152000000000000000038","201420200152000000000000000040","201420200152000000000000000070","201420200152000000000000000071","201420200152000000000000000072","201420200152000000000000000073","201420200152000000000000000087","201420200153000000000000000001","201420200153000000000000000002","201420200153000000000000000003","201420200153000000000000000004","201420200153000000000000000005","201420200153000000000000000006","201420200153000000000000000007","201420200153000000000000000008","201420200153000000000000000010","201420200153000000000000000011","201420200153000000000000000014","201420200153000000000000000016","201420200153000000000000000018","201420200153000000000000000023","201420200153000000000000000030","201420200153000000000000000031","201420200153000000000000000034","201420200153000000000000000035","201420200153000000000000000036","201420200153000000000000000037","201420200153000000000000000038","201420200153000000000000000040","201420200153000000000000000070","201420200153000000000000000071","201420200153000000000000000072","201420200153000000000000000073","201420200153000000000000000087","201420200155000000000000000001","201420200155000000000000000002","201420200155000000000000000003","201420200155000000000000000004","201420200155000000000000000005","201420200155000000000000000006","201420200155000000000000000007","201420200155000000000000000008","201420200155000000000000000010","201420200155000000000000000011","201420200155000000000000000014","201420200155000000000000000016","201420200155000000000000000018","201420200155000000000000000023","201420200155000000000000000030","201420200155000000000000000031","201420200155000000000000000034","201420200155000000000000000035","201420200155000000000000000036","201420200155000000000000000037","201420200155000000000000000038","201420200155000000000000000040","201420200155000000000000000070","201420200155000000000000000071","201420200155000000000000000072","201420200155000000000000000073","201420200155000000000000000087","201420200172000000000000000008","201420200172000000000000000009","201420200172000000000000000010","201420200172000000000000000012","201420200172000000000000000013","201420200172000000000000000016","201420200172000000000000000017","201420200172000000000000000018","201420200172000000000000000022","201420200172000000000000000023","201420200172000000000000000025","201420200172000000000000000031","201420200172000000000000000032","201420200172000000000000000033","201420200172000000000000000034","201420200172000000000000000036","201420200172000000000000000037","201420200172000000000000000041","201420200172000000000000000042","201420200172000000000000000043","201420200172000000000000000074","201420200172000000000000000075","201420200172000000000000000097","201420200172000000000000000099","201420200173000000000000000008","201420200173000000000000000009","201420200173000000000000000010","201420200173000000000000000012","201420200173000000000000000013","201420200173000000000000000016","201420200173000000000000000017","201420200173000000000000000018","201420200173000000000000000022","201420200173000000000000000023","201420200173000000000000000025","201420200173000000000000000031","201420200173000000000000000032","201420200173000000000000000033","201420200173000000000000000034","201420200173000000000000000036","201420200173000000000000000037","201420200173000000000000000041","201420200173000000000000000042","201420200173000000000000000043","201420200173000000000000000074","201420200173000000000000000075","201420200173000000000000000097","201420200173000000000000000099","201420200175000000000000000008","201420200175000000000000000009","201420200175000000000000000010","201420200175000000000000000012","201420200175000000000000000013","201420200175000000000000000016","201420200175000000000000000017","201420200175000000000000000018","201420200175000000000000000022","201420200175000000000000000023","201420200175000000000000000025","201420200175000000000000000031","201420200175000000000000000032","201420200175000000000000000033","201420200175000000000000000034","201420200175000000000000000036","201420200175000000000000000037","201420200175000000000000000041","201420200175000000000000000042","201420200175000000000000000043","201420200175000000000000000074","201420200175000000000000000075","201420200175000000000000000097","201420200175000000000000000099","201420200182000000000000000013","201420200182000000000000000014","201420200182000000000000000015","201420200182000000000000000016","201420200182000000000000000017","201420200182000000000000000018","201420200182000000000000000020","201420200182000000000000000022","201420200182000000000000000023","201420200182000000000000000025","201420200182000000000000000026","201420200182000000000000000027","201420200182000000000000000029","201420200182000000000000000031","201420200182000000000000000032","201420200182000000000000000034","201420200182000000000000000035","201420200182000000000000000036","201420200182000000000000000039","201420200182000000000000000042","201420200182000000000000000043","201420200182000000000000000044","201420200182000000000000000046","201420200182000000000000000047","201420200182000000000000000049","201420200182000000000000000050","201420200182000000000000000051","201420200182000000000000000069","201420200182000000000000000076","201420200182000000000000000098","201420200182000000000000000099","201420200182000000000000000100","201420200183000000000000000013","201420200183000000000000000014","201420200183000000000000000015","201420200183000000000000000016","201420200183000000000000000017","201420200183000000000000000018","201420200183000000000000000020","201420200183000000000000000022","201420200183000000000000000023","201420200183000000000000000025","201420200183000000000000000026","201420200183000000000000000027","201420200183000000000000000029","201420200183000000000000000031","201420200183000000000000000032","201420200183000000000000000034","201420200183000000000000000035","201420200183000000000000000036","201420200183000000000000000039","201420200183000000000000000042","201420200183000000000000000043","201420200183000000000000000044","201420200183000000000000000046","201420200183000000000000000047","201420200183000000000000000049","201420200183000000000000000050","201420200183000000000000000051","201420200183000000000000000069","201420200183000000000000000076","201420200183000000000000000098","201420200183000000000000000099","201420200183000000000000000100","201420200185000000000000000013","201420200185000000000000000014","201420200185000000000000000015","201420200185000000000000000016","201420200185000000000000000017","201420200185000000000000000018","201420200185000000000000000020","201420200185000000000000000022","201420200185000000000000000023","201420200185000000000000000025","201420200185000000000000000026","201420200185000000000000000027","201420200185000000000000000029","201420200185000000000000000031","201420200185000000000000000032","201420200185000000000000000034","201420200185000000000000000035","201420200185000000000000000036","201420200185000000000000000039","201420200185000000000000000042","201420200185000000000000000043","201420200185000000000000000044","201420200185000000000000000046","201420200185000000000000000047","201420200185000000000000000049","201420200185000000000000000050","201420200185000000000000000051","201420200185000000000000000069","201420200185000000000000000076","201420200185000000000000000098","201420200185000000000000000099","201420200185000000000000000100","201420200212000000000000000013","201420200212000000000000000015","201420200212000000000000000016","201420200212000000000000000018","201420200212000000000000000019","201420200212000000000000000020","201420200212000000000000000021","201420200212000000000000000022","201420200212000000000000000023","201420200212000000000000000025","201420200212000000000000000026","201420200212000000000000000027","201420200212000000000000000028","201420200212000000000000000029","201420200212000000000000000043","201420200212000000000000000044","201420200212000000000000000045","201420200212000000000000000046","201420200212000000000000000048","201420200212000000000000000050","201420200212000000000000000053","201420200212000000000000000054","201420200212000000000000000055","201420200212000000000000000057","201420200212000000000000000058","201420200212000000000000000059","201420200212000000000000000061","201420200212000000000000000077","201420200212000000000000000078","201420200212000000000000000079","201420200212000000000000000080","201420200212000000000000000081","201420200212000000000000000082","201420200212000000000000000083","201420200212000000000000000089","201420200212000000000000000101","201420200213000000000000000013","201420200213000000000000000015","201420200213000000000000000016","201420200213000000000000000018","201420200213000000000000000019","201420200213000000000000000020","201420200213000000000000000021","201420200213000000000000000022","201420200213000000000000000023","201420200213000000000000000025","201420200213000000000000000026","201420200213000000000000000027","201420200213000000000000000028","201420200213000000000000000029","201420200213000000000000000043","201420200213000000000000000044","201420200213000000000000000045","201420200213000000000000000046","201420200213000000000000000048","201420200213000000000000000050","201420200213000000000000000053","201420200213000000000000000054","201420200213000000000000000055","201420200213000000000000000057","201420200213000000000000000058","201420200213000000000000000059","201420200213000000000000000061","201420200213000000000000000077","201420200213000000000000000078","201420200213000000000000000079","201420200213000000000000000080","201420200213000000000000000081","201420200213000000000000000082","201420200213000000000000000083","201420200213000000000000000089","201420200213000000000000000101","201420200215000000000000000013","201420200215000000000000000015","201420200215000000000000000016","201420200215000000000000000018","201420200215000000000000000019","201420200215000000000000000020","201420200215000000000000000021","201420200215000000000000000022","201420200215000000000000000023","201420200215000000000000000025","201420200215000000000000000026","201420200215000000000000000027","201420200215000000000000000028","201420200215000000000000000029","201420200215000000000000000043","201420200215000000000000000044","201420200215000000000000000045","201420200215000000000000000046","201420200215000000000000000048","201420200215000000000000000050","201420200215000000000000000053","201420200215000000000000000054","201420200215000000000000000055","201420200215000000000000000057","201420200215000000000000000058","201420200215000000000000000059","201420200215000000000000000061","201420200215000000000000000077","201420200215000000000000000078","201420200215000000000000000079","201420200215000000000000000080","201420200215000000000000000081","201420200215000000000000000082","201420200215000000000000000083","201420200215000000000000000089","201420200215000000000000000101","201420200412000000000000000013","201420200412000000000000000015","201420200412000000000000000016","201420200412000000000000000018","201420200412000000000000000019","201420200412000000000000000020","201420200412000000000000000022","201420200412000000000000000023","201420200412000000000000000024","201420200412000000000000000025","201420200412000000000000000026","201420200412000000000000000027","201420200412000000000000000028","201420200412000000000000000029","201420200412000000000000000043","201420200412000000000000000044","201420200412000000000000000045","201420200412000000000000000046","201420200412000000000000000050","201420200412000000000000000052","201420200412000000000000000053","201420200412000000000000000054","201420200412000000000000000056","201420200412000000000000000060","201420200412000000000000000061","201420200412000000000000000062","201420200412000000000000000064","201420200412000000000000000065","201420200412000000000000000077","201420200412000000000000000081","201420200412000000000000000083","201420200412000000000000000084","201420200412000000000000000085","201420200412000000000000000086","201420200412000000000000000089","201420200413000000000000000013","201420200413000000000000000015","201420200413000000000000000016","201420200413000000000000000018","201420200413000000000000000019","201420200413000000000000000020","201420200413000000000000000022","201420200413000000000000000023","201420200413000000000000000024","201420200413000000000000000025","201420200413000000000000000026","201420200413000000000000000027","201420200413000000000000000028","201420200413000000000000000029","201420200413000000000000000043","201420200413000000000000000044","201420200413000000000000000045","201420200413000000000000000046","201420200413000000000000000050","201420200413000000000000000052","201420200413000000000000000053","201420200413000000000000000054","201420200413000000000000000056","201420200413000000000000000060","201420200413000000000000000061","201420200413000000000000000062","201420200413000000000000000064","201420200413000000000000000065","201420200413000000000000000077","201420200413000000000000000081","201420200413000000000000000083","201420200413000000000000000084","201420200413000000000000000085","201420200413000000000000000086","201420200413000000000000000089","201420200415000000000000000013","201420200415000000000000000015","201420200415000000000000000016","201420200415000000000000000018","201420200415000000000000000019","201420200415000000000000000020","201420200415000000000000000022","201420200415000000000000000023","201420200415000000000000000024","201420200415000000000000000025","201420200415000000000000000026","201420200415000000000000000027","201420200415000000000000000028","201420200415000000000000000029","201420200415000000000000000043","201420200415000000000000000044","201420200415000000000000000045","201420200415000000000000000046","201420200415000000000000000050","201420200415000000000000000052","201420200415000000000000000053","201420200415000000000000000054","201420200415000000000000000056","201420200415000000000000000060","201420200415000000000000000061","201420200415000000000000000062","201420200415000000000000000064","201420200415000000000000000065","201420200415000000000000000077","201420200415000000000000000081","201420200415000000000000000083","201420200415000000000000000084","201420200415000000000000000085","201420200415000000000000000086","201420200415000000000000000089","208020200272000000000000000001","208020200272000000000000000002","208020200272000000000000000003","208020200272000000000000000004","208020200272000000000000000005","208020200272000000000000000006","208020200272000000000000000007","208020200272000000000000000008","208020200272000000000000000009","208020200272000000000000000010","208020200272000000000000000011","208020200272000000000000000012","208020200272000000000000000013","208020200272000000000000000014","208020200272000000000000000015","208020200272000000000000000016","208020200272000000000000000017","208020200272000000000000000018","208020200272000000000000000019","208020200272000000000000000020","208020200272000000000000000021","208020200272000000000000000022","208020200272000000000000000023","208020200272000000000000000024","208020200272000000000000000025","208020200272000000000000000026","208020200272000000000000000027","208020200272000000000000000028","208020200272000000000000000029","208020200272000000000000000030","208020200272000000000000000031","208020200272000000000000000032","208020200272000000000000000033","208020200272000000000000000034","208020200272000000000000000035","208020200272000000000000000036","208020200272000000000000000037","208020200272000000000000000038","213520200152000000000000000001","213520200152000000000000000002","213520200152000000000000000003","213520200152000000000000000004","213520200152000000000000000006","213520200152000000000000000007","213520200152000000000000000008","213520200152000000000000000010","213520200152000000000000000016","213520200152000000000000000026","213520200152000000000000000027","213520200152000000000000000028","213520200152000000000000000029","213520200152000000000000000030","213520200152000000000000000032","213520200152000000000000000033","213520200152000000000000000035","213520200152000000000000000037","213520200152000000000000000038","213520200153000000000000000001","213520200153000000000000000002","213520200153000000000000000003","213520200153000000000000000004","213520200153000000000000000006","213520200153000000000000000007","213520200153000000000000000008","213520200153000000000000000010","213520200153000000000000000016","213520200153000000000000000026","213520200153000000000000000027","213520200153000000000000000028","213520200153000000000000000029","213520200153000000000000000030","213520200153000000000000000032","213520200153000000000000000033","213520200153000000000000000035","213520200153000000000000000037","213520200153000000000000000038","213520200155000000000000000001","213520200155000000000000000002","213520200155000000000000000003","213520200155000000000000000004","213520200155000000000000000006","213520200155000000000000000007","213520200155000000000000000008","213520200155000000000000000010","213520200155000000000000000016","213520200155000000000000000026","213520200155000000000000000027","213520200155000000000000000028","213520200155000000000000000029","213520200155000000000000000030","213520200155000000000000000032","213520200155000000000000000033","213520200155000000000000000035","213520200155000000000000000037","213520200155000000000000000038","213520200172000000000000000005","213520200172000000000000000007","213520200172000000000000000008","213520200172000000000000000010","213520200172000000000000000011","213520200172000000000000000012","213520200172000000000000000015","213520200172000000000000000016","213520200172000000000000000017","213520200172000000000000000025","213520200172000000000000000026","213520200172000000000000000030","213520200172000000000000000034","213520200172000000000000000041","213520200172000000000000000042","213520200172000000000000000046","213520200172000000000000000054","213520200172000000000000000069","213520200172000000000000000077","213520200172000000000000000079","213520200173000000000000000005","213520200173000000000000000007","213520200173000000000000000008","213520200173000000000000000010","213520200173000000000000000011","213520200173000000000000000012","213520200173000000000000000015","213520200173000000000000000016","213520200173000000000000000017","213520200173000000000000000025","213520200173000000000000000026","213520200173000000000000000030","213520200173000000000000000034","213520200173000000000000000041","213520200173000000000000000042","213520200173000000000000000046","213520200173000000000000000054","213520200173000000000000000069","213520200173000000000000000077","213520200173000000000000000079","213520200175000000000000000005","213520200175000000000000000007","213520200175000000000000000008","213520200175000000000000000010","213520200175000000000000000011","213520200175000000000000000012","213520200175000000000000000015","213520200175000000000000000016","213520200175000000000000000017","213520200175000000000000000025","213520200175000000000000000026","213520200175000000000000000030","213520200175000000000000000034","213520200175000000000000000041","213520200175000000000000000042","213520200175000000000000000046","213520200175000000000000000054","213520200175000000000000000069","213520200175000000000000000077","213520200175000000000000000079","213520200182000000000000000007","213520200182000000000000000008","213520200182000000000000000010","213520200182000000000000000011","213520200182000000000000000012","213520200182000000000000000015","213520200182000000000000000016","213520200182000000000000000017","213520200182000000000000000019","213520200182000000000000000024","213520200182000000000000000025","213520200182000000000000000026","213520200182000000000000000027","213520200182000000000000000030","213520200182000000000000000032","213520200182000000000000000034","213520200182000000000000000036","213520200182000000000000000039","213520200182000000000000000040","213520200182000000000000000042","213520200182000000000000000044","213520200182000000000000000045","213520200182000000000000000046","213520200182000000000000000047","213520200182000000000000000048","213520200182000000000000000053","213520200182000000000000000070","213520200182000000000000000077","213520200182000000000000000078","213520200182000000000000000080","213520200183000000000000000007","213520200183000000000000000008","213520200183000000000000000010","213520200183000000000000000011","213520200183000000000000000012","213520200183000000000000000015","213520200183000000000000000016","213520200183000000000000000017","213520200183000000000000000019","213520200183000000000000000024","213520200183000000000000000025","213520200183000000000000000026","213520200183000000000000000027","213520200183000000000000000030","213520200183000000000000000032","213520200183000000000000000034","213520200183000000000000000036","213520200183000000000000000039","213520200183000000000000000040","213520200183000000000000000042","213520200183000000000000000044","213520200183000000000000000045","213520200183000000000000000046","213520200183000000000000000047","213520200183000000000000000048","213520200183000000000000000053","213520200183000000000000000070","213520200183000000000000000077","213520200183000000000000000078","213520200183000000000000000080","213520200185000000000000000007","213520200185000000000000000008","213520200185000000000000000010","213520200185000000000000000011","213520200185000000000000000012","213520200185000000000000000015","213520200185000000000000000016","213520200185000000000000000017","213520200185000000000000000019","213520200185000000000000000024","213520200185000000000000000025","213520200185000000000000000026","213520200185000000000000000027","213520200185000000000000000030","213520200185000000000000000032","213520200185000000000000000034","213520200185000000000000000036","213520200185000000000000000039","213520200185000000000000000040","213520200185000000000000000042","213520200185000000000000000044","213520200185000000000000000045","213520200185000000000000000046","213520200185000000000000000047","213520200185000000000000000048","213520200185000000000000000053","213520200185000000000000000070","213520200185000000000000000077","213520200185000000000000000078","213520200185000000000000000080","213520200212000000000000000007","213520200212000000000000000008","213520200212000000000000000009","213520200212000000000000000013","213520200212000000000000000014","213520200212000000000000000015","213520200212000000000000000017","213520200212000000000000000018","213520200212000000000000000019","213520200212000000000000000020","213520200212000000000000000021","213520200212000000000000000022","213520200212000000000000000023","213520200212000000000000000024","213520200212000000000000000031","213520200212000000000000000039","213520200212000000000000000040","213520200212000000000000000041","213520200212000000000000000042","213520200212000000000000000047","213520200212000000000000000049","213520200212000000000000000050","213520200212000000000000000051","213520200212000000000000000055","213520200212000000000000000057","213520200212000000000000000058","213520200212000000000000000059","213520200212000000000000000060","213520200212000000000000000061","213520200212000000000000000067","213520200212000000000000000068","213520200212000000000000000071","213520200212000000000000000072","213520200212000000000000000078","213520200212000000000000000081","213520200212000000000000000082","213520200212000000000000000083","213520200213000000000000000007","213520200213000000000000000008","213520200213000000000000000009","213520200213000000000000000013","213520200213000000000000000014","213520200213000000000000000015","213520200213000000000000000017","213520200213000000000000000018","213520200213000000000000000019","213520200213000000000000000020","213520200213000000000000000021","213520200213000000000000000022","213520200213000000000000000023","213520200213000000000000000024","213520200213000000000000000031","213520200213000000000000000039","213520200213000000000000000040","213520200213000000000000000041","213520200213000000000000000042","213520200213000000000000000047","213520200213000000000000000049","213520200213000000000000000050","213520200213000000000000000051","213520200213000000000000000055","213520200213000000000000000057","213520200213000000000000000058","213520200213000000000000000059","213520200213000000000000000060","213520200213000000000000000061","213520200213000000000000000067","213520200213000000000000000068","213520200213000000000000000071","213520200213000000000000000072","213520200213000000000000000078","213520200213000000000000000081","213520200213000000000000000082","213520200213000000000000000083","213520200215000000000000000007","213520200215000000000000000008","213520200215000000000000000009","213520200215000000000000000013","213520200215000000000000000014","213520200215000000000000000015","213520200215000000000000000017","213520200215000000000000000018","213520200215000000000000000019","213520200215000000000000000020","213520200215000000000000000021","213520200215000000000000000022","213520200215000000000000000023","213520200215000000000000000024","213520200215000000000000000031","213520200215000000000000000039","213520200215000000000000000040","213520200215000000000000000041","213520200215000000000000000042","213520200215000000000000000047","213520200215000000000000000049","213520200215000000000000000050","213520200215000000000000000051","213520200215000000000000000055","213520200215000000000000000057","213520200215000000000000000058","213520200215000000000000000059","213520200215000000000000000060","213520200215000000000000000061","213520200215000000000000000067","213520200215000000000000000068","213520200215000000000000000071","213520200215000000000000000072","213520200215000000000000000078","213520200215000000000000000081","213520200215000000000000000082","213520200215000000000000000083","213520200412000000000000000007","213520200412000000000000000008","213520200412000000000000000009","213520200412000000000000000011","213520200412000000000000000013","213520200412000000000000000017","213520200412000000000000000018","213520200412000000000000000019","213520200412000000000000000020","213520200412000000000000000021","213520200412000000000000000022","213520200412000000000000000023","213520200412000000000000000024","213520200412000000000000000040","213520200412000000000000000042","213520200412000000000000000043","213520200412000000000000000050","213520200412000000000000000051","213520200412000000000000000052","213520200412000000000000000055","213520200412000000000000000056","213520200412000000000000000057","213520200412000000000000000060","213520200412000000000000000061","213520200412000000000000000062","213520200412000000000000000063","213520200412000000000000000064","213520200412000000000000000065","213520200412000000000000000066","213520200412000000000000000068","213520200412000000000000000073","213520200412000000000000000074","213520200412000000000000000075","213520200412000000000000000076","213520200412000000000000000078","213520200413000000000000000007","213520200413000000000000000008","213520200413000000000000000009","213520200413000000000000000011","213520200413000000000000000013","213520200413000000000000000017","213520200413000000000000000018","213520200413000000000000000019","213520200413000000000000000020","213520200413000000000000000021","213520200413000000000000000022","213520200413000000000000000023","213520200413000000000000000024","213520200413000000000000000040","213520200413000000000000000042","213520200413000000000000000043","213520200413000000000000000050","213520200413000000000000000051","213520200413000000000000000052","213520200413000000000000000055","213520200413000000000000000056","213520200413000000000000000057","213520200413000000000000000060","213520200413000000000000000061","213520200413000000000000000062","213520200413000000000000000063","213520200413000000000000000064","213520200413000000000000000065","213520200413000000000000000066","213520200413000000000000000068","213520200413000000000000000073","213520200413000000000000000074","213520200413000000000000000075","213520200413000000000000000076","213520200413000000000000000078","213520200415000000000000000007","213520200415000000000000000008","213520200415000000000000000009","213520200415000000000000000011","213520200415000000000000000013","213520200415000000000000000017","213520200415000000000000000018","213520200415000000000000000019","213520200415000000000000000020","213520200415000000000000000021","213520200415000000000000000022","213520200415000000000000000023","213520200415000000000000000024","213520200415000000000000000040","213520200415000000000000000042","213520200415000000000000000043","213520200415000000000000000050","213520200415000000000000000051","213520200415000000000000000052","213520200415000000000000000055","213520200415000000000000000056","213520200415000000000000000057","213520200415000000000000000060","213520200415000000000000000061","213520200415000000000000000062","213520200415000000000000000063","213520200415000000000000000064","213520200415000000000000000065","213520200415000000000000000066","213520200415000000000000000068","213520200415000000000000000073","213520200415000000000000000074","213520200415000000000000000075","213520200415000000000000000076","213520200415000000000000000078"
-    }
\ No newline at end of file
+    })
+
+# --------------------------------------------------------------------------
+# CATÁLOGOS ORDENADOS
+# --------------------------------------------------------------------------
+
+# A ordem de iteração de um set muda com o hash seed de cada processo; os
+# payloads usam estas tuplas ordenadas para gerar sempre os mesmos bytes.
+CATALOGO_GERAL = tuple(sorted(INDIC_GERAL))
+CATALOGO_HABILIDADES = tuple(sorted(INDIC_HABILIDADES))
+
+
+def _hash_conteudo(codigos) -> str:
+    return hashlib.sha256("\n".join(sorted(codigos)).encode("utf-8")).hexdigest()
+
+
+# Hashes de conteúdo dos catálogos, para chaves de cache e nomes de arquivos
+HASH_GERAL = _hash_conteudo(CATALOGO_GERAL)
+HASH_HABILIDADES = _hash_conteudo(CATALOGO_HABILIDADES)
+
+
+def hash_indicadores(codigos) -> str:
+    """Hash de conteúdo (SHA-256) de uma coleção de códigos, independente da ordem"""
+    if codigos is CATALOGO_GERAL:
+        return HASH_GERAL
+    if codigos is CATALOGO_HABILIDADES:
+        return HASH_HABILIDADES
+    return _hash_conteudo(codigos)
+
+
+# --------------------------------------------------------------------------
+# CATÁLOGO ESTRUTURADO
+# --------------------------------------------------------------------------
+
+# Layout dos códigos (30 dígitos):
+#   [0:4]   avaliação (2014 = 1º ciclo, 2135 = 2º ciclo; ver VL_FILTRO_AVALIACAO em payloads.py)
+#   [5:7]   tipo do indicador (04 = geral, 02 = habilidades)
+#   [9:12]  segmento da consulta (combinação de etapa/recorte, mantida como no código)
+#   [27:30] sequencial (número do item; nas habilidades, a habilidade)
+CICLOS_AVALIACAO = {"2014": "1", "2135": "2"}
+
+
+class InfoIndicador(NamedTuple):
+    """Metadados de um código de indicador"""
+    codigo: str
+    tipo: str
+    avaliacao: str
+    ciclo: Optional[str]
+    segmento: str
+    sequencial: int
+
+
+def _decodificar(codigo: str, tipo: str) -> InfoIndicador:
+    avaliacao = codigo[0:4]
+    return InfoIndicador(codigo, tipo, avaliacao, CICLOS_AVALIACAO.get(avaliacao), codigo[9:12], int(codigo[27:30]))
+
+
+class CatalogoIndicadores:
+    """
+    Catálogo dos indicadores com busca O(1) por código e índices reversos por campo
+
+    Exemplo:
+        catalogo.info("213520200415000000000000000068").sequencial   # 68
+        catalogo.filtrar(tipo="habilidades", ciclo="2")            # tupla ordenada de códigos
+    """
+
+    CAMPOS = InfoIndicador._fields[1:]
+
+    def __init__(self, grupos: Dict[str, Tuple[str, ...]]):
+        """
+        Args:
+            grupos: Códigos ordenados de cada tipo de indicador
+        """
+        self._grupos = dict(grupos)
+        self._info = {codigo: _decodificar(codigo, tipo)
+                      for tipo, codigos in self._grupos.items() for codigo in codigos}
+        self._codigos = tuple(sorted(self._info))
+        # O índice por tipo reaproveita as tuplas originais (e seus hashes em hash_indicadores)
+        self._indices: Dict[str, Dict[object, Tuple[str, ...]]] = {"tipo": self._grupos}
+
+    def __len__(self) -> int:
+        return len(self._codigos)
+
+    def __contains__(self, codigo: str) -> bool:
+        return codigo in self._info
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._codigos)
+
+    def info(self, codigo: str) -> Optional[InfoIndicador]:
+        """Metadados do código, ou None se ele não estiver no catálogo"""
+        return self._info.get(codigo)
+
+    def indice(self, campo: str) -> Dict[object, Tuple[str, ...]]:
+        """Índice reverso valor -> códigos (ordenados) de um campo, montado no primeiro uso"""
+        if campo not in self.CAMPOS:
+            raise ValueError(f"Campo desconhecido no catálogo de indicadores: {campo}")
+
+        indice = self._indices.get(campo)
+        if indice is None:
+            agrupado: Dict[object, list] = {}
+            for codigo in self._codigos:
+                agrupado.setdefault(getattr(self._info[codigo], campo), []).append(codigo)
+            indice = {valor: tuple(codigos) for valor, codigos in agrupado.items()}
+            self._indices[campo] = indice
+        return indice
+
+    def filtrar(self, **criterios) -> Tuple[str, ...]:
+        """
+        Códigos que atendem a todos os critérios (campo=valor), em ordem crescente
+
+        Com um único critério devolve a tupla do próprio índice, sem cópia.
+        """
+        if not criterios:
+            return self._codigos
+
+        candidatos = sorted((self.indice(campo).get(valor, ()) for campo, valor in criterios.items()), key=len)
+        if len(candidatos) == 1:
+            return candidatos[0]
+
+        menor, outros = candidatos[0], [frozenset(codigos) for codigos in candidatos[1:]]
+        return tuple(codigo for codigo in menor if all(codigo in conjunto for conjunto in outros))
+
+
+# Instância global do catálogo
+catalogo = CatalogoIndicadores({"geral": CATALOGO_GERAL, "habilidades": CATALOGO_HABILIDADES})
@@ -5,13 +5,16 @@
 import streamlit as st
 from typing import Dict, List, Optional
 from config_api import config_nivel, NIVEL_PADRAO
+from estado_sessao import AtributoSessao
 
 class GerenciadorNivel:
     """Gerenciador para configurações de nível de agregação"""
     
+    # Escolha do usuário: guardada por sessão, não na instância compartilhada
+    nivel_atual = AtributoSessao(NIVEL_PADRAO)
+    
     def __init__(self):
         self.niveis_disponiveis = config_nivel.get_niveis_disponiveis()
-        self.nivel_atual = NIVEL_PADRAO
     
     def renderizar_seletor_nivel(self) -> int:
         """
@@ -34,6 +37,7 @@ class GerenciadorNivel:
             "Nível de Agregação dos Dados",
             options=opcoes_nivel,
             index=indice_atual,
+            key="seletor_nivel_agregacao",
             help="Escolha o nível de detalhamento dos dados:\n"
                  "• Município: Visão consolidada por município\n"
                  "• Escola: Visão detalhada por unidade escolar\n"
@@ -2,7 +2,11 @@
 # CLASSES DE PAYLOAD PARA API - AVALIECE1
 # --------------------------------------------------------------------------
 
-from typing import Dict, List
+import json
+import re
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple
 from dataclasses import dataclass
 import indicadores
 from config_api import config_api, config_nivel, NIVEL_PADRAO
@@ -31,33 +35,16 @@ class PayloadBase:
             {"operation": "equalTo", "field": "DADOS.VL_FILTRO_AVALIACAO", "value": "21351"},
         ]
     
-    def _criar_payload_base(self, indicadores_list: List, filtros_extras: List = None) -> Dict:
-        """Cria estrutura base do payload"""
-        filtros_extras = filtros_extras or []
-        
-        # Usar valor fixo para rede conforme payload de exemplo
-        dependencia = "MUNICIPAL"
-        
-        # Obter configuração do nível de agregação
-        config_nivel_atual = config_nivel.get_config_nivel(self.nivel_agregacao)
+    def _criar_payload_base(self, tipo: str) -> Dict:
+        """
+        Monta o payload a partir do modelo em cache do tipo de consulta
         
+        Apenas a entidade e as credenciais variam entre requisições; o restante
+        vem de modelo_payload (congelado), copiado para um dicionário próprio.
+        """
         return {
-            "CD_INDICADOR": indicadores_list,
+            **_descongelar(modelo_payload(tipo, self.componente, self.etapa, self.ciclo, self.nivel_agregacao)),
             "agregado": self.entidade,
-            "filtros": [
-                {"operation": "equalTo", "field": "DADOS.VL_FILTRO_AVALIACAO", "value": f"{self.ciclo}1351" if self.ciclo == "2" else "20141"},
-                {"operation": "equalTo", "field": "DADOS.VL_FILTRO_DISCIPLINA", "value": dict(config_api.COMPONENTES)[self.componente]},
-                {"operation": "equalTo", "field": "DADOS.VL_FILTRO_REDE", "value": dependencia},
-                {"operation": "equalTo", "field": "DADOS.VL_FILTRO_ETAPA", "value": f"ENSINO FUNDAMENTAL DE 9 ANOS - {self.etapa}º ANO", "data": {"NM_ETAPA": f"{self.etapa}º ano do Ensino Fundamental"}}
-            ] + filtros_extras,
-            "filtrosAdicionais": [],
-            "ordenacao": [["DC_HORARIO", "ASC"]], 
-            "nivelAbaixo": config_nivel_atual["nivelAbaixo"],  # Usa configuração do nível
-            "collectionResultado": None, 
-            "CD_INDICADOR_LABEL": [], 
-            "TP_ENTIDADE_LABEL": "01",
-            "_ApplicationId": "portal", 
-            "_ClientVersion": "js2.19.0", 
             "_InstallationId": self.installation_id,
             "_SessionToken": self.session_token
         }
@@ -66,21 +53,145 @@ class PayloadGeral(PayloadBase):
     """Payload para dados gerais"""
     
     def criar_payload(self) -> Dict:
-        return self._criar_payload_base(list(indicadores.INDIC_GERAL))
+        return self._criar_payload_base("geral")
 
 class PayloadHabilidades(PayloadBase):
     """Payload para dados de habilidades"""
     
     def criar_payload(self) -> Dict:
-        filtros_extras = [
+        return self._criar_payload_base("habilidades")
+
+# --------------------------------------------------------------------------
+# MODELOS PRÉ-COMPILADOS E SERIALIZAÇÃO
+# --------------------------------------------------------------------------
+
+def _congelar(valor):
+    """Dicionários viram MappingProxyType e tuplas de dicionários/tuplas são congeladas item a item"""
+    if isinstance(valor, dict):
+        return MappingProxyType({chave: _congelar(item) for chave, item in valor.items()})
+    # As tuplas do modelo são homogêneas: basta olhar o primeiro item
+    if isinstance(valor, tuple) and valor and isinstance(valor[0], (dict, tuple)):
+        return tuple(_congelar(item) for item in valor)
+    return valor
+
+def _descongelar(valor):
+    """Cópia em dicionários comuns de um valor congelado (tuplas de textos são reaproveitadas)"""
+    if isinstance(valor, MappingProxyType):
+        return {chave: _descongelar(item) for chave, item in valor.items()}
+    if isinstance(valor, tuple) and valor and isinstance(valor[0], (MappingProxyType, tuple)):
+        return tuple(_descongelar(item) for item in valor)
+    return valor
+
+@lru_cache(maxsize=None)
+def modelo_payload(tipo: str, componente: str, etapa: int, ciclo: str, nivel_agregacao: int) -> Mapping:
+    """
+    Parte fixa do payload de uma consulta, montada uma vez por combinação
+    
+    Os campos agregado, _InstallationId e _SessionToken ficam como None (apenas
+    para manter a ordem das chaves) e são preenchidos por _criar_payload_base.
+    As listas são tuplas (indicadores em ordem estável, ver
+    indicadores.CATALOGO_*) e os dicionários, inclusive os dos filtros, são
+    MappingProxyType: o modelo é compartilhado entre chamadas e não pode ser
+    alterado. _criar_payload_base monta a partir dele um payload próprio.
+    
+    Args:
+        tipo: 'geral' ou 'habilidades'
+        componente: Componente curricular
+        etapa: Etapa de ensino
+        ciclo: Ciclo de avaliação
+        nivel_agregacao: Nível de agregação (0, 1 ou 2)
+    """
+    # Usar valor fixo para rede conforme payload de exemplo
+    dependencia = "MUNICIPAL"
+    disciplina = dict(config_api.COMPONENTES)[componente]
+    
+    # Obter configuração do nível de agregação
+    config_nivel_atual = config_nivel.get_config_nivel(nivel_agregacao)
+    
+    filtros = (
+        {"operation": "equalTo", "field": "DADOS.VL_FILTRO_AVALIACAO", "value": f"{ciclo}1351" if ciclo == "2" else "20141"},
+        {"operation": "equalTo", "field": "DADOS.VL_FILTRO_DISCIPLINA", "value": disciplina},
+        {"operation": "equalTo", "field": "DADOS.VL_FILTRO_REDE", "value": dependencia},
+        {"operation": "equalTo", "field": "DADOS.VL_FILTRO_ETAPA", "value": f"ENSINO FUNDAMENTAL DE 9 ANOS - {etapa}º ANO", "data": {"NM_ETAPA": f"{etapa}º ano do Ensino Fundamental"}}
+    )
+    
+    if tipo == "geral":
+        ordenacao = (("DC_HORARIO", "ASC"),)
+    elif tipo == "habilidades":
+        filtros += (
             {"operation": "containedIn", "field": "DADOS.DC_FAIXA_PERCENTUAL_HABILIDADE", 
-             "value": ["Alto", "Médio Baixo", "Médio Alto", "Baixo"]}
-        ]
-        
-        payload = self._criar_payload_base(list(indicadores.INDIC_HABILIDADES), filtros_extras)
-        payload["ordenacao"] = [["DADOS.CD_HABILIDADE", "ASC"]]
-        
-        return payload
+             "value": ("Alto", "Médio Baixo", "Médio Alto", "Baixo")},
+        )
+        ordenacao = (("DADOS.CD_HABILIDADE", "ASC"),)
+    else:
+        raise ValueError(f"Tipo de payload desconhecido: {tipo}")
+    
+    # Tupla do catálogo (mesmo objeto de indicadores.CATALOGO_*)
+    indicadores_consulta = indicadores.catalogo.filtrar(tipo=tipo)
+    
+    return _congelar({
+        "CD_INDICADOR": indicadores_consulta,
+        "agregado": None,
+        "filtros": filtros,
+        "filtrosAdicionais": (),
+        "ordenacao": ordenacao,
+        "nivelAbaixo": config_nivel_atual["nivelAbaixo"],  # Usa configuração do nível
+        "collectionResultado": None, 
+        "CD_INDICADOR_LABEL": (), 
+        "TP_ENTIDADE_LABEL": "01",
+        "_ApplicationId": "portal", 
+        "_ClientVersion": "js2.19.0", 
+        "_InstallationId": None,
+        "_SessionToken": None
+    })
+
+@lru_cache(maxsize=64)
+def _json_indicadores(indicadores_consulta: Tuple[str, ...]) -> bytes:
+    """Lista de indicadores serializada uma vez por tupla (é a maior parte do corpo)"""
+    return json.dumps(indicadores_consulta, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def corpo_payload(payload: Dict) -> bytes:
+    """
+    Corpo JSON (compacto, UTF-8) pronto para envio
+    
+    Equivale a json.dumps(payload), mas reaproveita a serialização da lista
+    de indicadores, que não muda entre consultas do mesmo tipo.
+    """
+    restante = {k: v for k, v in payload.items() if k != "CD_INDICADOR"}
+    if "CD_INDICADOR" not in payload:
+        return json.dumps(restante, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    
+    inicio = b'{"CD_INDICADOR":' + _json_indicadores(tuple(payload["CD_INDICADOR"]))
+    if not restante:
+        return inicio + b"}"
+    # Remove o "{" inicial do restante e emenda após os indicadores
+    return inicio + b"," + json.dumps(restante, separators=(",", ":"), ensure_ascii=False).encode("utf-8")[1:]
+
+def descrever_payload(payload: Dict) -> Dict:
+    """
+    Consulta representada por um payload, sem credenciais (para metadados e registros)
+    
+    Returns:
+        tipo, entidade, ciclo, componente, etapa, nivel_agregacao e o hash dos indicadores
+    """
+    filtros = {filtro["field"]: filtro["value"] for filtro in payload.get("filtros", ())}
+    hash_consulta = indicadores.hash_indicadores(payload.get("CD_INDICADOR", ()))
+    tipos = {indicadores.HASH_GERAL: "geral", indicadores.HASH_HABILIDADES: "habilidades"}
+    componentes = {sigla: nome for nome, sigla in config_api.COMPONENTES}
+    
+    avaliacao = filtros.get("DADOS.VL_FILTRO_AVALIACAO")
+    etapa = re.search(r"(\d+)º ANO", filtros.get("DADOS.VL_FILTRO_ETAPA", ""))
+    nivel = payload.get("nivelAbaixo")
+    
+    return {
+        "tipo": tipos.get(hash_consulta),
+        "entidade": payload.get("agregado"),
+        "ciclo": {"21351": "2", "20141": "1"}.get(avaliacao),
+        "componente": componentes.get(filtros.get("DADOS.VL_FILTRO_DISCIPLINA")),
+        "etapa": int(etapa.group(1)) if etapa else None,
+        "nivel_agregacao": int(nivel) if nivel is not None else None,
+        "indicadores": hash_consulta,
+    }
 
 # --------------------------------------------------------------------------
 # FUNÇÕES AUXILIARES PARA CRIAÇÃO DE PAYLOADS
@@ -143,3 +254,17 @@ def criar_payload_habilidades(entidade: str, componente: str, etapa: int, ciclo:
         nivel_agregacao=nivel_agregacao
     )
     return payload_obj.criar_payload()
+
+def criar_corpo_geral(entidade: str, componente: str, etapa: int, ciclo: str,
+                      installation_id: str, session_token: str,
+                      nivel_agregacao: int = None) -> bytes:
+    """Corpo JSON serializado do payload geral (ver criar_payload_geral)"""
+    return corpo_payload(criar_payload_geral(entidade, componente, etapa, ciclo,
+                                             installation_id, session_token, nivel_agregacao))
+
+def criar_corpo_habilidades(entidade: str, componente: str, etapa: int, ciclo: str,
+                            installation_id: str, session_token: str,
+                            nivel_agregacao: int = None) -> bytes:
+    """Corpo JSON serializado do payload de habilidades (ver criar_payload_habilidades)"""
+    return corpo_payload(criar_payload_habilidades(entidade, componente, etapa, ciclo,
+                                                   installation_id, session_token, nivel_agregacao))
@@ -0,0 +1,782 @@
+# --------------------------------------------------------------------------
+# PROCESSAMENTO DE DADOS - AVALIECE1
+# --------------------------------------------------------------------------
+
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Deque, Dict, Hashable, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from config_api import config_api
+from resiliencia_api import CHAVE_CONTINGENCIA
+
+
+def memoria_dataframe(df: Optional[pd.DataFrame]) -> int:
+    """Memória (bytes) de um DataFrame, incluindo o conteúdo dos textos e o índice"""
+    if df is None:
+        return 0
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def memoria_indices(indices: Iterable[Dict[Hashable, np.ndarray]]) -> int:
+    """Memória (bytes) dos arrays de posições de índices montados com groupby(...).indices"""
+    return sum(getattr(posicoes, 'nbytes', 0) for indice in indices for posicoes in indice.values())
+
+class ProcessadorDados:
+    """Classe para processar dados da API"""
+    
+    # Quantidade de estudantes por nível de aprendizagem
+    COLUNAS_NIVEIS = ['NU_N01_TRI_E1', 'NU_N02_TRI_E1', 'NU_N03_TRI_E1']
+    
+    # Textos repetidos em todas as linhas de uma entidade, guardados como categorias
+    # (códigos inteiros por linha e cada texto distinto uma única vez)
+    COLUNAS_DESCRITIVAS = ['NM_ENTIDADE', 'NM_INSTITUICAO', 'NM_TURMA', 'DC_HABILIDADE',
+                           'VL_FILTRO_ETAPA', 'VL_FILTRO_DISCIPLINA']
+    
+    # Tabelas de dimensão: nome -> (código, atributos descritivos)
+    DIMENSOES = {
+        'entidade': ('CD_ENTIDADE', ['NM_ENTIDADE', 'NM_INSTITUICAO']),
+        'turma': ('CD_TURMA', ['NM_TURMA', 'CD_ENTIDADE']),
+        'habilidade': ('CD_HABILIDADE', ['DC_HABILIDADE']),
+    }
+    
+    PREFIXO_ETAPA = 'ENSINO FUNDAMENTAL DE 9 ANOS - '
+    
+    @staticmethod
+    def montar_conjunto(dados_gerais: List[pd.DataFrame], dados_habilidades: List[pd.DataFrame],
+                        contingencia: bool = False) -> "ConjuntoDados":
+        """
+        Consolida os DataFrames de todos os ciclos em um ConjuntoDados
+        
+        Args:
+            dados_gerais: DataFrames de dados gerais, um por ciclo
+            dados_habilidades: DataFrames de habilidades, um por ciclo
+            contingencia: Se algum dado veio do armazém de contingência
+        """
+        df_geral = ProcessadorDados._concatenar(dados_gerais)
+        df_habilidades = ProcessadorDados._concatenar(dados_habilidades)
+        df_niveis = ProcessadorDados.calcular_distribuicao_niveis(df_geral)
+        
+        return ConjuntoDados(df_geral, df_habilidades, df_niveis, contingencia)
+    
+    @staticmethod
+    def conjunto_de_respostas(respostas: Dict[Tuple[str, str], Optional[Dict]]) -> "ConjuntoDados":
+        """
+        Consolida as respostas da API de uma consulta em um ConjuntoDados
+        
+        Args:
+            respostas: Respostas indexadas por (tipo, ciclo), com tipo 'geral' ou
+                'habilidades' e ciclo como em config_api.CICLOS ('1', '2')
+        """
+        ciclos = dict(config_api.CICLOS)
+        dados_gerais = []
+        dados_habilidades = []
+        
+        for (tipo, ciclo_key), resposta in respostas.items():
+            if tipo == "geral":
+                df = ProcessadorDados.processar_dados_gerais(resposta, ciclos[ciclo_key])
+                lista = dados_gerais
+            else:
+                df = ProcessadorDados.processar_dados_habilidades(resposta, ciclos[ciclo_key])
+                lista = dados_habilidades
+            if df is not None:
+                lista.append(df)
+        
+        contingencia = any(r and CHAVE_CONTINGENCIA in r for r in respostas.values())
+        return ProcessadorDados.montar_conjunto(dados_gerais, dados_habilidades, contingencia)
+    
+    @staticmethod
+    def processar_dados_gerais(resposta: Dict, ciclo_label: str) -> Optional[pd.DataFrame]:
+        """Processa dados gerais da API"""
+        if not resposta or "result" not in resposta or not resposta["result"]:
+            return None
+            
+        df = pd.DataFrame(resposta["result"])
+        if df.empty:
+            return None
+            
+        # Adicionar ciclo e converter colunas numéricas
+        df["Ciclo"] = ciclo_label
+        colunas_numericas = ['TX_ACERTOS', 'AVG_PROFICIENCIA_E1', 'TX_PARTICIPACAO', 'QT_ALUNO_PREVISTO', 'QT_ALUNO_EFETIVO', 'NU_N01_TRI_E1', 'NU_N02_TRI_E1', 'NU_N03_TRI_E1']
+        
+        for col in colunas_numericas:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+        
+        ProcessadorDados._normalizar_descritivos(df)
+        
+        return df
+    
+    @staticmethod
+    def processar_dados_habilidades(resposta: Dict, ciclo_label: str) -> Optional[pd.DataFrame]:
+        """Processa dados de habilidades da API"""
+        if not resposta or "result" not in resposta or not resposta["result"]:
+            return None
+            
+        df = pd.DataFrame(resposta["result"])
+        if df.empty:
+            return None
+            
+        # Adicionar ciclo e converter colunas numéricas
+        df["Ciclo"] = ciclo_label
+        df['TX_ACERTO'] = pd.to_numeric(df['TX_ACERTO'], errors='coerce')
+        
+        ProcessadorDados._normalizar_descritivos(df)
+        
+        return df
+    
+    @staticmethod
+    def _normalizar_descritivos(df: pd.DataFrame):
+        """
+        Converte as colunas descritivas em categorias e limpa o nome da etapa (in place)
+        
+        A limpeza da etapa é feita sobre as categorias (poucos valores), não linha a linha.
+        """
+        for col in ProcessadorDados.COLUNAS_DESCRITIVAS:
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype('category')
+        
+        if 'VL_FILTRO_ETAPA' in df.columns:
+            categorias = df['VL_FILTRO_ETAPA'].cat.categories
+            limpas = categorias.str.replace(ProcessadorDados.PREFIXO_ETAPA, '', regex=False)
+            df['VL_FILTRO_ETAPA'] = df['VL_FILTRO_ETAPA'].map(dict(zip(categorias, limpas))).astype('category')
+    
+    @staticmethod
+    def _concatenar(dfs: List[pd.DataFrame]) -> pd.DataFrame:
+        """Concatena os DataFrames dos ciclos unindo as categorias das colunas descritivas"""
+        if not dfs:
+            return pd.DataFrame()
+        
+        if len(dfs) > 1:
+            for col in ProcessadorDados.COLUNAS_DESCRITIVAS:
+                partes = [df[col] for df in dfs if col in df.columns]
+                # Com categorias diferentes o concat converteria a coluna de volta para texto
+                if len(partes) == len(dfs) and all(isinstance(p.dtype, pd.CategoricalDtype) for p in partes):
+                    tipo = pd.CategoricalDtype(union_categoricals(partes, sort_categories=True).categories)
+                    dfs = [df.assign(**{col: df[col].astype(tipo)}) for df in dfs]
+        
+        return pd.concat(dfs, ignore_index=True)
+    
+    @staticmethod
+    def montar_dimensoes(*dfs: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """
+        Tabelas de dimensão (uma linha por código) dos DataFrames de uma consulta
+        
+        Returns:
+            DataFrames indexados pelo código (ver DIMENSOES), apenas para os
+            códigos presentes nos dados
+        """
+        dimensoes = {}
+        for nome, (chave, atributos) in ProcessadorDados.DIMENSOES.items():
+            partes = [df[[chave] + [col for col in atributos if col in df.columns]].drop_duplicates(chave)
+                      for df in dfs if chave in df.columns]
+            if partes:
+                dimensoes[nome] = (pd.concat(partes, ignore_index=True)
+                                   .drop_duplicates(chave).set_index(chave))
+        return dimensoes
+    
+    @staticmethod
+    def calcular_distribuicao_niveis(df_geral: pd.DataFrame) -> pd.DataFrame:
+        """
+        Calcula a distribuição dos estudantes por nível para cada entidade e ciclo
+        
+        As colunas de níveis já chegam numéricas de processar_dados_gerais.
+        Além das quantidades (NU_N0x_TRI_E1), inclui o total (NU_TOTAL_TRI_E1)
+        e os percentuais de cada nível (PC_N0x_TRI_E1).
+        
+        Args:
+            df_geral: DataFrame consolidado de dados gerais
+            
+        Returns:
+            Uma linha por entidade (CD_ENTIDADE/CD_TURMA, quando existirem) e ciclo
+        """
+        if df_geral.empty or 'Ciclo' not in df_geral.columns:
+            return pd.DataFrame()
+        
+        chaves = [col for col in ['CD_ENTIDADE', 'CD_TURMA'] if col in df_geral.columns] + ['Ciclo']
+        colunas_niveis = [col for col in ProcessadorDados.COLUNAS_NIVEIS if col in df_geral.columns]
+        
+        df_niveis = df_geral.groupby(chaves, sort=False, observed=True, dropna=False)[colunas_niveis].mean().reset_index()
+        ProcessadorDados._adicionar_percentuais_niveis(df_niveis, colunas_niveis)
+        
+        return df_niveis
+    
+    @staticmethod
+    def selecionar_distribuicao(df_niveis: pd.DataFrame, coluna: str = None, valor: str = None) -> pd.DataFrame:
+        """
+        Seleciona a distribuição de níveis de uma entidade, com uma linha por ciclo
+        
+        Args:
+            df_niveis: Resultado de calcular_distribuicao_niveis
+            coluna: Coluna que identifica a entidade (CD_ENTIDADE ou CD_TURMA); None usa tudo
+            valor: Código da entidade
+        """
+        if df_niveis.empty:
+            return df_niveis
+        
+        df_selecao = df_niveis[df_niveis[coluna] == valor] if coluna else df_niveis
+        
+        if df_selecao['Ciclo'].is_unique:
+            return df_selecao
+        
+        # Mais de uma entidade por ciclo: média entre elas
+        colunas_niveis = [col for col in ProcessadorDados.COLUNAS_NIVEIS if col in df_selecao.columns]
+        df_selecao = df_selecao.groupby('Ciclo', sort=False, observed=True)[colunas_niveis].mean().reset_index()
+        ProcessadorDados._adicionar_percentuais_niveis(df_selecao, colunas_niveis)
+        
+        return df_selecao
+    
+    @staticmethod
+    def _adicionar_percentuais_niveis(df_niveis: pd.DataFrame, colunas_niveis: List[str]):
+        """Adiciona total e percentuais por nível (vetorizado, in place)"""
+        total = df_niveis[colunas_niveis].sum(axis=1, min_count=1)
+        df_niveis['NU_TOTAL_TRI_E1'] = total
+        percentuais = df_niveis[colunas_niveis].div(total.where(total > 0), axis=0) * 100
+        for col in colunas_niveis:
+            df_niveis[col.replace('NU_', 'PC_')] = percentuais[col]
+
+# --------------------------------------------------------------------------
+# RANKING DE HABILIDADES
+# --------------------------------------------------------------------------
+
+class RankingHabilidades:
+    """
+    Habilidades ordenadas por taxa de acerto, montadas uma única vez
+    
+    Guarda as habilidades em ordem decrescente de TX_ACERTO, com o valor já
+    formatado, e os índices de posição de cada ciclo (e de cada entidade,
+    sob demanda). Maiores e menores desempenhos para qualquer N passam a ser
+    apenas fatias dessas posições.
+    """
+    
+    COLUNAS_EXIBICAO = ['CD_HABILIDADE', 'DC_HABILIDADE', 'TX_ACERTO']
+    
+    # Colunas usadas nos índices de posição (ciclo e entidade)
+    COLUNAS_CHAVE = ['Ciclo', 'CD_ENTIDADE', 'CD_TURMA']
+    
+    def __init__(self, df_habilidades: pd.DataFrame):
+        if df_habilidades.empty or 'TX_ACERTO' not in df_habilidades.columns:
+            self._ordenado = pd.DataFrame(columns=self.COLUNAS_EXIBICAO)
+        else:
+            # Só as colunas de chave e de exibição entram na cópia ordenada
+            colunas = [col for col in self.COLUNAS_CHAVE + self.COLUNAS_EXIBICAO if col in df_habilidades.columns]
+            # nlargest/nsmallest ignoravam valores ausentes: mantém o mesmo comportamento
+            self._ordenado = (df_habilidades[colunas].dropna(subset=['TX_ACERTO'])
+                              .sort_values('TX_ACERTO', ascending=False, kind='mergesort')
+                              .reset_index(drop=True))
+        self._exibicao = self._ordenado.reindex(columns=self.COLUNAS_EXIBICAO)
+        self._exibicao['TX_ACERTO'] = self._exibicao['TX_ACERTO'].round(1).astype(str) + '%'
+        self._indices: Dict[Tuple[str, ...], Dict[Hashable, np.ndarray]] = {}
+        # Avisado com os bytes de cada índice montado depois da criação
+        self.ao_memorizar: Optional[Callable[[int], None]] = None
+    
+    def _posicoes(self, ciclo: str, coluna: str = None, valor: Hashable = None) -> np.ndarray:
+        """Posições (já em ordem decrescente de acerto) do ciclo e, opcionalmente, da entidade"""
+        if self._ordenado.empty or 'Ciclo' not in self._ordenado.columns:
+            return np.empty(0, dtype=np.intp)
+        
+        chaves = ('Ciclo',) if coluna is None else ('Ciclo', coluna)
+        indice = self._indices.get(chaves)
+        if indice is None:
+            if coluna is not None and coluna not in self._ordenado.columns:
+                return np.empty(0, dtype=np.intp)
+            indice = self._ordenado.groupby(list(chaves), sort=False, observed=True).indices
+            self._indices[chaves] = indice
+            if self.ao_memorizar is not None:
+                self.ao_memorizar(memoria_indices([indice]))
+        
+        chave = ciclo if coluna is None else (ciclo, valor)
+        return indice.get(chave, np.empty(0, dtype=np.intp))
+    
+    def memoria_bytes(self) -> int:
+        """Memória das tabelas ordenadas e dos índices montados"""
+        return (memoria_dataframe(self._ordenado) + memoria_dataframe(self._exibicao)
+                + memoria_indices(list(self._indices.values())))
+    
+    def maiores(self, ciclo: str, n: int = 5, coluna: str = None, valor: Hashable = None) -> pd.DataFrame:
+        """N habilidades com maior taxa de acerto no ciclo (opcionalmente de uma entidade)"""
+        return self._exibicao.iloc[self._posicoes(ciclo, coluna, valor)[:n]]
+    
+    def menores(self, ciclo: str, n: int = 5, coluna: str = None, valor: Hashable = None) -> pd.DataFrame:
+        """N habilidades com menor taxa de acerto no ciclo, da menor para a maior"""
+        posicoes = self._posicoes(ciclo, coluna, valor)
+        return self._exibicao.iloc[posicoes[::-1][:n]]
+    
+    def quantidade(self, ciclo: str, coluna: str = None, valor: Hashable = None) -> int:
+        """Quantidade de habilidades com taxa de acerto no ciclo"""
+        return len(self._posicoes(ciclo, coluna, valor))
+
+# --------------------------------------------------------------------------
+# VARIAÇÕES ENTRE CICLOS
+# --------------------------------------------------------------------------
+
+class VariacoesCiclos:
+    """
+    Variações do 1º para o 2º ciclo, alinhadas por entidade e por habilidade
+    
+    Cada tabela sai de uma única passada (groupby por chave e ciclo seguido
+    de unstack) e fica memorizada. Para cada métrica há o valor de cada ciclo
+    (<métrica>_C1 e <métrica>_C2) e a variação DELTA_<métrica> (2º - 1º).
+    Entidades ou habilidades presentes em apenas um ciclo ficam com DELTA nulo.
+    """
+    
+    CICLO_INICIAL = "1º Ciclo"
+    CICLO_FINAL = "2º Ciclo"
+    
+    METRICAS_GERAIS = ['AVG_PROFICIENCIA_E1', 'TX_PARTICIPACAO']
+    METRICAS_NIVEIS = [col.replace('NU_', 'PC_') for col in ProcessadorDados.COLUNAS_NIVEIS]
+    
+    def __init__(self, geral: pd.DataFrame, habilidades: pd.DataFrame):
+        self._geral = geral
+        self._habilidades = habilidades
+        self._entidades: Dict[Optional[str], pd.DataFrame] = {}
+        self._por_habilidade: Dict[Optional[str], pd.DataFrame] = {}
+        # Avisado com os bytes de cada tabela memorizada
+        self.ao_memorizar: Optional[Callable[[int], None]] = None
+    
+    def entidades(self, coluna: str = None) -> pd.DataFrame:
+        """
+        Proficiência, participação e percentual por nível de cada entidade
+        
+        Args:
+            coluna: CD_ENTIDADE ou CD_TURMA; None consolida tudo em uma linha
+        """
+        if coluna not in self._entidades:
+            df = self._geral
+            chaves = [coluna] if coluna else []
+            
+            if df.empty or 'Ciclo' not in df.columns or (coluna and coluna not in df.columns):
+                self._entidades[coluna] = pd.DataFrame()
+            else:
+                colunas_niveis = [col for col in ProcessadorDados.COLUNAS_NIVEIS if col in df.columns]
+                metricas = [col for col in self.METRICAS_GERAIS if col in df.columns] + colunas_niveis
+                
+                longo = self._agregar(df, chaves, metricas)
+                ProcessadorDados._adicionar_percentuais_niveis(longo, colunas_niveis)
+                longo = longo.drop(columns=colunas_niveis + ['NU_TOTAL_TRI_E1'])
+                
+                self._entidades[coluna] = self._alinhar(longo, chaves)
+            self._memorizado(self._entidades[coluna])
+        
+        return self._entidades[coluna]
+    
+    def habilidades(self, coluna: str = None) -> pd.DataFrame:
+        """
+        Taxa de acerto de cada habilidade (por entidade, se informada)
+        
+        Ordenado da maior para a menor variação (sem variação ao final).
+        
+        Args:
+            coluna: CD_ENTIDADE ou CD_TURMA; None consolida todas as entidades
+        """
+        if coluna not in self._por_habilidade:
+            df = self._habilidades
+            chaves = [col for col in [coluna, 'CD_HABILIDADE', 'DC_HABILIDADE'] if col and col in df.columns]
+            
+            if (df.empty or 'Ciclo' not in df.columns or 'TX_ACERTO' not in df.columns
+                    or (coluna and coluna not in df.columns)):
+                self._por_habilidade[coluna] = pd.DataFrame()
+            else:
+                longo = self._agregar(df, chaves, ['TX_ACERTO'])
+                largo = self._alinhar(longo, chaves)
+                self._por_habilidade[coluna] = largo.sort_values(
+                    'DELTA_TX_ACERTO', ascending=False, kind='mergesort', ignore_index=True
+                )
+            self._memorizado(self._por_habilidade[coluna])
+        
+        return self._por_habilidade[coluna]
+    
+    def memoria_bytes(self) -> int:
+        """Memória das tabelas já memorizadas (os DataFrames de origem são do ConjuntoDados)"""
+        tabelas = list(self._entidades.values()) + list(self._por_habilidade.values())
+        return sum(memoria_dataframe(df) for df in tabelas)
+    
+    def _memorizado(self, df: pd.DataFrame):
+        if self.ao_memorizar is not None:
+            self.ao_memorizar(memoria_dataframe(df))
+    
+    @staticmethod
+    def _agregar(df: pd.DataFrame, chaves: List[str], metricas: List[str]) -> pd.DataFrame:
+        """Média das métricas com uma linha por chave e ciclo"""
+        # Sem chave (consolidado geral) usa uma chave constante para manter o mesmo formato
+        df = df if chaves else df.assign(_TODOS=0)
+        return (df.groupby((chaves or ['_TODOS']) + ['Ciclo'], sort=False, observed=True, dropna=False)[metricas]
+                .mean().reset_index())
+    
+    @classmethod
+    def _alinhar(cls, longo: pd.DataFrame, chaves: List[str]) -> pd.DataFrame:
+        """Coloca os ciclos lado a lado e calcula as variações"""
+        indice = chaves or ['_TODOS']
+        metricas = [col for col in longo.columns if col not in indice + ['Ciclo']]
+        largo = longo.set_index(indice + ['Ciclo'])[metricas].unstack('Ciclo')
+        
+        resultado = pd.DataFrame(index=largo.index)
+        for metrica in metricas:
+            inicial = cls._valores_ciclo(largo, metrica, cls.CICLO_INICIAL)
+            final = cls._valores_ciclo(largo, metrica, cls.CICLO_FINAL)
+            resultado[f'{metrica}_C1'] = inicial
+            resultado[f'{metrica}_C2'] = final
+            resultado[f'DELTA_{metrica}'] = final - inicial
+        
+        return resultado.reset_index(drop=not chaves)
+    
+    @staticmethod
+    def _valores_ciclo(largo: pd.DataFrame, metrica: str, ciclo: str) -> pd.Series:
+        if (metrica, ciclo) in largo.columns:
+            return largo[(metrica, ciclo)]
+        return pd.Series(np.nan, index=largo.index)
+
+# --------------------------------------------------------------------------
+# CONJUNTO DE DADOS CONSOLIDADO
+# --------------------------------------------------------------------------
+
+class ConjuntoDados:
+    """
+    Resultado consolidado de uma consulta (todos os ciclos)
+    
+    Montado uma vez na ingestão e reaproveitado entre reruns e sessões, por
+    isso os DataFrames devem ser tratados como somente leitura (quando vêm do
+    armazém compartilhado, são de fato mapeados do disco). As linhas
+    de cada ciclo são localizadas na criação (fatias das próprias tabelas,
+    sem cópia); visões por entidade (escola ou turma) são calculadas na
+    primeira solicitação e memorizadas.
+    """
+    
+    def __init__(self, geral: pd.DataFrame, habilidades: pd.DataFrame, niveis: pd.DataFrame,
+                 contingencia: bool = False, compartilhado: bool = False):
+        self.geral = geral
+        self.habilidades = habilidades
+        self.niveis = niveis
+        self.contingencia = contingencia
+        self.compartilhado = compartilhado
+        
+        self._linhas_geral = self._linhas_por_ciclo(geral)
+        self._linhas_habilidades = self._linhas_por_ciclo(habilidades)
+        self._niveis_por_ciclo: Optional[pd.DataFrame] = None
+        self._ranking_habilidades: Optional[RankingHabilidades] = None
+        self._variacoes: Optional[VariacoesCiclos] = None
+        self._dimensoes: Optional[Dict[str, pd.DataFrame]] = None
+        self._indices: Dict[Tuple[str, str], Dict[Hashable, np.ndarray]] = {}
+        self._subconjuntos: Dict[Tuple[str, Hashable], "ConjuntoDados"] = {}
+        # Memória medida na primeira chamada de memoria_bytes e depois somada a cada memorização
+        self._memoria: Optional[int] = None
+        # Avisado com os bytes de cada visão memorizada depois da medição (CacheConjuntos ou conjunto pai)
+        self.ao_memorizar: Optional[Callable[[int], None]] = None
+    
+    @staticmethod
+    def _linhas_por_ciclo(df: pd.DataFrame) -> Dict[str, Union[slice, np.ndarray]]:
+        """
+        Linhas de cada ciclo em uma única passada, sem copiar os dados
+        
+        As tabelas são concatenadas ciclo a ciclo, então cada ciclo ocupa um
+        trecho contínuo e vira uma fatia (a visão não copia a tabela, nem
+        quando ela é mapeada do armazém compartilhado). Fora desse caso
+        ficam as posições do ciclo.
+        """
+        if df.empty or 'Ciclo' not in df.columns:
+            return {}
+        linhas = {}
+        for ciclo, posicoes in df.groupby('Ciclo', sort=False, observed=True).indices.items():
+            inicio, fim = int(posicoes[0]), int(posicoes[-1]) + 1
+            linhas[ciclo] = slice(inicio, fim) if fim - inicio == len(posicoes) else posicoes
+        return linhas
+    
+    @property
+    def vazio(self) -> bool:
+        """Indica se a consulta não retornou dados gerais nem de habilidades"""
+        return self.geral.empty and self.habilidades.empty
+    
+    def geral_ciclo(self, ciclo: str) -> pd.DataFrame:
+        """Dados gerais de um ciclo"""
+        return self.geral.iloc[self._linhas_geral.get(ciclo, slice(0, 0))]
+    
+    def habilidades_ciclo(self, ciclo: str) -> pd.DataFrame:
+        """Dados de habilidades de um ciclo"""
+        return self.habilidades.iloc[self._linhas_habilidades.get(ciclo, slice(0, 0))]
+    
+    @property
+    def niveis_por_ciclo(self) -> pd.DataFrame:
+        """Distribuição por níveis com uma linha por ciclo (média entre entidades, se houver várias)"""
+        if self._niveis_por_ciclo is None:
+            self._niveis_por_ciclo = ProcessadorDados.selecionar_distribuicao(self.niveis)
+            self._memorizado(lambda: memoria_dataframe(self._niveis_por_ciclo))
+        return self._niveis_por_ciclo
+    
+    @property
+    def ranking_habilidades(self) -> RankingHabilidades:
+        """Habilidades ordenadas por taxa de acerto (montado no primeiro uso)"""
+        if self._ranking_habilidades is None:
+            self._ranking_habilidades = RankingHabilidades(self.habilidades)
+            self._ranking_habilidades.ao_memorizar = self._contabilizar
+            self._memorizado(self._ranking_habilidades.memoria_bytes)
+        return self._ranking_habilidades
+    
+    @property
+    def variacoes(self) -> VariacoesCiclos:
+        """Variações entre os ciclos por entidade e habilidade (tabelas montadas no primeiro uso)"""
+        if self._variacoes is None:
+            self._variacoes = VariacoesCiclos(self.geral, self.habilidades)
+            self._variacoes.ao_memorizar = self._contabilizar
+        return self._variacoes
+    
+    @property
+    def dimensoes(self) -> Dict[str, pd.DataFrame]:
+        """Tabelas de entidades, turmas e habilidades indexadas pelo código (montadas no primeiro uso)"""
+        if self._dimensoes is None:
+            self._dimensoes = ProcessadorDados.montar_dimensoes(self.geral, self.habilidades)
+            self._memorizado(lambda: sum(memoria_dataframe(df) for df in self._dimensoes.values()))
+        return self._dimensoes
+    
+    def memoria_bytes(self) -> int:
+        """
+        Memória (deep) do conjunto, incluindo visões, índices e subconjuntos já memorizados
+        
+        A medição completa é feita uma única vez; depois dela, cada visão
+        memorizada soma apenas os próprios bytes (_memorizado), então a
+        chamada é O(1). Tabelas mapeadas do armazém compartilhado não contam:
+        as páginas são do cache do sistema, divididas entre os processos.
+        """
+        if self._memoria is None:
+            total = memoria_indices([self._linhas_geral, self._linhas_habilidades])
+            if not self.compartilhado:
+                total += sum(memoria_dataframe(df) for df in [self.geral, self.habilidades, self.niveis])
+            total += memoria_dataframe(self._niveis_por_ciclo)
+            total += memoria_indices(list(self._indices.values()))
+            if self._dimensoes is not None:
+                total += sum(memoria_dataframe(df) for df in self._dimensoes.values())
+            if self._ranking_habilidades is not None:
+                total += self._ranking_habilidades.memoria_bytes()
+            if self._variacoes is not None:
+                total += self._variacoes.memoria_bytes()
+            self._memoria = total + sum(sub.memoria_bytes() for sub in list(self._subconjuntos.values()))
+        return self._memoria
+    
+    def _memorizado(self, medir: Callable[[], int]):
+        """Contabiliza uma visão recém-memorizada (medida só se o conjunto já foi medido)"""
+        if self._memoria is not None:
+            self._contabilizar(medir())
+    
+    def _contabilizar(self, nbytes: int):
+        # Antes da primeira medição não há o que atualizar: a medição completa inclui tudo
+        if self._memoria is None:
+            return
+        self._memoria += nbytes
+        if self.ao_memorizar is not None:
+            self.ao_memorizar(nbytes)
+    
+    def entidade(self, coluna: str, valor: Hashable) -> "ConjuntoDados":
+        """
+        Subconjunto de uma escola ou turma
+        
+        Args:
+            coluna: CD_ENTIDADE ou CD_TURMA
+            valor: Código da entidade
+        """
+        chave = (coluna, valor)
+        if chave not in self._subconjuntos:
+            subconjunto = ConjuntoDados(
+                self._filtrar('geral', self.geral, coluna, valor),
+                self._filtrar('habilidades', self.habilidades, coluna, valor),
+                self._filtrar('niveis', self.niveis, coluna, valor),
+                self.contingencia
+            )
+            subconjunto.ao_memorizar = self._contabilizar
+            self._subconjuntos[chave] = subconjunto
+            self._memorizado(subconjunto.memoria_bytes)
+        return self._subconjuntos[chave]
+    
+    def _filtrar(self, nome: str, df: pd.DataFrame, coluna: str, valor: Hashable) -> pd.DataFrame:
+        """Filtra por entidade usando o índice de posições da coluna (montado uma vez)"""
+        if df.empty or coluna not in df.columns:
+            return df.iloc[0:0]
+        
+        indice = self._indices.get((nome, coluna))
+        if indice is None:
+            indice = df.groupby(coluna, sort=False, observed=True).indices
+            self._indices[(nome, coluna)] = indice
+            self._memorizado(lambda: memoria_indices([indice]))
+        
+        posicoes = indice.get(valor)
+        return df.iloc[posicoes] if posicoes is not None else df.iloc[0:0]
+
+
+@dataclass
+class EntradaCache:
+    """Conjunto guardado no CacheConjuntos e a contabilidade de memória dele"""
+    conjunto: ConjuntoDados
+    expira_em: float
+    bytes: int
+    sessao: str
+    origem: str
+    criado_em: float
+    ultimo_acesso: float
+    acessos: int = 0
+
+
+class CacheConjuntos:
+    """
+    Cache de ConjuntoDados por consulta, compartilhado por todas as sessões do processo
+    
+    Cada item tem a memória medida uma vez ao ser guardado; subconjuntos e
+    visões memorizados depois somam os próprios bytes pelo aviso
+    ao_memorizar do conjunto, sem nova medição. O item é atribuído à última
+    sessão que o usou. Acima do orçamento da sessão, os
+    itens dela usados há mais tempo são descartados; acima do orçamento do
+    processo (bytes ou quantidade), os usados há mais tempo de qualquer
+    sessão. O item que acabou de ser guardado ou lido nunca é descartado.
+    """
+    
+    # Descartes recentes mantidos para a visão de administração
+    MAX_HISTORICO_DESCARTES = 50
+    
+    def __init__(self, ttl: int = config_api.TTL_CACHE_CONJUNTOS, max_itens: int = 64,
+                 max_bytes: int = config_api.MAX_BYTES_CACHE_CONJUNTOS,
+                 max_bytes_sessao: int = config_api.MAX_BYTES_CONJUNTOS_SESSAO):
+        self.ttl = ttl
+        self.max_itens = max_itens
+        self.max_bytes = max_bytes
+        self.max_bytes_sessao = max_bytes_sessao
+        self._lock = threading.Lock()
+        self._itens: "OrderedDict[Hashable, EntradaCache]" = OrderedDict()
+        self._descartes: Deque[Dict] = deque(maxlen=self.MAX_HISTORICO_DESCARTES)
+    
+    def obter(self, chave: Hashable, sessao: str = None) -> Optional[ConjuntoDados]:
+        """
+        Retorna o conjunto da consulta, se existir e não tiver expirado
+        
+        Args:
+            chave: Chave da consulta
+            sessao: Sessão que vai usar o conjunto (passa a responder por ele no orçamento)
+        """
+        with self._lock:
+            entrada = self._itens.get(chave)
+            if entrada is None:
+                return None
+            agora = time.monotonic()
+            if agora >= entrada.expira_em:
+                self._descartar(chave, "expirado")
+                return None
+            
+            entrada.ultimo_acesso = agora
+            entrada.acessos += 1
+            if sessao is not None:
+                entrada.sessao = sessao
+            self._itens.move_to_end(chave)
+            self._aplicar_orcamento(chave)
+            return entrada.conjunto
+    
+    def __contains__(self, chave: Hashable) -> bool:
+        """Indica se a consulta está em cache e válida, sem contar como uso"""
+        with self._lock:
+            entrada = self._itens.get(chave)
+            return entrada is not None and time.monotonic() < entrada.expira_em
+    
+    def guardar(self, chave: Hashable, conjunto: ConjuntoDados, sessao: str = "local", origem: str = "consulta"):
+        """
+        Armazena o conjunto, descartando os menos usados acima dos orçamentos
+        
+        Args:
+            chave: Chave da consulta
+            conjunto: Conjunto consolidado
+            sessao: Sessão que buscou os dados
+            origem: 'consulta' (pedido do usuário) ou 'prefetch'
+        """
+        agora = time.monotonic()
+        entrada = EntradaCache(conjunto, agora + self.ttl, conjunto.memoria_bytes(), sessao, origem, agora, agora)
+        conjunto.ao_memorizar = lambda nbytes: self._memorizado(chave, conjunto, nbytes)
+        with self._lock:
+            self._itens[chave] = entrada
+            self._itens.move_to_end(chave)
+            self._aplicar_orcamento(chave)
+    
+    def _memorizado(self, chave: Hashable, conjunto: ConjuntoDados, nbytes: int):
+        """Soma ao item a memória de uma visão memorizada (orçamento reaplicado no próximo acesso)"""
+        with self._lock:
+            entrada = self._itens.get(chave)
+            if entrada is not None and entrada.conjunto is conjunto:
+                entrada.bytes += nbytes
+    
+    def _aplicar_orcamento(self, preservar: Hashable):
+        """Descarta itens vencidos e, do menos para o mais recente, os que excedem os orçamentos"""
+        agora = time.monotonic()
+        for chave in [c for c, e in self._itens.items() if agora >= e.expira_em and c != preservar]:
+            self._descartar(chave, "expirado")
+        
+        sessao = self._itens[preservar].sessao
+        uso_sessao = sum(e.bytes for e in self._itens.values() if e.sessao == sessao)
+        for chave in [c for c, e in self._itens.items() if e.sessao == sessao and c != preservar]:
+            if uso_sessao <= self.max_bytes_sessao:
+                break
+            uso_sessao -= self._descartar(chave, "orçamento da sessão")
+        
+        uso_total = sum(e.bytes for e in self._itens.values())
+        for chave in [c for c in self._itens if c != preservar]:
+            if uso_total <= self.max_bytes and len(self._itens) <= self.max_itens:
+                break
+            motivo = "orçamento do processo" if uso_total > self.max_bytes else "limite de itens"
+            uso_total -= self._descartar(chave, motivo)
+    
+    def _descartar(self, chave: Hashable, motivo: str) -> int:
+        """Remove o item registrando o motivo; retorna a memória liberada"""
+        entrada = self._itens.pop(chave)
+        self._descartes.append({
+            "horario": datetime.now(),
+            "chave": chave,
+            "bytes": entrada.bytes,
+            "sessao": entrada.sessao,
+            "motivo": motivo,
+        })
+        return entrada.bytes
+    
+    def limpar(self):
+        """Remove todos os conjuntos"""
+        with self._lock:
+            self._itens.clear()
+    
+    # ----------------------------------------------------------------------
+    # CONTABILIDADE (VISÃO DE ADMINISTRAÇÃO)
+    # ----------------------------------------------------------------------
+    
+    def itens_residentes(self) -> List[Dict]:
+        """Itens em memória, do usado mais recentemente para o mais antigo"""
+        agora = time.monotonic()
+        with self._lock:
+            entradas = list(self._itens.items())
+        return [{
+            "chave": chave,
+            "bytes": entrada.bytes,
+            "sessao": entrada.sessao,
+            "origem": entrada.origem,
+            "acessos": entrada.acessos,
+            "idade_s": agora - entrada.criado_em,
+            "ocioso_s": agora - entrada.ultimo_acesso,
+            "expira_em_s": max(entrada.expira_em - agora, 0.0),
+        } for chave, entrada in reversed(entradas)]
+    
+    def uso_por_sessao(self) -> Dict[str, int]:
+        """Memória atribuída a cada sessão"""
+        uso: Dict[str, int] = {}
+        with self._lock:
+            for entrada in self._itens.values():
+                uso[entrada.sessao] = uso.get(entrada.sessao, 0) + entrada.bytes
+        return uso
+    
+    def uso_total(self) -> int:
+        """Memória de todos os itens residentes"""
+        with self._lock:
+            return sum(entrada.bytes for entrada in self._itens.values())
+    
+    def descartes_recentes(self) -> List[Dict]:
+        """Últimos itens descartados e o motivo, do mais recente para o mais antigo"""
+        with self._lock:
+            return list(reversed(self._descartes))
+
+
+# Instância global do cache de conjuntos
+cache_conjuntos = CacheConjuntos()
@@ -6,21 +6,26 @@ import streamlit as st
 import pandas as pd
 from typing import List, Dict, Optional, Tuple
 from config_api import config_api
+from processamento_dados import VariacoesCiclos
+from exportacao import renderizar_exportacao
+from estado_sessao import AtributoSessao
 
 class GerenciadorRankingSeletores:
     """Gerenciador para rankings e seletores de escolas e turmas"""
     
-    def __init__(self):
-        self.escola_selecionada = None
-        self.turma_selecionada = None
+    # Seleções do usuário: guardadas por sessão, não na instância compartilhada
+    escola_selecionada = AtributoSessao(None)
+    turma_selecionada = AtributoSessao(None)
     
-    def renderizar_ranking_escolas(self, df_geral: pd.DataFrame, df_habilidades: pd.DataFrame = None) -> Optional[str]:
+    def renderizar_ranking_escolas(self, df_geral: pd.DataFrame, df_habilidades: pd.DataFrame = None,
+                                   variacoes: VariacoesCiclos = None) -> Optional[str]:
         """
         Renderiza ranking de escolas e retorna a escola selecionada
         
         Args:
             df_geral: DataFrame com dados gerais
             df_habilidades: DataFrame com dados de habilidades (opcional)
+            variacoes: Variações entre ciclos já calculadas (opcional)
             
         Returns:
             Código da escola selecionada ou None
@@ -40,7 +45,7 @@ class GerenciadorRankingSeletores:
         criterio_ranking = self._renderizar_seletor_criterio_ranking(df_habilidades, "escolas")
         
         # Calcular métricas por escola
-        metricas_escolas = self._calcular_metricas_escolas(df_geral, df_habilidades, criterio_ranking)
+        metricas_escolas = self._calcular_metricas_escolas(df_geral, df_habilidades, criterio_ranking, variacoes)
         
         if metricas_escolas.empty:
             st.warning("Não foi possível calcular métricas das escolas.")
@@ -52,7 +57,8 @@ class GerenciadorRankingSeletores:
         # Seletor de escola
         return self._renderizar_seletor_escola(metricas_escolas)
     
-    def renderizar_ranking_turmas(self, df_geral: pd.DataFrame, escola_codigo: str, df_habilidades: pd.DataFrame = None) -> Optional[str]:
+    def renderizar_ranking_turmas(self, df_geral: pd.DataFrame, escola_codigo: str, df_habilidades: pd.DataFrame = None,
+                                  variacoes: VariacoesCiclos = None) -> Optional[str]:
         """
         Renderiza ranking de turmas da escola selecionada
         
@@ -60,6 +66,7 @@ class GerenciadorRankingSeletores:
             df_geral: DataFrame com dados gerais
             escola_codigo: Código da escola selecionada
             df_habilidades: DataFrame com dados de habilidades (opcional)
+            variacoes: Variações entre ciclos já calculadas (opcional)
             
         Returns:
             Código da turma selecionada ou None
@@ -85,7 +92,7 @@ class GerenciadorRankingSeletores:
         criterio_ranking = self._renderizar_seletor_criterio_ranking(df_habilidades, "turmas_escola")
         
         # Calcular métricas por turma
-        metricas_turmas = self._calcular_metricas_turmas(df_escola, df_habilidades, criterio_ranking)
+        metricas_turmas = self._calcular_metricas_turmas(df_escola, df_habilidades, criterio_ranking, variacoes)
         
         if metricas_turmas.empty:
             st.warning("Não foi possível calcular métricas das turmas.")
@@ -114,7 +121,8 @@ class GerenciadorRankingSeletores:
         opcoes_criterio = {
             'proficiencia': 'Proficiência Média',
             'participacao': 'Taxa de Participação',
-            'total_alunos': 'Total de Alunos'
+            'total_alunos': 'Total de Alunos',
+            'evolucao': 'Evolução da Proficiência (2º - 1º Ciclo)'
         }
         
         # Se temos dados de habilidades, adicionar opções de habilidades
@@ -134,207 +142,133 @@ class GerenciadorRankingSeletores:
         
         return criterio_selecionado
     
-    def _adicionar_valores_habilidades(self, metrica: dict, df_habilidades: pd.DataFrame, identificador: str, campo_identificador: str):
+    # Nome exibido para cada critério fixo de ranking
+    NOMES_CRITERIOS = {
+        'proficiencia': 'Proficiência Média',
+        'participacao': 'Taxa de Participação',
+        'total_alunos': 'Total de Alunos',
+        'evolucao': 'Evolução da Proficiência'
+    }
+    
+    def _valores_habilidades(self, df_habilidades: pd.DataFrame, campo_identificador: str, identificadores: pd.Index) -> pd.DataFrame:
         """
-        Adiciona valores das habilidades para exibição na tabela
+        Valores das habilidades para exibição na tabela, uma linha por escola/turma
         
         Args:
-            metrica: Dicionário com métricas da escola/turma
             df_habilidades: DataFrame com dados de habilidades
-            identificador: Código da escola ou turma
             campo_identificador: Campo para identificar (CD_ENTIDADE ou CD_TURMA)
+            identificadores: Códigos das escolas ou turmas
         """
-        if df_habilidades is None or df_habilidades.empty:
-            return
+        if (df_habilidades is None or df_habilidades.empty or 'TX_ACERTO' not in df_habilidades.columns
+                or campo_identificador not in df_habilidades.columns):
+            return pd.DataFrame(index=identificadores)
         
-        # Filtrar habilidades para a escola/turma específica
-        df_habilidades_filtrado = df_habilidades[df_habilidades[campo_identificador] == identificador]
+        df_filtrado = df_habilidades[df_habilidades[campo_identificador].isin(identificadores)]
+        medias = df_filtrado.groupby([campo_identificador, 'DC_HABILIDADE'], sort=False, observed=True)['TX_ACERTO'].mean()
         
-        if df_habilidades_filtrado.empty:
-            return
+        # Limitar a 5 habilidades por escola/turma para não sobrecarregar
+        medias = medias[medias.groupby(level=0).cumcount() < 5].round(1).reset_index()
         
-        # Obter habilidades únicas
-        habilidades_unicas = df_habilidades_filtrado['DC_HABILIDADE'].unique()
+        # Criar nome da coluna para a habilidade
+        medias['COLUNA'] = 'HABILIDADE_' + (medias['DC_HABILIDADE'].str.replace(" ", "_")
+                                            .str.replace(r"[:,()]", "", regex=True).str[:20])
+        valores = medias.groupby([campo_identificador, 'COLUNA'], sort=False, observed=True)['TX_ACERTO'].last().unstack('COLUNA')
         
-        # Adicionar valores das habilidades ao dicionário de métricas
-        for habilidade in habilidades_unicas[:5]:  # Limitar a 5 habilidades para não sobrecarregar
-            df_habilidade = df_habilidades_filtrado[df_habilidades_filtrado['DC_HABILIDADE'] == habilidade]
-            
-            if not df_habilidade.empty and 'TX_ACERTO' in df_habilidade.columns:
-                valor_habilidade = df_habilidade['TX_ACERTO'].mean()
-                # Criar nome da coluna para a habilidade
-                nome_coluna = f'HABILIDADE_{habilidade.replace(" ", "_").replace(":", "").replace(",", "").replace("(", "").replace(")", "")[:20]}'
-                metrica[nome_coluna] = round(valor_habilidade, 1)
+        return valores.reindex(index=identificadores, columns=medias['COLUNA'].unique())
     
-    def _calcular_metricas_escolas(self, df_geral: pd.DataFrame, df_habilidades: pd.DataFrame = None, criterio_ranking: str = 'proficiencia') -> pd.DataFrame:
-        """Calcula métricas para ranking de escolas"""
-        metricas = []
-        
-        for escola in df_geral['CD_ENTIDADE'].unique():
-            df_escola = df_geral[df_geral['CD_ENTIDADE'] == escola]
-            
-            # Calcular métricas básicas
-            metrica = {
-                'CD_ENTIDADE': escola,
-                'NM_INSTITUICAO': df_escola['NM_INSTITUICAO'].iloc[0] if 'NM_INSTITUICAO' in df_escola.columns else 'N/A',
-                'TOTAL_CICLOS': len(df_escola['Ciclo'].unique()),
-                'MEDIA_PROFICIENCIA': df_escola['AVG_PROFICIENCIA_E1'].mean() if 'AVG_PROFICIENCIA_E1' in df_escola.columns else 0,
-                'MEDIA_PARTICIPACAO': df_escola['TX_PARTICIPACAO'].mean() if 'TX_PARTICIPACAO' in df_escola.columns else 0,
-                'TOTAL_ALUNOS': df_escola['QT_ALUNO_EFETIVO'].sum() if 'QT_ALUNO_EFETIVO' in df_escola.columns else 0
-            }
-            
-            # Calcular métrica específica do critério de ranking
-            if criterio_ranking == 'proficiencia':
-                metrica['CRITERIO_RANKING'] = metrica['MEDIA_PROFICIENCIA']
-                metrica['NOME_CRITERIO'] = 'Proficiência Média'
-            elif criterio_ranking == 'participacao':
-                metrica['CRITERIO_RANKING'] = metrica['MEDIA_PARTICIPACAO']
-                metrica['NOME_CRITERIO'] = 'Taxa de Participação'
-            elif criterio_ranking == 'total_alunos':
-                metrica['CRITERIO_RANKING'] = metrica['TOTAL_ALUNOS']
-                metrica['NOME_CRITERIO'] = 'Total de Alunos'
-            elif criterio_ranking.startswith('habilidade_') and df_habilidades is not None:
-                # Calcular média da habilidade específica
-                habilidade_nome = criterio_ranking.replace('habilidade_', '')
-                df_habilidade_escola = df_habilidades[df_habilidades['CD_ENTIDADE'] == escola]
-                df_habilidade_especifica = df_habilidade_escola[df_habilidade_escola['DC_HABILIDADE'] == habilidade_nome]
-                
-                if not df_habilidade_especifica.empty and 'TX_ACERTO' in df_habilidade_especifica.columns:
-                    metrica['CRITERIO_RANKING'] = df_habilidade_especifica['TX_ACERTO'].mean()
-                    metrica['NOME_CRITERIO'] = f'Habilidade: {habilidade_nome}'
-                    
-                    # Adicionar valores das habilidades para exibição
-                    self._adicionar_valores_habilidades(metrica, df_habilidades, escola, 'CD_ENTIDADE')
-                else:
-                    metrica['CRITERIO_RANKING'] = 0
-                    metrica['NOME_CRITERIO'] = f'Habilidade: {habilidade_nome}'
+    def _calcular_metricas(self, df_geral: pd.DataFrame, campo_identificador: str, descritivos: Dict[str, str],
+                           df_habilidades: pd.DataFrame = None, criterio_ranking: str = 'proficiencia',
+                           variacoes: VariacoesCiclos = None) -> pd.DataFrame:
+        """
+        Calcula as métricas de ranking de todas as escolas/turmas de uma vez
+        
+        Args:
+            df_geral: DataFrame com dados gerais
+            campo_identificador: Campo para identificar (CD_ENTIDADE ou CD_TURMA)
+            descritivos: Campos copiados da primeira linha de cada escola/turma, com
+                o valor padrão (formatado com o código) quando o campo não existe
+            df_habilidades: DataFrame com dados de habilidades
+            criterio_ranking: Critério selecionado
+            variacoes: Variações entre ciclos já calculadas (calculadas aqui se None)
+        """
+        if df_geral.empty:
+            return pd.DataFrame()
+        
+        grupos = df_geral.groupby(campo_identificador, sort=False, observed=True)
+        primeiras = df_geral.drop_duplicates(campo_identificador).set_index(campo_identificador)
+        
+        # Calcular métricas básicas
+        df_metricas = pd.DataFrame(index=primeiras.index)
+        for campo, padrao in descritivos.items():
+            df_metricas[campo] = primeiras[campo] if campo in primeiras.columns else primeiras.index.map(padrao.format)
+        
+        df_metricas['TOTAL_CICLOS'] = grupos['Ciclo'].nunique()
+        df_metricas['MEDIA_PROFICIENCIA'] = grupos['AVG_PROFICIENCIA_E1'].mean() if 'AVG_PROFICIENCIA_E1' in df_geral.columns else 0
+        df_metricas['MEDIA_PARTICIPACAO'] = grupos['TX_PARTICIPACAO'].mean() if 'TX_PARTICIPACAO' in df_geral.columns else 0
+        df_metricas['TOTAL_ALUNOS'] = grupos['QT_ALUNO_EFETIVO'].sum() if 'QT_ALUNO_EFETIVO' in df_geral.columns else 0
+        
+        # Calcular métrica específica do critério de ranking
+        valores_habilidades = None
+        if criterio_ranking == 'participacao':
+            df_metricas['CRITERIO_RANKING'] = df_metricas['MEDIA_PARTICIPACAO']
+        elif criterio_ranking == 'total_alunos':
+            df_metricas['CRITERIO_RANKING'] = df_metricas['TOTAL_ALUNOS']
+        elif criterio_ranking == 'evolucao':
+            # Variação da proficiência do 1º para o 2º ciclo (nula sem os dois ciclos)
+            if variacoes is None:
+                variacoes = VariacoesCiclos(df_geral, df_habilidades if df_habilidades is not None else pd.DataFrame())
+            df_variacoes = variacoes.entidades(campo_identificador)
+            if 'DELTA_AVG_PROFICIENCIA_E1' in df_variacoes.columns:
+                df_metricas['CRITERIO_RANKING'] = (df_variacoes.set_index(campo_identificador)['DELTA_AVG_PROFICIENCIA_E1']
+                                                   .reindex(df_metricas.index))
+            else:
+                df_metricas['CRITERIO_RANKING'] = float('nan')
+        elif criterio_ranking.startswith('habilidade_') and df_habilidades is not None:
+            # Calcular média da habilidade específica
+            habilidade_nome = criterio_ranking.replace('habilidade_', '')
+            if campo_identificador in df_habilidades.columns and 'TX_ACERTO' in df_habilidades.columns:
+                df_habilidade_especifica = df_habilidades[df_habilidades['DC_HABILIDADE'] == habilidade_nome]
+                medias = df_habilidade_especifica.groupby(campo_identificador, observed=True)['TX_ACERTO'].mean().reindex(df_metricas.index)
             else:
-                metrica['CRITERIO_RANKING'] = metrica['MEDIA_PROFICIENCIA']
-                metrica['NOME_CRITERIO'] = 'Proficiência Média'
+                medias = pd.Series(float('nan'), index=df_metricas.index)
+            df_metricas['CRITERIO_RANKING'] = medias.fillna(0)
             
-            metricas.append(metrica)
+            # Adicionar valores das habilidades para exibição (apenas quem avaliou a habilidade)
+            valores_habilidades = self._valores_habilidades(df_habilidades, campo_identificador, medias.dropna().index)
+        else:
+            df_metricas['CRITERIO_RANKING'] = df_metricas['MEDIA_PROFICIENCIA']
         
-        df_metricas = pd.DataFrame(metricas)
+        if criterio_ranking.startswith('habilidade_') and df_habilidades is not None:
+            df_metricas['NOME_CRITERIO'] = f'Habilidade: {criterio_ranking.replace("habilidade_", "")}'
+        else:
+            df_metricas['NOME_CRITERIO'] = self.NOMES_CRITERIOS.get(criterio_ranking, 'Proficiência Média')
+        
+        if valores_habilidades is not None and not valores_habilidades.columns.empty:
+            df_metricas = df_metricas.join(valores_habilidades)
         
         # Ordenar pelo critério de ranking (descendente)
-        if 'CRITERIO_RANKING' in df_metricas.columns:
-            df_metricas = df_metricas.sort_values('CRITERIO_RANKING', ascending=False)
+        df_metricas = df_metricas.sort_values('CRITERIO_RANKING', ascending=False, kind='mergesort')
         
-        return df_metricas
+        return df_metricas.reset_index()
+    
+    def _calcular_metricas_escolas(self, df_geral: pd.DataFrame, df_habilidades: pd.DataFrame = None, criterio_ranking: str = 'proficiencia',
+                                   variacoes: VariacoesCiclos = None) -> pd.DataFrame:
+        """Calcula métricas para ranking de escolas"""
+        return self._calcular_metricas(df_geral, 'CD_ENTIDADE', {'NM_INSTITUICAO': 'N/A'},
+                                       df_habilidades, criterio_ranking, variacoes)
     
-    def _calcular_metricas_turmas(self, df_escola: pd.DataFrame, df_habilidades: pd.DataFrame = None, criterio_ranking: str = 'proficiencia') -> pd.DataFrame:
+    def _calcular_metricas_turmas(self, df_escola: pd.DataFrame, df_habilidades: pd.DataFrame = None, criterio_ranking: str = 'proficiencia',
+                                  variacoes: VariacoesCiclos = None) -> pd.DataFrame:
         """Calcula métricas para ranking de turmas"""
-        metricas = []
-        
-        for turma in df_escola['CD_TURMA'].unique():
-            df_turma = df_escola[df_escola['CD_TURMA'] == turma]
-            
-            # Calcular métricas básicas
-            metrica = {
-                'CD_TURMA': turma,
-                'NM_TURMA': df_turma['NM_TURMA'].iloc[0] if 'NM_TURMA' in df_turma.columns else f'Turma {turma}',
-                'TOTAL_CICLOS': len(df_turma['Ciclo'].unique()),
-                'MEDIA_PROFICIENCIA': df_turma['AVG_PROFICIENCIA_E1'].mean() if 'AVG_PROFICIENCIA_E1' in df_turma.columns else 0,
-                'MEDIA_PARTICIPACAO': df_turma['TX_PARTICIPACAO'].mean() if 'TX_PARTICIPACAO' in df_turma.columns else 0,
-                'TOTAL_ALUNOS': df_turma['QT_ALUNO_EFETIVO'].sum() if 'QT_ALUNO_EFETIVO' in df_turma.columns else 0
-            }
-            
-            # Calcular métrica específica do critério de ranking
-            if criterio_ranking == 'proficiencia':
-                metrica['CRITERIO_RANKING'] = metrica['MEDIA_PROFICIENCIA']
-                metrica['NOME_CRITERIO'] = 'Proficiência Média'
-            elif criterio_ranking == 'participacao':
-                metrica['CRITERIO_RANKING'] = metrica['MEDIA_PARTICIPACAO']
-                metrica['NOME_CRITERIO'] = 'Taxa de Participação'
-            elif criterio_ranking == 'total_alunos':
-                metrica['CRITERIO_RANKING'] = metrica['TOTAL_ALUNOS']
-                metrica['NOME_CRITERIO'] = 'Total de Alunos'
-            elif criterio_ranking.startswith('habilidade_') and df_habilidades is not None:
-                # Calcular média da habilidade específica
-                habilidade_nome = criterio_ranking.replace('habilidade_', '')
-                df_habilidade_turma = df_habilidades[df_habilidades['CD_TURMA'] == turma]
-                df_habilidade_especifica = df_habilidade_turma[df_habilidade_turma['DC_HABILIDADE'] == habilidade_nome]
-                
-                if not df_habilidade_especifica.empty and 'TX_ACERTO' in df_habilidade_especifica.columns:
-                    metrica['CRITERIO_RANKING'] = df_habilidade_especifica['TX_ACERTO'].mean()
-                    metrica['NOME_CRITERIO'] = f'Habilidade: {habilidade_nome}'
-                    
-                    # Adicionar valores das habilidades para exibição
-                    self._adicionar_valores_habilidades(metrica, df_habilidades, turma, 'CD_TURMA')
-                else:
-                    metrica['CRITERIO_RANKING'] = 0
-                    metrica['NOME_CRITERIO'] = f'Habilidade: {habilidade_nome}'
-            else:
-                metrica['CRITERIO_RANKING'] = metrica['MEDIA_PROFICIENCIA']
-                metrica['NOME_CRITERIO'] = 'Proficiência Média'
-            
-            metricas.append(metrica)
-        
-        df_metricas = pd.DataFrame(metricas)
-        
-        # Ordenar pelo critério de ranking (descendente)
-        if 'CRITERIO_RANKING' in df_metricas.columns:
-            df_metricas = df_metricas.sort_values('CRITERIO_RANKING', ascending=False)
-        
-        return df_metricas
+        return self._calcular_metricas(df_escola, 'CD_TURMA', {'NM_TURMA': 'Turma {}'},
+                                       df_habilidades, criterio_ranking, variacoes)
     
-    def _calcular_metricas_turmas_municipais(self, df_geral: pd.DataFrame, df_habilidades: pd.DataFrame = None, criterio_ranking: str = 'proficiencia') -> pd.DataFrame:
+    def _calcular_metricas_turmas_municipais(self, df_geral: pd.DataFrame, df_habilidades: pd.DataFrame = None, criterio_ranking: str = 'proficiencia',
+                                             variacoes: VariacoesCiclos = None) -> pd.DataFrame:
         """Calcula métricas para ranking de turmas municipais"""
-        metricas = []
-        
-        for turma in df_geral['CD_TURMA'].unique():
-            df_turma = df_geral[df_geral['CD_TURMA'] == turma]
-            
-            # Calcular métricas básicas
-            metrica = {
-                'CD_TURMA': turma,
-                'NM_TURMA': df_turma['NM_TURMA'].iloc[0] if 'NM_TURMA' in df_turma.columns else f'Turma {turma}',
-                'CD_ENTIDADE': df_turma['CD_ENTIDADE'].iloc[0] if 'CD_ENTIDADE' in df_turma.columns else 'N/A',
-                'NM_INSTITUICAO': df_turma['NM_INSTITUICAO'].iloc[0] if 'NM_INSTITUICAO' in df_turma.columns else 'N/A',
-                'TOTAL_CICLOS': len(df_turma['Ciclo'].unique()),
-                'MEDIA_PROFICIENCIA': df_turma['AVG_PROFICIENCIA_E1'].mean() if 'AVG_PROFICIENCIA_E1' in df_turma.columns else 0,
-                'MEDIA_PARTICIPACAO': df_turma['TX_PARTICIPACAO'].mean() if 'TX_PARTICIPACAO' in df_turma.columns else 0,
-                'TOTAL_ALUNOS': df_turma['QT_ALUNO_EFETIVO'].sum() if 'QT_ALUNO_EFETIVO' in df_turma.columns else 0
-            }
-            
-            # Calcular métrica específica do critério de ranking
-            if criterio_ranking == 'proficiencia':
-                metrica['CRITERIO_RANKING'] = metrica['MEDIA_PROFICIENCIA']
-                metrica['NOME_CRITERIO'] = 'Proficiência Média'
-            elif criterio_ranking == 'participacao':
-                metrica['CRITERIO_RANKING'] = metrica['MEDIA_PARTICIPACAO']
-                metrica['NOME_CRITERIO'] = 'Taxa de Participação'
-            elif criterio_ranking == 'total_alunos':
-                metrica['CRITERIO_RANKING'] = metrica['TOTAL_ALUNOS']
-                metrica['NOME_CRITERIO'] = 'Total de Alunos'
-            elif criterio_ranking.startswith('habilidade_') and df_habilidades is not None:
-                # Calcular média da habilidade específica
-                habilidade_nome = criterio_ranking.replace('habilidade_', '')
-                df_habilidade_turma = df_habilidades[df_habilidades['CD_TURMA'] == turma]
-                df_habilidade_especifica = df_habilidade_turma[df_habilidade_turma['DC_HABILIDADE'] == habilidade_nome]
-                
-                if not df_habilidade_especifica.empty and 'TX_ACERTO' in df_habilidade_especifica.columns:
-                    metrica['CRITERIO_RANKING'] = df_habilidade_especifica['TX_ACERTO'].mean()
-                    metrica['NOME_CRITERIO'] = f'Habilidade: {habilidade_nome}'
-                    
-                    # Adicionar valores das habilidades para exibição
-                    self._adicionar_valores_habilidades(metrica, df_habilidades, turma, 'CD_TURMA')
-                else:
-                    metrica['CRITERIO_RANKING'] = 0
-                    metrica['NOME_CRITERIO'] = f'Habilidade: {habilidade_nome}'
-            else:
-                metrica['CRITERIO_RANKING'] = metrica['MEDIA_PROFICIENCIA']
-                metrica['NOME_CRITERIO'] = 'Proficiência Média'
-            
-            metricas.append(metrica)
-        
-        df_metricas = pd.DataFrame(metricas)
-        
-        # Ordenar pelo critério de ranking (descendente)
-        if 'CRITERIO_RANKING' in df_metricas.columns:
-            df_metricas = df_metricas.sort_values('CRITERIO_RANKING', ascending=False)
-        
-        return df_metricas
+        return self._calcular_metricas(df_geral, 'CD_TURMA',
+                                       {'NM_TURMA': 'Turma {}', 'CD_ENTIDADE': 'N/A', 'NM_INSTITUICAO': 'N/A'},
+                                       df_habilidades, criterio_ranking, variacoes)
     
     def _exibir_ranking_turmas_municipais(self, df_metricas: pd.DataFrame, criterio_ranking: str = 'proficiencia'):
         """Exibe ranking municipal de turmas"""
@@ -411,6 +345,9 @@ class GerenciadorRankingSeletores:
                 use_container_width=True,
                 hide_index=True
             )
+            
+            # Exportar ranking completo
+            renderizar_exportacao({"ranking_turmas_municipais": df_display[colunas_finais]}, "ranking_turmas_municipais", "ranking_turmas_municipais")
     
     def _exibir_ranking_escolas(self, df_metricas: pd.DataFrame, criterio_ranking: str = 'proficiencia'):
         """Exibe ranking de escolas"""
@@ -486,6 +423,9 @@ class GerenciadorRankingSeletores:
                 use_container_width=True,
                 hide_index=True
             )
+            
+            # Exportar ranking completo
+            renderizar_exportacao({"ranking_escolas": df_display[colunas_finais]}, "ranking_escolas", "ranking_escolas")
     
     def _exibir_ranking_turmas(self, df_metricas: pd.DataFrame, criterio_ranking: str = 'proficiencia'):
         """Exibe ranking de turmas"""
@@ -561,6 +501,9 @@ class GerenciadorRankingSeletores:
                 use_container_width=True,
                 hide_index=True
             )
+            
+            # Exportar ranking completo
+            renderizar_exportacao({"ranking_turmas": df_display[colunas_finais]}, "ranking_turmas", "ranking_turmas")
     
     def _renderizar_seletor_escola(self, df_metricas: pd.DataFrame) -> Optional[str]:
         """Renderiza seletor de escola"""
@@ -0,0 +1,197 @@
+# --------------------------------------------------------------------------
+# RESILIÊNCIA DA API - AVALIECE1
+# --------------------------------------------------------------------------
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from config_api import config_api
+from indicadores import hash_indicadores
+
+# Campos do payload que não fazem parte da consulta em si
+CAMPOS_CREDENCIAIS = ("_InstallationId", "_SessionToken")
+
+# Marca adicionada às respostas servidas a partir do armazém de contingência
+CHAVE_CONTINGENCIA = "_contingencia"
+
+
+class CircuitoAbertoError(Exception):
+    """Levantada quando o circuit breaker bloqueia chamadas à API"""
+
+
+class LimiteConcorrenciaError(Exception):
+    """Levantada quando não há vaga no limitador dentro do tempo de espera"""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker para a API do CAEd
+
+    Estados:
+        fechado: requisições liberadas normalmente
+        aberto: requisições bloqueadas até o fim do tempo de recuperação
+        meio_aberto: uma única requisição de teste é liberada
+
+    Cada reabertura após um teste mal-sucedido dobra o tempo de recuperação,
+    até o teto configurado; um sucesso restaura os valores iniciais.
+    """
+
+    FECHADO = "fechado"
+    ABERTO = "aberto"
+    MEIO_ABERTO = "meio_aberto"
+
+    def __init__(self, limite_falhas: int = config_api.CIRCUIT_BREAKER_FALHAS,
+                 tempo_recuperacao: float = config_api.CIRCUIT_BREAKER_RECUPERACAO,
+                 tempo_recuperacao_max: float = config_api.CIRCUIT_BREAKER_RECUPERACAO_MAX):
+        self.limite_falhas = limite_falhas
+        self.tempo_recuperacao_inicial = tempo_recuperacao
+        self.tempo_recuperacao_max = tempo_recuperacao_max
+        self._lock = threading.Lock()
+        self._estado = self.FECHADO
+        self._falhas = 0
+        self._tempo_recuperacao = tempo_recuperacao
+        self._aberto_em = 0.0
+        self._teste_em_andamento = False
+
+    @property
+    def estado(self) -> str:
+        """Retorna o estado atual, considerando o fim do tempo de recuperação"""
+        with self._lock:
+            if self._estado == self.ABERTO and self._recuperacao_expirada():
+                return self.MEIO_ABERTO
+            return self._estado
+
+    def _recuperacao_expirada(self) -> bool:
+        return time.monotonic() - self._aberto_em >= self._tempo_recuperacao
+
+    def permitir_requisicao(self) -> bool:
+        """Indica se uma requisição pode seguir para a API"""
+        with self._lock:
+            if self._estado == self.FECHADO:
+                return True
+
+            if self._estado == self.ABERTO and self._recuperacao_expirada():
+                self._estado = self.MEIO_ABERTO
+                self._teste_em_andamento = False
+
+            # No estado meio aberto apenas uma requisição de teste por vez
+            if self._estado == self.MEIO_ABERTO and not self._teste_em_andamento:
+                self._teste_em_andamento = True
+                return True
+
+            return False
+
+    def registrar_sucesso(self):
+        """Registra uma resposta válida e fecha o circuito"""
+        with self._lock:
+            self._estado = self.FECHADO
+            self._falhas = 0
+            self._tempo_recuperacao = self.tempo_recuperacao_inicial
+            self._teste_em_andamento = False
+
+    def registrar_falha(self):
+        """Registra uma falha (timeout, conexão ou 5xx)"""
+        with self._lock:
+            if self._estado == self.MEIO_ABERTO:
+                # Teste falhou: reabre com backoff exponencial
+                self._tempo_recuperacao = min(self._tempo_recuperacao * 2, self.tempo_recuperacao_max)
+                self._abrir()
+                return
+
+            self._falhas += 1
+            if self._falhas >= self.limite_falhas:
+                self._abrir()
+
+    def cancelar_teste(self):
+        """Libera a vaga de teste quando a requisição não chegou a avaliar o upstream"""
+        with self._lock:
+            self._teste_em_andamento = False
+
+    def _abrir(self):
+        self._estado = self.ABERTO
+        self._aberto_em = time.monotonic()
+        self._teste_em_andamento = False
+
+    def segundos_para_nova_tentativa(self) -> float:
+        """Tempo restante até o circuito liberar uma requisição de teste"""
+        with self._lock:
+            if self._estado != self.ABERTO:
+                return 0.0
+            return max(0.0, self._tempo_recuperacao - (time.monotonic() - self._aberto_em))
+
+
+class LimitadorConcorrencia:
+    """Limita o número de requisições simultâneas à API no processo"""
+
+    def __init__(self, max_simultaneas: int = config_api.MAX_REQUISICOES_SIMULTANEAS,
+                 tempo_espera: float = config_api.TEMPO_ESPERA_LIMITADOR):
+        self.max_simultaneas = max_simultaneas
+        self.tempo_espera = tempo_espera
+        self._semaforo = threading.BoundedSemaphore(max_simultaneas)
+
+    @contextmanager
+    def vaga(self):
+        """Ocupa uma vaga durante o bloco; levanta LimiteConcorrenciaError se esgotar a espera"""
+        if not self._semaforo.acquire(timeout=self.tempo_espera):
+            raise LimiteConcorrenciaError(
+                f"Mais de {self.max_simultaneas} requisições simultâneas à API"
+            )
+        try:
+            yield
+        finally:
+            self._semaforo.release()
+
+
+class ArmazemRespostas:
+    """Guarda a última resposta válida de cada consulta para uso em contingência"""
+
+    def __init__(self, max_itens: int = 256):
+        self.max_itens = max_itens
+        self._lock = threading.Lock()
+        self._respostas: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+
+    def guardar(self, chave: str, resposta: Dict):
+        """Armazena a resposta, descartando as mais antigas acima do limite"""
+        with self._lock:
+            self._respostas[chave] = (time.time(), resposta)
+            self._respostas.move_to_end(chave)
+            while len(self._respostas) > self.max_itens:
+                self._respostas.popitem(last=False)
+
+    def obter(self, chave: str) -> Optional[Tuple[float, Dict]]:
+        """Retorna (instante da coleta, resposta) ou None"""
+        with self._lock:
+            return self._respostas.get(chave)
+
+    def obter_contingencia(self, chave: str) -> Optional[Dict]:
+        """Retorna a última resposta válida marcada como contingência"""
+        item = self.obter(chave)
+        if item is None:
+            return None
+        coletado_em, resposta = item
+        return {**resposta, CHAVE_CONTINGENCIA: coletado_em}
+
+
+def chave_payload(payload: Dict) -> str:
+    """
+    Gera uma chave estável para a consulta, ignorando as credenciais
+
+    A lista de indicadores entra pelo hash de conteúdo, que não depende da
+    ordem dos códigos nem do processo.
+    """
+    consulta = {k: v for k, v in payload.items() if k not in CAMPOS_CREDENCIAIS}
+    if "CD_INDICADOR" in consulta:
+        consulta["CD_INDICADOR"] = hash_indicadores(consulta["CD_INDICADOR"])
+    serializado = json.dumps(consulta, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(serializado.encode("utf-8")).hexdigest()
+
+
+# Instâncias globais (compartilhadas por todas as sessões do processo)
+circuit_breaker = CircuitBreaker()
+limitador_api = LimitadorConcorrencia()
+armazem_respostas = ArmazemRespostas()
@@ -0,0 +1,432 @@
+# --------------------------------------------------------------------------
+# SERVIÇO LOCAL DE CONSULTAS - AVALIECE1
+# --------------------------------------------------------------------------
+
+"""
+Serviço HTTP/JSON com os mesmos resultados processados do painel, para
+ferramentas que não rodam o Streamlit (planilhas, BI).
+
+Uso:
+    python servico_consultas.py
+    python servico_consultas.py --host 0.0.0.0 --porta 8502 --secrets .streamlit/secrets.toml
+
+Endpoints (GET):
+    /consulta?entidade=2304400&componente=Matemática&etapa=5&nivel=1&tabela=ranking
+        tabela: geral, habilidades, niveis, variacoes_entidades,
+                variacoes_habilidades ou ranking (níveis 1 e 2, com
+                criterio=proficiencia|participacao|total_alunos|evolucao)
+        formato: json (padrão), csv ou arrow (Arrow IPC stream, requer pyarrow)
+    /saude
+
+As consultas passam pelo mesmo APIClient do painel (cache de respostas,
+circuit breaker, limitador de concorrência e contingência) e pelo mesmo
+cache_conjuntos, então todos os consumidores dividem um cache e uma cota
+da API. Consultas iguais simultâneas esperam a primeira em vez de repeti-la.
+Cada corpo é serializado uma vez por versão do conjunto, com ETag (If-None-Match
+responde 304) e gzip quando o cliente aceita.
+
+Com token em [servico] no secrets.toml, as requisições precisam do cabeçalho
+Authorization: Bearer <token>.
+"""
+
+import argparse
+import gzip
+import hashlib
+import hmac
+import io
+import json
+import logging
+import sys
+import threading
+import tomllib
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from agendador_consultas import agendador_consultas
+from armazem_conjuntos import armazem_conjuntos
+from cliente_api import APIClient
+from config_api import config_api
+from exportacao import escrever_csv, tabelas_conjunto
+from gerar_relatorios import carregar_secrets, montar_payloads
+from processamento_dados import ConjuntoDados, ProcessadorDados, cache_conjuntos
+from ranking_seletores import GerenciadorRankingSeletores
+from resiliencia_api import circuit_breaker
+
+# Tabelas servidas: as da exportação do painel e o ranking
+TABELAS = ("geral", "habilidades", "niveis", "variacoes_entidades", "variacoes_habilidades", "ranking")
+
+# Formato -> Content-Type
+FORMATOS = {
+    "json": "application/json; charset=utf-8",
+    "csv": "text/csv; charset=utf-8",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+# Coluna de entidade de cada nível (variações e ranking)
+COLUNAS_ENTIDADE = {1: "CD_ENTIDADE", 2: "CD_TURMA"}
+
+
+class ErroConsulta(Exception):
+    """Parâmetros inválidos ou consulta indisponível, com o status HTTP da resposta"""
+
+    def __init__(self, mensagem: str, status: int = 400):
+        super().__init__(mensagem)
+        self.status = status
+
+
+@dataclass
+class CorpoServico:
+    """Resposta serializada de uma consulta, reaproveitada enquanto o conjunto for o mesmo"""
+    conjunto: "weakref.ref[ConjuntoDados]"
+    corpo: bytes
+    tipo: str
+    etag: str
+    contingencia: bool
+    corpo_gzip: Optional[bytes] = None
+
+
+class ServicoConsultas:
+    """Monta, serializa e guarda as respostas do serviço (independente do HTTP)"""
+
+    # Corpos serializados mantidos em memória
+    MAX_CORPOS = 256
+
+    def __init__(self, installation_id: str, session_token: str, api_client: APIClient = None):
+        self.installation_id = installation_id
+        self.session_token = session_token
+        self.api_client = api_client or APIClient()
+        self.ranking = GerenciadorRankingSeletores()
+        self._lock = threading.Lock()
+        # Trava de cada consulta em carga e quantas requisições a usam (removida com a última)
+        self._travas: Dict[Tuple, Tuple[threading.Lock, int]] = {}
+        self._corpos: "OrderedDict[Tuple, CorpoServico]" = OrderedDict()
+
+    # ----------------------------------------------------------------------
+    # PARÂMETROS
+    # ----------------------------------------------------------------------
+
+    @staticmethod
+    def interpretar(parametros: Dict[str, List[str]]) -> Tuple[Tuple[str, str, int, int], str, str, str]:
+        """
+        Valida os parâmetros da URL
+
+        Returns:
+            (chave da consulta, tabela, critério do ranking, formato)
+        """
+        def valor(nome: str, padrao: str = None) -> str:
+            valores = parametros.get(nome)
+            if not valores:
+                if padrao is None:
+                    raise ErroConsulta(f"Parâmetro obrigatório ausente: {nome}")
+                return padrao
+            return valores[0]
+
+        entidade = valor("entidade")
+        componente = valor("componente")
+        if componente not in dict(config_api.COMPONENTES):
+            raise ErroConsulta(f"Componente desconhecido: {componente}")
+        try:
+            etapa = int(valor("etapa"))
+            nivel = int(valor("nivel", "0"))
+        except ValueError:
+            raise ErroConsulta("etapa e nivel devem ser números inteiros") from None
+        if etapa not in config_api.ETAPAS:
+            raise ErroConsulta(f"Etapa indisponível: {etapa}")
+        if nivel not in (0, 1, 2):
+            raise ErroConsulta(f"Nível de agregação inválido: {nivel}")
+
+        tabela = valor("tabela", "geral")
+        if tabela not in TABELAS:
+            raise ErroConsulta(f"Tabela desconhecida: {tabela} (disponíveis: {', '.join(TABELAS)})")
+        if tabela == "ranking" and nivel not in COLUNAS_ENTIDADE:
+            raise ErroConsulta("O ranking está disponível apenas nos níveis 1 (escolas) e 2 (turmas)")
+        criterio = valor("criterio", "proficiencia")
+        formato = valor("formato", "json")
+        if formato not in FORMATOS:
+            raise ErroConsulta(f"Formato desconhecido: {formato} (disponíveis: {', '.join(FORMATOS)})")
+
+        return (entidade, componente, etapa, nivel), tabela, criterio, formato
+
+    # ----------------------------------------------------------------------
+    # DADOS
+    # ----------------------------------------------------------------------
+
+    @contextmanager
+    def _trava(self, chave_consulta: Tuple) -> Iterator[None]:
+        """Exclusão mútua por consulta; a trava só existe enquanto alguma requisição a usa"""
+        with self._lock:
+            trava, usuarios = self._travas.get(chave_consulta, (None, 0))
+            trava = trava or threading.Lock()
+            self._travas[chave_consulta] = (trava, usuarios + 1)
+        try:
+            with trava:
+                yield
+        finally:
+            with self._lock:
+                usuarios = self._travas[chave_consulta][1] - 1
+                if usuarios:
+                    self._travas[chave_consulta] = (trava, usuarios)
+                else:
+                    del self._travas[chave_consulta]
+
+    def conjunto(self, chave_consulta: Tuple[str, str, int, int]) -> ConjuntoDados:
+        """
+        Conjunto consolidado da consulta, pelos mesmos caches do painel
+
+        Raises:
+            ErroConsulta: Nenhuma resposta da API nem contingência disponível
+        """
+        conjunto = cache_conjuntos.obter(chave_consulta, "servico")
+        if conjunto is not None:
+            return conjunto
+
+        # Consultas iguais simultâneas esperam a primeira
+        with self._trava(chave_consulta):
+            conjunto = cache_conjuntos.obter(chave_consulta, "servico")
+            if conjunto is not None:
+                return conjunto
+
+            conjunto = armazem_conjuntos.carregar(chave_consulta)
+            if conjunto is not None:
+                cache_conjuntos.guardar(chave_consulta, conjunto, "servico", origem="armazém")
+                return conjunto
+
+            payloads = montar_payloads(*chave_consulta, self.installation_id, self.session_token)
+            id_consulta = f"servico:{chave_consulta}"
+            futuros = agendador_consultas.agendar(
+                id_consulta, chave_consulta,
+                {nome: self.api_client.agendar_requisicao(payload) for nome, payload in payloads.items()}
+            )
+            respostas = {nome: self.api_client.resolver_requisicao(payload, futuros[nome].result)
+                         for nome, payload in payloads.items()}
+            agendador_consultas.concluir(id_consulta, chave_consulta)
+
+            if not any(respostas.values()):
+                raise ErroConsulta("API de resultados indisponível e sem dados de contingência", 503)
+
+            conjunto = ProcessadorDados.conjunto_de_respostas(respostas)
+            # Só guarda consultas completas e atualizadas, como o painel
+            if all(respostas.values()) and not conjunto.contingencia:
+                cache_conjuntos.guardar(chave_consulta, conjunto, "servico")
+                armazem_conjuntos.publicar(chave_consulta, conjunto)
+            return conjunto
+
+    def tabela(self, conjunto: ConjuntoDados, nivel: int, tabela: str, criterio: str) -> pd.DataFrame:
+        """Tabela pedida, calculada pelas mesmas rotinas da exportação e do ranking do painel"""
+        coluna = COLUNAS_ENTIDADE.get(nivel)
+        if tabela == "ranking":
+            calcular = (self.ranking._calcular_metricas_escolas if nivel == 1
+                        else self.ranking._calcular_metricas_turmas_municipais)
+            metricas = calcular(conjunto.geral, conjunto.habilidades, criterio, conjunto.variacoes)
+            if not metricas.empty:
+                metricas.insert(0, "POSICAO", range(1, len(metricas) + 1))
+            return metricas
+
+        nomes = {"geral": "dados_gerais"}
+        return tabelas_conjunto(conjunto, coluna).get(nomes.get(tabela, tabela), pd.DataFrame())
+
+    # ----------------------------------------------------------------------
+    # SERIALIZAÇÃO
+    # ----------------------------------------------------------------------
+
+    @staticmethod
+    def serializar(df: pd.DataFrame, formato: str, descricao: Dict) -> bytes:
+        """Corpo da resposta no formato pedido"""
+        if formato == "csv":
+            destino = io.BytesIO()
+            escrever_csv(df, destino)
+            return destino.getvalue()
+
+        if formato == "arrow":
+            try:
+                import pyarrow as pa
+            except ImportError:
+                raise ErroConsulta("Formato arrow requer o pacote pyarrow no servidor", 406) from None
+            tabela = pa.Table.from_pandas(df)
+            destino = pa.BufferOutputStream()
+            with pa.ipc.new_stream(destino, tabela.schema) as escritor:
+                escritor.write_table(tabela)
+            return destino.getvalue().to_pybytes()
+
+        cabecalho = json.dumps(descricao, ensure_ascii=False)[:-1]
+        dados = df.to_json(orient="records", force_ascii=False, date_format="iso")
+        return f'{cabecalho}, "linhas": {len(df)}, "dados": {dados}}}'.encode("utf-8")
+
+    def responder(self, parametros: Dict[str, List[str]]) -> CorpoServico:
+        """
+        Resposta serializada da consulta, reaproveitando o corpo enquanto o conjunto não mudar
+
+        Raises:
+            ErroConsulta: Parâmetros inválidos ou dados indisponíveis
+        """
+        chave_consulta, tabela, criterio, formato = self.interpretar(parametros)
+        conjunto = self.conjunto(chave_consulta)
+        chave = (chave_consulta, tabela, criterio if tabela == "ranking" else None, formato)
+
+        with self._lock:
+            guardado = self._corpos.get(chave)
+            if guardado is not None and guardado.conjunto() is conjunto:
+                self._corpos.move_to_end(chave)
+                return guardado
+
+        entidade, componente, etapa, nivel = chave_consulta
+        descricao = {"consulta": {"entidade": entidade, "componente": componente, "etapa": etapa,
+                                  "nivel": nivel, "tabela": tabela, "criterio": chave[2]},
+                     "contingencia": conjunto.contingencia}
+        corpo = self.serializar(self.tabela(conjunto, nivel, tabela, criterio), formato, descricao)
+
+        resposta = CorpoServico(weakref.ref(conjunto), corpo, FORMATOS[formato],
+                                hashlib.sha256(corpo).hexdigest()[:32], conjunto.contingencia)
+        with self._lock:
+            self._corpos[chave] = resposta
+            self._corpos.move_to_end(chave)
+            while len(self._corpos) > self.MAX_CORPOS:
+                self._corpos.popitem(last=False)
+        return resposta
+
+    @staticmethod
+    def comprimir(resposta: CorpoServico) -> bytes:
+        """Versão gzip do corpo (calculada uma vez por corpo)"""
+        if resposta.corpo_gzip is None:
+            resposta.corpo_gzip = gzip.compress(resposta.corpo, compresslevel=6)
+        return resposta.corpo_gzip
+
+    def saude(self) -> Dict:
+        return {
+            "circuito": circuit_breaker.estado,
+            "conjuntos_em_cache": len(cache_conjuntos.itens_residentes()),
+            "bytes_conjuntos": cache_conjuntos.uso_total(),
+            "corpos_serializados": len(self._corpos),
+        }
+
+# --------------------------------------------------------------------------
+# HTTP
+# --------------------------------------------------------------------------
+
+def criar_servidor(servico: ServicoConsultas, host: str, porta: int, token: str = None) -> ThreadingHTTPServer:
+    """Servidor HTTP com uma thread por requisição sobre o ServicoConsultas"""
+
+    class Manipulador(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _enviar(self, status: int, corpo: bytes = b"", cabecalhos: Dict[str, str] = None):
+            self.send_response(status)
+            for nome, valor in (cabecalhos or {}).items():
+                self.send_header(nome, valor)
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(corpo)
+
+        def _enviar_json(self, status: int, conteudo: Dict):
+            self._enviar(status, json.dumps(conteudo, ensure_ascii=False).encode("utf-8"),
+                         {"Content-Type": FORMATOS["json"]})
+
+        def _autorizado(self) -> bool:
+            # Comparação em tempo constante (não revela quantos caracteres do token conferem);
+            # em bytes, pois compare_digest não aceita textos com caracteres fora do ASCII
+            recebido = self.headers.get("Authorization", "").encode("utf-8")
+            return token is None or hmac.compare_digest(recebido, f"Bearer {token}".encode("utf-8"))
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if not self._autorizado():
+                self._enviar_json(401, {"erro": "Token ausente ou inválido"})
+            elif url.path == "/saude":
+                self._enviar_json(200, servico.saude())
+            elif url.path == "/consulta":
+                self._consulta(parse_qs(url.query))
+            else:
+                self._enviar_json(404, {"erro": f"Caminho desconhecido: {url.path}"})
+
+        do_HEAD = do_GET
+
+        def _consulta(self, parametros: Dict[str, List[str]]):
+            try:
+                resposta = servico.responder(parametros)
+            except ErroConsulta as e:
+                self._enviar_json(e.status, {"erro": str(e)})
+                return
+            except Exception as e:
+                logging.exception("Erro ao processar a consulta")
+                self._enviar_json(500, {"erro": f"Erro inesperado: {e}"})
+                return
+
+            usar_gzip = ("gzip" in self.headers.get("Accept-Encoding", "")
+                         and len(resposta.corpo) >= config_api.MIN_BYTES_GZIP_SERVICO)
+            # Cada representação tem a própria ETag; a validação aceita as duas
+            etag = f'"{resposta.etag}-gzip"' if usar_gzip else f'"{resposta.etag}"'
+            cabecalhos = {
+                "ETag": etag,
+                "Cache-Control": "no-cache",
+                "Vary": "Accept-Encoding",
+                "X-Contingencia": "1" if resposta.contingencia else "0",
+            }
+
+            etags_cliente = {valor.strip().removeprefix("W/").strip('"').removesuffix("-gzip")
+                             for valor in self.headers.get("If-None-Match", "").split(",") if valor.strip()}
+            if resposta.etag in etags_cliente or "*" in etags_cliente:
+                self._enviar(304, cabecalhos=cabecalhos)
+                return
+
+            cabecalhos["Content-Type"] = resposta.tipo
+            if usar_gzip:
+                cabecalhos["Content-Encoding"] = "gzip"
+                self._enviar(200, servico.comprimir(resposta), cabecalhos)
+            else:
+                self._enviar(200, resposta.corpo, cabecalhos)
+
+        def log_message(self, formato, *args):
+            logging.info(f"{self.address_string()} {formato % args}")
+
+    servidor = ThreadingHTTPServer((host, porta), Manipulador)
+    servidor.daemon_threads = True
+    return servidor
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Serviço HTTP/JSON com os resultados processados do painel")
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço de escuta (padrão: 127.0.0.1)")
+    parser.add_argument("--porta", type=int, default=config_api.PORTA_SERVICO_CONSULTAS,
+                        help=f"Porta (padrão: {config_api.PORTA_SERVICO_CONSULTAS})")
+    parser.add_argument("--secrets", type=Path, default=Path(".streamlit/secrets.toml"),
+                        help="Arquivo secrets.toml do painel (padrão: .streamlit/secrets.toml)")
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    args = criar_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    try:
+        secrets = carregar_secrets(args.secrets)
+        installation_id = secrets["api"]["installation_id"]
+        session_token = secrets["api"]["session_token"]
+    except (OSError, KeyError, tomllib.TOMLDecodeError) as e:
+        logging.error(f"Erro na configuração: {e!r}. Verifique o arquivo secrets.toml")
+        return 1
+
+    servico = ServicoConsultas(installation_id, session_token)
+    servidor = criar_servidor(servico, args.host, args.porta, secrets.get("servico", {}).get("token"))
+    logging.info(f"Serviço de consultas em http://{args.host}:{args.porta}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        servico.api_client.fechar()
+        agendador_consultas.encerrar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,389 @@
+# --------------------------------------------------------------------------
+# TESTE DE CARGA DO PAINEL - AVALIECE1
+# --------------------------------------------------------------------------
+
+"""
+Simula várias sessões simultâneas do painel, sem navegador, para estimar
+quantos usuários um worker suporta.
+
+Cada sessão é um AppTest do Streamlit executando o Avaliacoes.py no mesmo
+processo, então os caches (st.cache_resource, respostas da API e
+conjuntos) e as instâncias globais são compartilhados como em um worker
+real. O roteiro de cada sessão: login, troca de nível, troca de etapa e
+componente, critério de ranking e escola. A API é substituída por um
+servidor local (ServidorAPISimulado) com latência configurável, que também
+pode servir as respostas do arquivo_respostas.
+
+Uso (na raiz do projeto, por causa dos logos):
+    python teste_carga.py --sessoes 20 --iteracoes 5 --latencia-api 0.2
+
+Relata vazão (reruns/s), percentis da latência de cada rerun por tipo de
+passo e a memória (RSS) acrescida por sessão.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from arquivo_respostas import arquivo_respostas
+from config_api import config_api
+from payloads import descrever_payload
+from processamento_dados import cache_conjuntos
+
+# Credenciais fictícias das sessões de teste
+CODIGO_TESTE = "2300000"
+SENHA_TESTE = "carga"
+
+SCRIPT_PAINEL = Path(__file__).with_name("Avaliacoes.py")
+
+# --------------------------------------------------------------------------
+# API SIMULADA
+# --------------------------------------------------------------------------
+
+def gerar_resposta(payload: Dict, escolas: int = 10, turmas: int = 3, habilidades: int = 20) -> Dict:
+    """
+    Resposta sintética no formato do getDadosResultado
+
+    Determinística por consulta: a mesma consulta sempre devolve os mesmos
+    valores, como a API real entre publicações.
+    """
+    consulta = descrever_payload(payload)
+    nivel = consulta["nivel_agregacao"] or 0
+    semente = hashlib.sha256(json.dumps(consulta, sort_keys=True).encode("utf-8")).hexdigest()
+    aleatorio = random.Random(semente)
+
+    entidade = consulta["entidade"]
+    unidades = ([(entidade, f"MUNICÍPIO {entidade}")] if nivel == 0 else
+                [(f"{entidade}{i:04d}", f"ESCOLA {i}") for i in range(escolas)])
+    comuns = {
+        "VL_FILTRO_ETAPA": f"ENSINO FUNDAMENTAL DE 9 ANOS - {consulta['etapa']}º ANO",
+        "VL_FILTRO_DISCIPLINA": dict(config_api.COMPONENTES).get(consulta["componente"]),
+    }
+
+    linhas = []
+    for codigo, nome in unidades:
+        grupos = [(f"{codigo}{j:02d}", f"TURMA {j + 1}") for j in range(turmas)] if nivel == 2 else [None]
+        for grupo in grupos:
+            base = {"CD_ENTIDADE": codigo, "NM_ENTIDADE": nome, "NM_INSTITUICAO": nome, **comuns}
+            if grupo:
+                base.update(CD_TURMA=grupo[0], NM_TURMA=grupo[1])
+
+            if consulta["tipo"] == "habilidades":
+                for h in range(1, habilidades + 1):
+                    linhas.append({**base, "CD_HABILIDADE": f"D{h:02d}", "DC_HABILIDADE": f"D{h:02d} - Habilidade {h}",
+                                   "TX_ACERTO": f"{aleatorio.uniform(20, 95):.2f}"})
+            else:
+                previstos = aleatorio.randint(20, 35)
+                efetivos = aleatorio.randint(previstos // 2, previstos)
+                niveis = [aleatorio.randint(0, efetivos) for _ in range(2)]
+                linhas.append({**base,
+                               "TX_PARTICIPACAO": f"{100 * efetivos / previstos:.2f}",
+                               "AVG_PROFICIENCIA_E1": f"{aleatorio.uniform(120, 260):.2f}",
+                               "QT_ALUNO_PREVISTO": str(previstos), "QT_ALUNO_EFETIVO": str(efetivos),
+                               "NU_N01_TRI_E1": str(min(niveis)), "NU_N02_TRI_E1": str(max(niveis) - min(niveis)),
+                               "NU_N03_TRI_E1": str(efetivos - max(niveis))})
+    return {"result": linhas}
+
+
+class ServidorAPISimulado:
+    """
+    Servidor HTTP local que responde como o getDadosResultado
+
+    Exemplo:
+        with ServidorAPISimulado(latencia=0.1) as servidor:
+            config_api.API_URL = servidor.url
+    """
+
+    def __init__(self, latencia: float = 0.0, usar_arquivo: bool = False, **opcoes_resposta):
+        """
+        Args:
+            latencia: Atraso (s) adicionado a cada resposta
+            usar_arquivo: Serve a última resposta arquivada, quando existir
+            **opcoes_resposta: Repassadas a gerar_resposta (escolas, turmas, habilidades)
+        """
+        self.latencia = latencia
+        self.usar_arquivo = usar_arquivo
+        self.opcoes_resposta = opcoes_resposta
+        self.requisicoes = 0
+        self._lock = threading.Lock()
+        self._servidor: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, porta = self._servidor.server_address[:2]
+        return f"http://{host}:{porta}/getDadosResultado"
+
+    def _responder(self, payload: Dict) -> bytes:
+        with self._lock:
+            self.requisicoes += 1
+        resposta = arquivo_respostas.obter(payload) if self.usar_arquivo else None
+        if resposta is None:
+            resposta = gerar_resposta(payload, **self.opcoes_resposta)
+        if self.latencia:
+            time.sleep(self.latencia)
+        return json.dumps(resposta).encode("utf-8")
+
+    def iniciar(self):
+        servidor_api = self
+
+        class Manipulador(BaseHTTPRequestHandler):
+            def do_POST(self):
+                tamanho = int(self.headers.get("Content-Length", 0))
+                corpo = servidor_api._responder(json.loads(self.rfile.read(tamanho)))
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", 0), Manipulador)
+        self._servidor.daemon_threads = True
+        threading.Thread(target=self._servidor.serve_forever, name="api_simulada", daemon=True).start()
+
+    def encerrar(self):
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+
+    def __enter__(self) -> "ServidorAPISimulado":
+        self.iniciar()
+        return self
+
+    def __exit__(self, *exc):
+        self.encerrar()
+
+# --------------------------------------------------------------------------
+# SESSÕES SIMULADAS
+# --------------------------------------------------------------------------
+
+@dataclass
+class ResultadoSessao:
+    """Latências (s) de cada rerun de uma sessão, por tipo de passo"""
+    latencias: List[Tuple[str, float]] = field(default_factory=list)
+    erros: List[str] = field(default_factory=list)
+
+
+class SessaoCarga:
+    """Uma sessão do painel percorrendo o roteiro de uso"""
+
+    def __init__(self, numero: int, iteracoes: int, timeout: float):
+        self.numero = numero
+        self.iteracoes = iteracoes
+        self.timeout = timeout
+        self.aleatorio = random.Random(numero)
+        self.resultado = ResultadoSessao()
+        self.app = None
+
+    def _rerun(self, passo: str, acao=None):
+        """Aplica a ação nos widgets (se houver) e mede o rerun do script"""
+        if acao is not None:
+            acao()
+        inicio = time.perf_counter()
+        self.app.run(timeout=self.timeout)
+        self.resultado.latencias.append((passo, time.perf_counter() - inicio))
+        for excecao in self.app.exception:
+            self.resultado.erros.append(f"{passo}: {excecao.value}")
+
+    def _selectbox(self, rotulo: str, barra_lateral: bool = False):
+        origem = self.app.sidebar if barra_lateral else self.app
+        return next((widget for widget in origem.selectbox if widget.label.startswith(rotulo)), None)
+
+    def _escolher(self, passo: str, rotulo: str, barra_lateral: bool = False, valores: Optional[List] = None):
+        """
+        Escolhe uma opção aleatória de um selectbox, se ele estiver na tela
+
+        valores: opções originais, para selectbox cujo format_func aceita
+        qualquer valor (o AppTest formataria de novo o rótulo já formatado)
+        """
+        widget = self._selectbox(rotulo, barra_lateral)
+        if widget is None or not widget.options:
+            return
+        if valores:
+            self._rerun(passo, lambda: widget.select(self.aleatorio.choice(valores)))
+        else:
+            self._rerun(passo, lambda: widget.select_index(self.aleatorio.randrange(len(widget.options))))
+
+    def executar(self) -> ResultadoSessao:
+        from streamlit.testing.v1 import AppTest
+
+        self.app = AppTest.from_file(str(SCRIPT_PAINEL), default_timeout=self.timeout)
+        self.app.secrets["xmunicipios"] = {CODIGO_TESTE: SENHA_TESTE}
+        self.app.secrets["xescolas"] = {}
+        self.app.secrets["api"] = {"installation_id": "teste-carga", "session_token": "teste-carga"}
+
+        try:
+            self._rerun("abertura")
+
+            def entrar():
+                self.app.text_input[0].input(CODIGO_TESTE)
+                self.app.text_input[1].input(SENHA_TESTE)
+                self.app.button[0].click()
+            self._rerun("login", entrar)
+            self._rerun("login")  # st.rerun após autenticar
+
+            for _ in range(self.iteracoes):
+                self._escolher("nivel", "Nível de Agregação", barra_lateral=True)
+                self._escolher("filtros", "Selecione a etapa", barra_lateral=True,
+                              valores=sorted(config_api.ETAPAS))
+                self._escolher("filtros", "Selecione o componente", barra_lateral=True)
+                self._escolher("ranking", "Escolha o critério para ranquear")
+                self._escolher("ranking", "Selecione uma escola")
+        except Exception as e:
+            self.resultado.erros.append(f"sessão {self.numero}: {e!r}")
+
+        return self.resultado
+
+# --------------------------------------------------------------------------
+# EXECUÇÃO E RELATÓRIO
+# --------------------------------------------------------------------------
+
+def memoria_rss() -> int:
+    """Memória residente do processo (bytes); 0 se indisponível"""
+    try:
+        with open("/proc/self/statm") as arquivo:
+            return int(arquivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        try:
+            import resource
+            # ru_maxrss é o pico (KB no Linux)
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except ImportError:
+            return 0
+
+
+def percentil(valores: List[float], p: float) -> float:
+    """Percentil p (0-100) por interpolação linear"""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    posicao = (len(ordenados) - 1) * p / 100
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicao - inferior)
+
+
+def resumir(latencias: List[float]) -> Dict[str, float]:
+    return {
+        "reruns": len(latencias),
+        "media_ms": statistics.fmean(latencias) * 1000 if latencias else 0.0,
+        "p50_ms": percentil(latencias, 50) * 1000,
+        "p90_ms": percentil(latencias, 90) * 1000,
+        "p99_ms": percentil(latencias, 99) * 1000,
+        "max_ms": max(latencias, default=0.0) * 1000,
+    }
+
+
+def executar_carga(sessoes: int, iteracoes: int, latencia_api: float, timeout: float = 120.0,
+                   usar_arquivo: bool = False, **opcoes_resposta) -> Dict:
+    """
+    Executa as sessões em paralelo contra a API simulada
+
+    Returns:
+        Métricas agregadas (vazão, latências por passo, memória por sessão)
+    """
+    with ServidorAPISimulado(latencia_api, usar_arquivo, **opcoes_resposta) as servidor:
+        config_api.API_URL = servidor.url
+        memoria_inicial = memoria_rss()
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=sessoes, thread_name_prefix="sessao_carga") as executor:
+            resultados = list(executor.map(lambda n: SessaoCarga(n, iteracoes, timeout).executar(), range(sessoes)))
+        duracao = time.perf_counter() - inicio
+
+        memoria_final = memoria_rss()
+        requisicoes = servidor.requisicoes
+        memoria_cache = cache_conjuntos.uso_total()
+        descartes = len(cache_conjuntos.descartes_recentes())
+
+    todas = [segundos for r in resultados for _, segundos in r.latencias]
+    por_passo: Dict[str, List[float]] = {}
+    for r in resultados:
+        for passo, segundos in r.latencias:
+            por_passo.setdefault(passo, []).append(segundos)
+    erros = [erro for r in resultados for erro in r.erros]
+
+    return {
+        "sessoes": sessoes,
+        "iteracoes": iteracoes,
+        "latencia_api_s": latencia_api,
+        "duracao_s": duracao,
+        "vazao_reruns_s": len(todas) / duracao if duracao else 0.0,
+        "requisicoes_api": requisicoes,
+        "geral": resumir(todas),
+        "por_passo": {passo: resumir(valores) for passo, valores in por_passo.items()},
+        "memoria_inicial_mb": memoria_inicial / 2**20,
+        "memoria_final_mb": memoria_final / 2**20,
+        "memoria_por_sessao_mb": (memoria_final - memoria_inicial) / 2**20 / sessoes,
+        "memoria_cache_conjuntos_mb": memoria_cache / 2**20,
+        "descartes_cache_conjuntos": descartes,
+        "erros": len(erros),
+        "exemplos_erros": erros[:5],
+    }
+
+
+def imprimir_relatorio(metricas: Dict):
+    print(f"Sessões: {metricas['sessoes']} x {metricas['iteracoes']} iterações "
+          f"(latência da API: {metricas['latencia_api_s'] * 1000:.0f} ms)")
+    print(f"Duração: {metricas['duracao_s']:.1f} s | vazão: {metricas['vazao_reruns_s']:.1f} reruns/s | "
+          f"requisições à API: {metricas['requisicoes_api']}")
+    print(f"{'passo':<10} {'reruns':>7} {'média':>9} {'p50':>9} {'p90':>9} {'p99':>9} {'máx':>9}  (ms)")
+    for passo, r in [("geral", metricas["geral"]), *metricas["por_passo"].items()]:
+        print(f"{passo:<10} {r['reruns']:>7} {r['media_ms']:>9.1f} {r['p50_ms']:>9.1f} "
+              f"{r['p90_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['max_ms']:>9.1f}")
+    print(f"Memória: {metricas['memoria_inicial_mb']:.0f} MB -> {metricas['memoria_final_mb']:.0f} MB "
+          f"({metricas['memoria_por_sessao_mb']:.1f} MB por sessão)")
+    print(f"Conjuntos em cache: {metricas['memoria_cache_conjuntos_mb']:.1f} MB | "
+          f"descartes recentes: {metricas['descartes_cache_conjuntos']}")
+    if metricas["erros"]:
+        print(f"Erros: {metricas['erros']}")
+        for erro in metricas["exemplos_erros"]:
+            print(f"  {erro}")
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Teste de carga com sessões simultâneas do painel")
+    parser.add_argument("--sessoes", type=int, default=10, help="Sessões simultâneas (padrão: 10)")
+    parser.add_argument("--iteracoes", type=int, default=3,
+                        help="Repetições do roteiro nível/filtros/ranking por sessão (padrão: 3)")
+    parser.add_argument("--latencia-api", type=float, default=0.1,
+                        help="Atraso (s) de cada resposta da API simulada (padrão: 0.1)")
+    parser.add_argument("--escolas", type=int, default=10, help="Escolas por município na API simulada")
+    parser.add_argument("--turmas", type=int, default=3, help="Turmas por escola na API simulada")
+    parser.add_argument("--habilidades", type=int, default=20, help="Habilidades por consulta na API simulada")
+    parser.add_argument("--usar-arquivo", action="store_true",
+                        help="Responde com o arquivo_respostas quando a consulta estiver arquivada")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Tempo máximo (s) de cada rerun")
+    parser.add_argument("--json", type=Path, default=None, help="Grava as métricas também em JSON")
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    args = criar_parser().parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(levelname)s %(message)s")
+
+    metricas = executar_carga(args.sessoes, args.iteracoes, args.latencia_api, args.timeout, args.usar_arquivo,
+                              escolas=args.escolas, turmas=args.turmas, habilidades=args.habilidades)
+    imprimir_relatorio(metricas)
+    if args.json is not None:
+        args.json.write_text(json.dumps(metricas, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 1 if metricas["erros"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+# --------------------------------------------------------------------------
+# CONFIGURAÇÃO DOS TESTES - AVALIECE1
+# --------------------------------------------------------------------------
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Os módulos do painel ficam na raiz do repositório (não é um pacote instalável)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class RelogioFalso:
+    """Substitui o módulo time de um módulo testado, com o tempo avançado manualmente"""
+
+    def __init__(self, inicio: float = 1000.0):
+        self.agora = inicio
+
+    def monotonic(self) -> float:
+        return self.agora
+
+    def time(self) -> float:
+        return self.agora
+
+    def avancar(self, segundos: float):
+        self.agora += segundos
+
+
+@pytest.fixture
+def relogio() -> RelogioFalso:
+    return RelogioFalso()
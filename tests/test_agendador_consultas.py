@@ -0,0 +1,168 @@
+import threading
+import time
+
+import pytest
+
+import agendador_consultas
+from agendador_consultas import AgendadorConsultas, PrefetcherConsultas, combinacoes_vizinhas
+from config_api import config_api
+
+
+def aguardar(condicao, limite: float = 5.0):
+    """Espera as threads do pool atualizarem o estado"""
+    fim = time.monotonic() + limite
+    while not condicao():
+        assert time.monotonic() < fim, "condição não atingida"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def prefetcher(monkeypatch, relogio):
+    monkeypatch.setattr(agendador_consultas, "time", relogio)
+    prefetcher = PrefetcherConsultas(max_workers=2, orcamento_sessao=2, janela_sessao=60)
+    yield prefetcher
+    prefetcher.encerrar()
+
+
+@pytest.fixture
+def agendador(monkeypatch, relogio):
+    monkeypatch.setattr(agendador_consultas, "time", relogio)
+    agendador = AgendadorConsultas(max_workers=1)
+    yield agendador
+    agendador.encerrar()
+
+
+def tarefas(*nomes, funcao=lambda: None):
+    return {nome: funcao for nome in nomes}
+
+
+# --------------------------------------------------------------------------
+# PREFETCH (ORÇAMENTO DESLIZANTE)
+# --------------------------------------------------------------------------
+
+def test_orcamento_limita_os_agendamentos_da_janela(prefetcher, relogio):
+    assert prefetcher.agendar("s", tarefas("a", "b", "c")) == 2
+    aguardar(lambda: not prefetcher._em_andamento["s"])
+
+    # Tarefas concluídas não devolvem o orçamento antes do fim da janela
+    assert prefetcher.agendar("s", tarefas("c")) == 0
+    relogio.avancar(59)
+    assert prefetcher.agendar("s", tarefas("c")) == 0
+
+    relogio.avancar(1)
+    assert prefetcher.agendar("s", tarefas("a", "b", "c")) == 2
+
+
+def test_janela_desliza_por_agendamento(prefetcher, relogio):
+    assert prefetcher.agendar("s", tarefas("a")) == 1
+    relogio.avancar(30)
+    assert prefetcher.agendar("s", tarefas("b")) == 1
+    relogio.avancar(30)
+
+    # Só o primeiro agendamento saiu da janela
+    assert prefetcher.agendar("s", tarefas("c", "d")) == 1
+
+
+def test_orcamento_e_por_sessao(prefetcher):
+    assert prefetcher.agendar("s1", tarefas("a", "b")) == 2
+    assert prefetcher.agendar("s2", tarefas("a", "b")) == 2
+
+
+def test_combinacao_em_andamento_nao_e_agendada_de_novo(monkeypatch, relogio):
+    monkeypatch.setattr(agendador_consultas, "time", relogio)
+    prefetcher = PrefetcherConsultas(max_workers=1, orcamento_sessao=10, janela_sessao=60)
+    liberar = threading.Event()
+    try:
+        assert prefetcher.agendar("s", tarefas("a", funcao=liberar.wait)) == 1
+        assert prefetcher.agendar("s", tarefas("a")) == 0
+
+        liberar.set()
+        aguardar(lambda: not prefetcher._em_andamento["s"])
+        assert prefetcher.agendar("s", tarefas("a")) == 1
+    finally:
+        liberar.set()
+        prefetcher.encerrar()
+
+
+def test_falha_do_aquecimento_libera_a_combinacao(prefetcher):
+    def falhar():
+        raise RuntimeError("API indisponível")
+
+    assert prefetcher.agendar("s", tarefas("a", funcao=falhar)) == 1
+    aguardar(lambda: not prefetcher._em_andamento["s"])
+
+
+def test_sessoes_inativas_sao_esquecidas(prefetcher, relogio):
+    prefetcher.agendar("s1", tarefas("a"))
+    aguardar(lambda: not prefetcher._em_andamento["s1"])
+
+    relogio.avancar(60)
+    prefetcher.agendar("s2", tarefas("a"))
+    assert set(prefetcher._agendamentos) == {"s2"}
+    assert "s1" not in prefetcher._em_andamento
+
+
+def test_combinacoes_vizinhas():
+    componente, outro = [nome for nome, _ in config_api.COMPONENTES][:2]
+    etapas = sorted(config_api.ETAPAS)
+
+    vizinhas = combinacoes_vizinhas(componente, etapas[1])
+    assert vizinhas[0] == (outro, etapas[1])
+    assert vizinhas[-2:] == [(componente, etapas[2]), (componente, etapas[0])]
+    assert (componente, etapas[-2]) in combinacoes_vizinhas(componente, etapas[-1])
+
+
+# --------------------------------------------------------------------------
+# CONSULTA VIGENTE POR SESSÃO
+# --------------------------------------------------------------------------
+
+def test_mesma_consulta_reaproveita_as_tarefas(agendador):
+    futuros = agendador.agendar("s", "k1", tarefas("geral"))
+    assert agendador.agendar("s", "k1", tarefas("geral")) is futuros
+    assert agendador.consulta_vigente("s") == "k1"
+
+
+def test_nova_consulta_cancela_as_tarefas_na_fila(agendador):
+    liberar = threading.Event()
+    try:
+        anteriores = agendador.agendar("s", "k1", {"geral": liberar.wait, "habilidades": lambda: None})
+        aguardar(anteriores["geral"].running)
+
+        novos = agendador.agendar("s", "k2", tarefas("geral"))
+        assert anteriores["habilidades"].cancelled()
+        # A requisição em andamento segue até o fim
+        assert not anteriores["geral"].cancelled()
+        assert agendador.consulta_vigente("s") == "k2"
+    finally:
+        liberar.set()
+    assert novos["geral"].result(timeout=5) is None
+
+
+def test_concluir_remove_apenas_a_consulta_vigente(agendador):
+    agendador.agendar("s", "k1", tarefas("geral"))
+    agendador.concluir("s", "k0")
+    assert agendador.consulta_vigente("s") == "k1"
+
+    agendador.concluir("s", "k1")
+    assert agendador.consulta_vigente("s") is None
+
+
+def test_consultas_abandonadas_sao_podadas(agendador, relogio):
+    liberar = threading.Event()
+    try:
+        terminada = agendador.agendar("abandonada", "k1", tarefas("geral"))
+        terminada["geral"].result(timeout=5)
+        pendente = agendador.agendar("pendente", "k2", tarefas("geral", funcao=liberar.wait))
+        aguardar(pendente["geral"].running)
+
+        relogio.avancar(config_api.REQUEST_TIMEOUT - 1)
+        agendador.agendar("outra", "k3", tarefas("geral"))
+        assert agendador.consulta_vigente("abandonada") == "k1"
+
+        relogio.avancar(1)
+        agendador.agendar("outra", "k3", tarefas("geral"))
+        assert agendador.consulta_vigente("abandonada") is None
+        # Ainda em andamento: mantida
+        assert agendador.consulta_vigente("pendente") == "k2"
+    finally:
+        liberar.set()
@@ -0,0 +1,73 @@
+import pytest
+
+from config_api import config_api
+from credenciais import PREFIXO_HASH, RepositorioCredenciais, gerar_hash_senha
+
+# Poucas iterações para os testes; o que importa é serem as mesmas em todos os registros
+ITERACOES = 1_000
+
+
+@pytest.fixture(autouse=True)
+def iteracoes_reduzidas(monkeypatch):
+    monkeypatch.setattr(config_api, "ITERACOES_HASH_SENHA", ITERACOES)
+
+
+@pytest.fixture
+def repositorio():
+    usuarios = {"2304400": "senha-municipio", "2304401": gerar_hash_senha("senha-hash", ITERACOES)}
+    escolas = {"23000291": "senha-indigena", "23999999": "senha-escola", "2304401": "senha-escola-repetida"}
+    return RepositorioCredenciais.de_secrets(usuarios, escolas)
+
+
+def test_gerar_hash_senha_no_formato_do_secrets():
+    prefixo, iteracoes, salt, valor = gerar_hash_senha("x", ITERACOES).split("$")
+    assert (prefixo, int(iteracoes), len(bytes.fromhex(salt)), len(bytes.fromhex(valor))) == (
+        PREFIXO_HASH, ITERACOES, 16, 32)
+    # Salt aleatório: a mesma senha gera hashes diferentes
+    assert gerar_hash_senha("x", ITERACOES) != gerar_hash_senha("x", ITERACOES)
+
+
+def test_autentica_senhas_em_hash_e_em_texto_puro():
+    usuarios = {"2304400": "senha-municipio", "2304401": gerar_hash_senha("senha-hash", ITERACOES)}
+    repositorio = RepositorioCredenciais.de_secrets(usuarios, {})
+
+    assert repositorio.autenticar("2304400", "senha-municipio").codigo == "2304400"
+    assert repositorio.autenticar("2304401", "senha-hash").codigo == "2304401"
+    assert repositorio.autenticar("2304400", "senha-hash") is None
+    assert repositorio.autenticar("2304401", gerar_hash_senha("senha-hash", ITERACOES)) is None
+
+
+def test_texto_puro_usa_as_mesmas_iteracoes_dos_hashes_guardados(repositorio):
+    assert {registro.iteracoes for registro in repositorio._senhas.values()} == {ITERACOES}
+
+
+def test_codigo_inexistente_usa_as_iteracoes_de_um_registro_real(repositorio):
+    assert repositorio.autenticar("0000000", "senha-municipio") is None
+
+    ficticio = repositorio._registro_ficticio("0000000")
+    assert ficticio.iteracoes == ITERACOES
+    # Sempre o mesmo registro para o mesmo código
+    assert ficticio == repositorio._registro_ficticio("0000000")
+
+
+def test_repositorio_vazio_usa_as_iteracoes_configuradas():
+    repositorio = RepositorioCredenciais.de_secrets({}, {})
+    assert len(repositorio) == 0
+    assert repositorio.autenticar("2304400", "x") is None
+    assert repositorio._registro_ficticio("2304400").iteracoes == ITERACOES
+
+
+def test_perfis_por_tipo_de_codigo(repositorio):
+    assert repositorio.perfil("2304400").tipo == "Municipal"
+    assert repositorio.perfil("23000291").tipo == "Escola Indígena"
+    assert repositorio.perfil("23999999").tipo == "Escola"
+    assert repositorio.perfil("23999999").entidades_permitidas == frozenset({"23999999"})
+    assert repositorio.perfil("0000000") is None
+    assert "2304400" in repositorio and "0000000" not in repositorio
+
+
+def test_codigo_repetido_usa_a_senha_de_xescolas(repositorio):
+    assert repositorio.autenticar("2304401", "senha-hash") is None
+    assert repositorio.autenticar("2304401", "senha-escola-repetida") is not None
+    # O tipo continua vindo de xmunicipios
+    assert repositorio.perfil("2304401").tipo == "Municipal"
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from payloads import (
+    corpo_payload, criar_corpo_geral, criar_payload_geral, criar_payload_habilidades,
+    descrever_payload, modelo_payload
+)
+
+
+def test_modelo_em_cache_nao_pode_ser_alterado():
+    modelo = modelo_payload("geral", "Matemática", 5, "2", 1)
+    assert modelo is modelo_payload("geral", "Matemática", 5, "2", 1)
+
+    with pytest.raises(TypeError):
+        modelo["agregado"] = "2304400"
+    with pytest.raises(TypeError):
+        modelo["filtros"][0]["value"] = "outro"
+
+
+def test_payload_e_uma_copia_propria_do_modelo():
+    payload = criar_payload_geral("2304400", "Matemática", 5, "2", "i", "t", 1)
+    payload["filtros"][0]["value"] = "alterado"
+    payload["agregado"] = "outro"
+
+    novo = criar_payload_geral("2304401", "Matemática", 5, "2", "i", "t", 1)
+    assert novo["filtros"][0]["value"] != "alterado"
+    assert novo["agregado"] == "2304401"
+    assert (novo["_InstallationId"], novo["_SessionToken"]) == ("i", "t")
+
+
+def test_tipos_de_consulta_diferem_nos_filtros_e_indicadores():
+    geral = criar_payload_geral("2304400", "Língua Portuguesa", 9, "1", "i", "t", 0)
+    habilidades = criar_payload_habilidades("2304400", "Língua Portuguesa", 9, "1", "i", "t", 0)
+
+    assert len(habilidades["filtros"]) == len(geral["filtros"]) + 1
+    assert geral["CD_INDICADOR"] != habilidades["CD_INDICADOR"]
+    with pytest.raises(ValueError):
+        modelo_payload("outro", "Matemática", 5, "2", 1)
+
+
+@pytest.mark.parametrize("criar", [criar_payload_geral, criar_payload_habilidades])
+def test_corpo_equivale_ao_json_compacto(criar):
+    payload = criar("2304400", "Matemática", 5, "2", "i", "t", 2)
+    esperado = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    assert corpo_payload(payload) == esperado
+
+
+def test_criar_corpo_serializa_o_payload():
+    assert criar_corpo_geral("2304400", "Matemática", 5, "2", "i", "t", 2) == corpo_payload(
+        criar_payload_geral("2304400", "Matemática", 5, "2", "i", "t", 2))
+
+
+def test_corpo_sem_indicadores_ou_apenas_com_indicadores():
+    assert corpo_payload({"a": 1}) == b'{"a":1}'
+    assert json.loads(corpo_payload({"CD_INDICADOR": ["X", "Y"]})) == {"CD_INDICADOR": ["X", "Y"]}
+
+
+def test_descrever_payload_recupera_a_consulta():
+    payload = criar_payload_habilidades("2304400", "Matemática", 5, "2", "i", "t", 1)
+    descricao = descrever_payload(payload)
+
+    assert {chave: descricao[chave] for chave in ("tipo", "entidade", "ciclo", "componente", "etapa",
+                                                   "nivel_agregacao")} == {
+        "tipo": "habilidades", "entidade": "2304400", "ciclo": "2", "componente": "Matemática",
+        "etapa": 5, "nivel_agregacao": 1}
+    assert not {"_InstallationId", "_SessionToken"} & set(descricao)
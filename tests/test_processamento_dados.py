@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import processamento_dados
+from processamento_dados import CacheConjuntos, ConjuntoDados
+
+
+def criar_conjunto(linhas: int = 200, semente: int = 0) -> ConjuntoDados:
+    rng = np.random.default_rng(semente)
+    ciclos = np.repeat(["1º Ciclo", "2º Ciclo"], linhas // 2)
+    geral = pd.DataFrame({
+        "Ciclo": ciclos,
+        "CD_ENTIDADE": rng.integers(0, 10, linhas).astype(str),
+        "CD_TURMA": rng.integers(0, 40, linhas).astype(str),
+        "NM_ENTIDADE": "Escola",
+        "AVG_PROFICIENCIA_E1": rng.random(linhas) * 300,
+        "TX_PARTICIPACAO": rng.random(linhas) * 100,
+    })
+    habilidades = pd.DataFrame({
+        "Ciclo": ciclos,
+        "CD_ENTIDADE": rng.integers(0, 10, linhas).astype(str),
+        "CD_HABILIDADE": rng.integers(0, 20, linhas).astype(str),
+        "DC_HABILIDADE": "Descrição",
+        "TX_ACERTO": rng.random(linhas) * 100,
+    })
+    return ConjuntoDados(geral, habilidades, geral.copy())
+
+
+def memoria_completa(conjunto: ConjuntoDados) -> int:
+    """Memória medida do zero (descarta a contabilidade incremental)"""
+    def limpar(atual: ConjuntoDados):
+        atual._memoria = None
+        for subconjunto in atual._subconjuntos.values():
+            limpar(subconjunto)
+    limpar(conjunto)
+    return conjunto.memoria_bytes()
+
+
+@pytest.fixture
+def tamanho() -> int:
+    return criar_conjunto().memoria_bytes()
+
+
+@pytest.fixture(autouse=True)
+def relogio_cache(monkeypatch, relogio):
+    monkeypatch.setattr(processamento_dados, "time", relogio)
+    return relogio
+
+
+def chaves(cache: CacheConjuntos):
+    return [item["chave"] for item in cache.itens_residentes()]
+
+
+def test_orcamento_da_sessao_descarta_os_itens_dela_usados_ha_mais_tempo(tamanho):
+    cache = CacheConjuntos(max_bytes=10 * tamanho, max_bytes_sessao=int(2.5 * tamanho))
+    cache.guardar("a", criar_conjunto(), "s1")
+    cache.guardar("b", criar_conjunto(), "s1")
+    cache.guardar("outra", criar_conjunto(), "s2")
+    cache.obter("a", "s1")
+    cache.guardar("c", criar_conjunto(), "s1")
+
+    assert chaves(cache) == ["c", "a", "outra"]
+    descarte = cache.descartes_recentes()[0]
+    assert (descarte["chave"], descarte["sessao"], descarte["motivo"]) == ("b", "s1", "orçamento da sessão")
+    assert cache.uso_por_sessao() == {"s1": 2 * tamanho, "s2": tamanho}
+
+
+def test_orcamento_do_processo_e_limite_de_itens(tamanho):
+    cache = CacheConjuntos(max_bytes=int(2.5 * tamanho), max_bytes_sessao=10 * tamanho)
+    for chave, sessao in (("a", "s1"), ("b", "s2"), ("c", "s3")):
+        cache.guardar(chave, criar_conjunto(), sessao)
+    assert chaves(cache) == ["c", "b"]
+    assert cache.descartes_recentes()[0]["motivo"] == "orçamento do processo"
+
+    cache = CacheConjuntos(max_itens=2, max_bytes=10 * tamanho, max_bytes_sessao=10 * tamanho)
+    for chave in "abc":
+        cache.guardar(chave, criar_conjunto())
+    assert chaves(cache) == ["c", "b"]
+    assert cache.descartes_recentes()[0]["motivo"] == "limite de itens"
+
+
+def test_item_recem_guardado_nunca_e_descartado(tamanho):
+    cache = CacheConjuntos(max_bytes=tamanho // 2, max_bytes_sessao=tamanho // 2)
+    conjunto = criar_conjunto()
+    cache.guardar("a", conjunto)
+    assert cache.obter("a") is conjunto
+
+
+def test_itens_expiram(relogio_cache, tamanho):
+    cache = CacheConjuntos(ttl=60, max_bytes=10 * tamanho, max_bytes_sessao=10 * tamanho)
+    cache.guardar("a", criar_conjunto())
+    relogio_cache.avancar(59)
+    assert "a" in cache
+
+    relogio_cache.avancar(1)
+    assert "a" not in cache
+    assert cache.obter("a") is None
+    assert cache.descartes_recentes()[0]["motivo"] == "expirado"
+
+
+def test_obter_atribui_o_item_a_sessao_que_o_usou(tamanho):
+    cache = CacheConjuntos(max_bytes=10 * tamanho, max_bytes_sessao=10 * tamanho)
+    cache.guardar("a", criar_conjunto(), "s1")
+    cache.obter("a", "s2")
+    cache.obter("a")
+
+    item = cache.itens_residentes()[0]
+    assert (item["sessao"], item["acessos"]) == ("s2", 2)
+
+
+def test_visoes_memorizadas_somam_bytes_sem_nova_medicao(tamanho):
+    cache = CacheConjuntos(max_bytes=100 * tamanho, max_bytes_sessao=100 * tamanho)
+    conjunto = criar_conjunto()
+    cache.guardar("a", conjunto)
+
+    subconjunto = conjunto.entidade("CD_ENTIDADE", "3")
+    subconjunto.ranking_habilidades.maiores("1º Ciclo", 5)
+    conjunto.ranking_habilidades.maiores("1º Ciclo", 5, "CD_ENTIDADE", "3")
+    conjunto.variacoes.entidades("CD_ENTIDADE")
+    conjunto.variacoes.habilidades()
+    conjunto.dimensoes
+    conjunto.niveis_por_ciclo
+    conjunto.entidade("CD_TURMA", "5")
+
+    contabilizado = cache.uso_total()
+    assert contabilizado > tamanho
+    assert contabilizado == conjunto.memoria_bytes() == memoria_completa(conjunto)
+
+
+def test_conjunto_substituido_nao_recebe_bytes_do_anterior(tamanho):
+    cache = CacheConjuntos(max_bytes=100 * tamanho, max_bytes_sessao=100 * tamanho)
+    antigo = criar_conjunto()
+    cache.guardar("a", antigo)
+    cache.guardar("a", criar_conjunto(semente=1))
+    uso = cache.uso_total()
+
+    antigo.dimensoes
+    assert cache.uso_total() == uso
+
+
+def test_ciclos_sao_fatias_das_tabelas():
+    conjunto = criar_conjunto()
+    assert conjunto._linhas_geral == {"1º Ciclo": slice(0, 100), "2º Ciclo": slice(100, 200)}
+    pd.testing.assert_frame_equal(conjunto.geral_ciclo("2º Ciclo"),
+                                  conjunto.geral[conjunto.geral["Ciclo"] == "2º Ciclo"])
+    assert conjunto.habilidades_ciclo("3º Ciclo").empty
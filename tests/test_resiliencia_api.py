@@ -0,0 +1,140 @@
+import threading
+
+import pytest
+
+import resiliencia_api
+from resiliencia_api import (
+    CHAVE_CONTINGENCIA, ArmazemRespostas, CircuitBreaker, LimitadorConcorrencia,
+    LimiteConcorrenciaError, chave_payload
+)
+
+
+@pytest.fixture
+def breaker(monkeypatch, relogio):
+    monkeypatch.setattr(resiliencia_api, "time", relogio)
+    return CircuitBreaker(limite_falhas=3, tempo_recuperacao=10, tempo_recuperacao_max=25)
+
+
+def test_circuito_abre_no_limite_de_falhas(breaker):
+    for _ in range(2):
+        breaker.registrar_falha()
+    assert breaker.estado == CircuitBreaker.FECHADO
+    assert breaker.permitir_requisicao()
+
+    breaker.registrar_falha()
+    assert breaker.estado == CircuitBreaker.ABERTO
+    assert not breaker.permitir_requisicao()
+
+
+def test_sucesso_zera_as_falhas(breaker):
+    breaker.registrar_falha()
+    breaker.registrar_falha()
+    breaker.registrar_sucesso()
+    breaker.registrar_falha()
+    breaker.registrar_falha()
+    assert breaker.estado == CircuitBreaker.FECHADO
+
+
+def test_meio_aberto_libera_uma_unica_requisicao_de_teste(breaker, relogio):
+    for _ in range(3):
+        breaker.registrar_falha()
+    relogio.avancar(10)
+
+    assert breaker.estado == CircuitBreaker.MEIO_ABERTO
+    assert breaker.permitir_requisicao()
+    assert not breaker.permitir_requisicao()
+
+    breaker.registrar_sucesso()
+    assert breaker.estado == CircuitBreaker.FECHADO
+    assert breaker.permitir_requisicao()
+
+
+def test_teste_mal_sucedido_dobra_a_recuperacao_ate_o_teto(breaker, relogio):
+    for _ in range(3):
+        breaker.registrar_falha()
+
+    esperas = []
+    for _ in range(3):
+        relogio.avancar(breaker.segundos_para_nova_tentativa())
+        assert breaker.permitir_requisicao()
+        breaker.registrar_falha()
+        assert breaker.estado == CircuitBreaker.ABERTO
+        esperas.append(breaker.segundos_para_nova_tentativa())
+
+    assert esperas == [20, 25, 25]
+
+    # Um sucesso restaura o tempo inicial
+    relogio.avancar(25)
+    assert breaker.permitir_requisicao()
+    breaker.registrar_sucesso()
+    for _ in range(3):
+        breaker.registrar_falha()
+    assert breaker.segundos_para_nova_tentativa() == 10
+
+
+def test_cancelar_teste_libera_a_vaga_de_teste(breaker, relogio):
+    for _ in range(3):
+        breaker.registrar_falha()
+    relogio.avancar(10)
+
+    assert breaker.permitir_requisicao()
+    breaker.cancelar_teste()
+    assert breaker.estado == CircuitBreaker.MEIO_ABERTO
+    assert breaker.permitir_requisicao()
+
+
+def test_limitador_recusa_acima_do_maximo():
+    limitador = LimitadorConcorrencia(max_simultaneas=2, tempo_espera=0.01)
+    with limitador.vaga(), limitador.vaga():
+        with pytest.raises(LimiteConcorrenciaError):
+            with limitador.vaga():
+                pass
+
+    # As vagas são devolvidas ao sair do bloco, inclusive com exceção
+    with pytest.raises(RuntimeError):
+        with limitador.vaga():
+            raise RuntimeError
+    with limitador.vaga(), limitador.vaga():
+        pass
+
+
+def test_limitador_espera_uma_vaga_liberada():
+    limitador = LimitadorConcorrencia(max_simultaneas=1, tempo_espera=5)
+    ocupada = threading.Event()
+    liberar = threading.Event()
+
+    def ocupar():
+        with limitador.vaga():
+            ocupada.set()
+            liberar.wait()
+
+    thread = threading.Thread(target=ocupar)
+    thread.start()
+    ocupada.wait()
+    threading.Timer(0.05, liberar.set).start()
+    with limitador.vaga():
+        pass
+    thread.join()
+
+
+def test_armazem_marca_a_contingencia_e_descarta_as_mais_antigas(monkeypatch, relogio):
+    monkeypatch.setattr(resiliencia_api, "time", relogio)
+    armazem = ArmazemRespostas(max_itens=2)
+    armazem.guardar("a", {"result": [1]})
+    armazem.guardar("b", {"result": [2]})
+    armazem.guardar("a", {"result": [3]})
+    armazem.guardar("c", {"result": [4]})
+
+    assert armazem.obter("b") is None
+    assert armazem.obter_contingencia("a") == {"result": [3], CHAVE_CONTINGENCIA: relogio.agora}
+    assert armazem.obter_contingencia("x") is None
+    # A resposta guardada não recebe a marca
+    assert CHAVE_CONTINGENCIA not in armazem.obter("a")[1]
+
+
+def test_chave_payload_ignora_credenciais_e_ordem_dos_indicadores():
+    base = {"agregado": "2304400", "CD_INDICADOR": ["B", "A"], "_InstallationId": "i", "_SessionToken": "t"}
+    outra_sessao = {**base, "CD_INDICADOR": ["A", "B"], "_InstallationId": "j", "_SessionToken": "u"}
+
+    assert chave_payload(base) == chave_payload(outra_sessao)
+    assert chave_payload(base) != chave_payload({**base, "agregado": "2304401"})
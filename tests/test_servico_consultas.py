@@ -0,0 +1,146 @@
+import gzip
+import threading
+
+import pytest
+import requests
+
+from config_api import config_api
+from gerar_relatorios import montar_payloads
+from processamento_dados import ProcessadorDados
+from servico_consultas import ServicoConsultas, criar_servidor
+from teste_carga import CODIGO_TESTE, gerar_resposta
+
+TOKEN = "segredo"
+CONSULTA = {"entidade": CODIGO_TESTE, "componente": "Matemática", "etapa": 5, "nivel": 1}
+
+
+def conjunto_simulado(entidade: str, componente: str, etapa: int, nivel: int):
+    payloads = montar_payloads(entidade, componente, etapa, nivel, "i", "t")
+    return ProcessadorDados.conjunto_de_respostas(
+        {nome: gerar_resposta(payload) for nome, payload in payloads.items()})
+
+
+class ServicoSimulado(ServicoConsultas):
+    """Serviço com os conjuntos montados de respostas simuladas, sem API nem caches globais"""
+
+    def __init__(self):
+        super().__init__("i", "t")
+        self.conjuntos = {}
+
+    def conjunto(self, chave_consulta):
+        with self._trava(chave_consulta):
+            if chave_consulta not in self.conjuntos:
+                self.conjuntos[chave_consulta] = conjunto_simulado(*chave_consulta)
+            return self.conjuntos[chave_consulta]
+
+
+@pytest.fixture
+def servico():
+    servico = ServicoSimulado()
+    yield servico
+    servico.api_client.fechar()
+
+
+@pytest.fixture
+def url(servico):
+    servidor = criar_servidor(servico, "127.0.0.1", 0, token=TOKEN)
+    threading.Thread(target=servidor.serve_forever, args=(0.05,), daemon=True).start()
+    yield f"http://127.0.0.1:{servidor.server_address[1]}"
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def consultar(url: str, cabecalhos: dict = None, token: str = TOKEN, **parametros):
+    cabecalhos = {"Authorization": f"Bearer {token}", **(cabecalhos or {})}
+    return requests.get(f"{url}/consulta", params={**CONSULTA, **parametros}, headers=cabecalhos, timeout=30)
+
+
+def parametros_url(**parametros):
+    return {nome: [str(valor)] for nome, valor in {**CONSULTA, **parametros}.items()}
+
+
+# --------------------------------------------------------------------------
+# SERVIÇO
+# --------------------------------------------------------------------------
+
+def test_corpo_reaproveitado_enquanto_o_conjunto_for_o_mesmo(servico):
+    primeira = servico.responder(parametros_url(tabela="ranking"))
+    assert servico.responder(parametros_url(tabela="ranking")) is primeira
+    assert servico.comprimir(primeira) is servico.comprimir(primeira)
+    assert gzip.decompress(servico.comprimir(primeira)) == primeira.corpo
+
+    # Conjunto novo (cache renovado): novo corpo
+    servico.conjuntos.clear()
+    assert servico.responder(parametros_url(tabela="ranking")) is not primeira
+
+
+def test_trava_existe_apenas_durante_o_uso(servico):
+    chave = tuple(CONSULTA.values())
+    dentro = threading.Event()
+    liberar = threading.Event()
+
+    def ocupar():
+        with servico._trava(chave):
+            dentro.set()
+            liberar.wait()
+
+    thread = threading.Thread(target=ocupar)
+    thread.start()
+    dentro.wait()
+    assert servico._travas[chave][1] == 1
+    liberar.set()
+    thread.join()
+
+    servico.responder(parametros_url())
+    assert servico._travas == {}
+
+
+@pytest.mark.parametrize("parametros", [
+    {"componente": "Ciências"}, {"etapa": 3}, {"etapa": "cinco"}, {"nivel": 3},
+    {"tabela": "outra"}, {"tabela": "ranking", "nivel": 0}, {"formato": "xml"},
+])
+def test_parametros_invalidos(url, parametros):
+    resposta = consultar(url, **parametros)
+    assert resposta.status_code == 400
+    assert "erro" in resposta.json()
+
+
+# --------------------------------------------------------------------------
+# HTTP
+# --------------------------------------------------------------------------
+
+@pytest.mark.parametrize("token", ["", "outro", "segredó"])
+def test_token_invalido(url, token):
+    assert consultar(url, token=token).status_code == 401
+    assert requests.get(f"{url}/saude", timeout=30).status_code == 401
+
+
+def test_gzip_e_etag_por_representacao(url):
+    comprimida = consultar(url, {"Accept-Encoding": "gzip"})
+    simples = consultar(url, {"Accept-Encoding": "identity"})
+
+    assert comprimida.status_code == simples.status_code == 200
+    assert comprimida.headers["Content-Encoding"] == "gzip"
+    assert "Content-Encoding" not in simples.headers
+    assert comprimida.content == simples.content
+    assert len(simples.content) >= config_api.MIN_BYTES_GZIP_SERVICO
+    assert comprimida.headers["ETag"] == simples.headers["ETag"][:-1] + '-gzip"'
+    assert comprimida.headers["Vary"] == "Accept-Encoding"
+    assert simples.json()["linhas"] == len(simples.json()["dados"])
+
+
+@pytest.mark.parametrize("codificacao", ["gzip", "identity"])
+def test_if_none_match_aceita_as_duas_etags(url, codificacao):
+    etags = {consultar(url, {"Accept-Encoding": valor}).headers["ETag"] for valor in ("gzip", "identity")}
+    for etag in etags | {"W/" + etag for etag in etags}:
+        resposta = consultar(url, {"Accept-Encoding": codificacao, "If-None-Match": etag})
+        assert resposta.status_code == 304
+        assert resposta.content == b""
+
+    assert consultar(url, {"If-None-Match": '"outra"'}).status_code == 200
+
+
+def test_caminho_desconhecido_e_saude(url):
+    cabecalhos = {"Authorization": f"Bearer {TOKEN}"}
+    assert requests.get(f"{url}/outro", headers=cabecalhos, timeout=30).status_code == 404
+    assert "circuito" in requests.get(f"{url}/saude", headers=cabecalhos, timeout=30).json()